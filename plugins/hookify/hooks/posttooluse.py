@@ -21,6 +21,7 @@ if PLUGIN_ROOT:
 try:
     from hookify.core.config_loader import load_rules
     from hookify.core.rule_engine import RuleEngine
+    from hookify.utils.hook_input import read_hook_input
 except ImportError as e:
     error_msg = {"systemMessage": f"Hookify import error: {e}"}
     print(json.dumps(error_msg), file=sys.stdout)
@@ -30,8 +31,8 @@ except ImportError as e:
 def main():
     """Main entry point for PostToolUse hook."""
     try:
-        # Read input from stdin
-        input_data = json.load(sys.stdin)
+        # Read input from stdin (values are decoded only when a rule reads them)
+        input_data = read_hook_input()
 
         # Determine event type based on tool
         tool_name = input_data.get('tool_name', '')
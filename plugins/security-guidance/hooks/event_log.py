@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Structured event log for the security reminder hook.
+
+Each hook invocation collects its fields (timing, bytes scanned, rules hit,
+decision, debug messages) in a HookEvent and appends them as one JSON line
+with a single write when the hook exits. The log lives under ~/.claude, so it
+is private to the user, and rotates by size.
+
+Run this file directly to summarize the log:
+    python3 event_log.py [--log PATH] [--session SESSION_ID] [--json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+EVENT_LOG_FILE = os.environ.get(
+    "SECURITY_REMINDER_EVENT_LOG",
+    os.path.expanduser("~/.claude/security_warnings_events.jsonl"),
+)
+MAX_LOG_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 3
+
+
+class HookEvent:
+    """Fields for one hook invocation, written out once by flush()."""
+
+    def __init__(self, path=EVENT_LOG_FILE):
+        self.path = path
+        self.start = time.perf_counter()
+        self.fields = {"ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds")}
+        self.messages = []
+
+    def update(self, **fields):
+        self.fields.update(fields)
+
+    def note(self, message):
+        """Attach a debug message to this invocation's event."""
+        self.messages.append(message)
+
+    def flush(self, **fields):
+        """Append the event as one JSON line; never raises."""
+        self.fields.update(fields)
+        self.fields["duration_ms"] = round((time.perf_counter() - self.start) * 1000, 3)
+        if self.messages:
+            self.fields["messages"] = self.messages
+        try:
+            append_line(self.path, json.dumps(self.fields, separators=(",", ":")))
+        except Exception:
+            pass  # Logging must never disrupt the hook
+
+
+def append_line(path, line, max_bytes=MAX_LOG_BYTES, backups=LOG_BACKUPS):
+    """Append one line with a single O_APPEND write, rotating past max_bytes."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+    try:
+        os.write(fd, (line + "\n").encode("utf-8"))
+        size = os.fstat(fd).st_size
+    finally:
+        os.close(fd)
+    if size > max_bytes:
+        rotate(path, max_bytes, backups)
+
+
+def rotate(path, max_bytes=MAX_LOG_BYTES, backups=LOG_BACKUPS):
+    """Shift path -> path.1 -> ... -> path.<backups>, dropping the oldest."""
+    try:
+        # Another hook may have rotated between our write and this check
+        if os.path.getsize(path) <= max_bytes:
+            return
+        for index in range(backups - 1, 0, -1):
+            older = f"{path}.{index}"
+            if os.path.exists(older):
+                os.replace(older, f"{path}.{index + 1}")
+        os.replace(path, f"{path}.1")
+    except OSError:
+        pass
+
+
+def read_events(path=EVENT_LOG_FILE, backups=LOG_BACKUPS):
+    """Yield events from the rotated backups (oldest first) and the live log."""
+    paths = [f"{path}.{index}" for index in range(backups, 0, -1)] + [path]
+    for log_path in paths:
+        try:
+            with open(log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Skip lines torn by a crash mid-write
+        except OSError:
+            continue
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(events):
+    """Aggregate latency percentiles, decisions and warning counts."""
+    durations = []
+    decisions = Counter()
+    rules_hit = Counter()
+    warnings_shown = Counter()
+    sessions = Counter()
+    bytes_scanned = 0
+    cache = Counter()
+
+    for event in events:
+        if "duration_ms" in event:
+            durations.append(event["duration_ms"])
+        decisions[event.get("decision", "unknown")] += 1
+        if "session_id" in event:
+            sessions[event["session_id"]] += 1
+        bytes_scanned += event.get("bytes_scanned", 0)
+        rules_hit.update(event.get("rules_hit", []))
+        warnings_shown.update(event.get("warnings_shown", []))
+        if event.get("cache"):
+            cache[event["cache"]] += 1
+
+    durations.sort()
+    return {
+        "invocations": len(durations),
+        "sessions": len(sessions),
+        "latency_ms": {
+            "p50": percentile(durations, 50),
+            "p90": percentile(durations, 90),
+            "p99": percentile(durations, 99),
+            "max": durations[-1] if durations else None,
+        },
+        "decisions": dict(decisions),
+        "bytes_scanned": bytes_scanned,
+        "verdict_cache": dict(cache),
+        "rules_hit": dict(rules_hit.most_common()),
+        "warnings_shown": dict(warnings_shown.most_common()),
+    }
+
+
+def print_summary(summary):
+    print(f"Invocations: {summary['invocations']} across {summary['sessions']} session(s)")
+    latency = summary["latency_ms"]
+    if summary["invocations"]:
+        print(
+            "Latency (ms): "
+            + "  ".join(f"{name}={value:.2f}" for name, value in latency.items())
+        )
+    print(f"Bytes scanned: {summary['bytes_scanned']:,}")
+    if summary["verdict_cache"]:
+        print("Verdict cache: " + ", ".join(f"{k}={v}" for k, v in summary["verdict_cache"].items()))
+    print("Decisions: " + (", ".join(f"{k}={v}" for k, v in summary["decisions"].items()) or "none"))
+    for title, key in (("Rules hit", "rules_hit"), ("Warnings shown", "warnings_shown")):
+        print(f"{title}:")
+        for rule_name, count in summary[key].items():
+            print(f"  {count:6d}  {rule_name}")
+        if not summary[key]:
+            print("  none")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize security reminder hook events")
+    parser.add_argument("--log", default=EVENT_LOG_FILE, help="Event log path")
+    parser.add_argument("--session", help="Only include this session ID")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args()
+
+    events = read_events(args.log)
+    if args.session:
+        events = (event for event in events if event.get("session_id") == args.session)
+    summary = summarize(events)
+
+    if args.json:
+        json.dump(summary, sys.stdout, indent=2)
+        print()
+    else:
+        print_summary(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""Lazy, key-selective reader for hook input JSON.
+
+Write/Edit payloads carry the whole file content, but most hooks only look at
+a few small fields (tool_name, session_id, tool_input.file_path) before they
+decide to exit. LazyObject indexes the members of the payload on demand and
+only decodes a value when it is read, so a multi-megabyte ``content`` string
+is never decoded unless a rule actually asks for it.
+
+Plugins are installed independently, so this is a copy of
+hookify/utils/hook_input.py; keep the two in sync.
+"""
+
+import json
+import re
+import sys
+from collections.abc import Mapping
+from json.decoder import scanstring
+from typing import Any, Iterator, Optional, TextIO, Tuple
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_DECODER = json.JSONDecoder()
+_UNPARSED = object()
+
+
+def _skip_ws(text: str, pos: int) -> int:
+    return _WHITESPACE.match(text, pos).end()
+
+
+def _expect(text: str, pos: int, char: str, what: str) -> None:
+    if text[pos:pos + 1] != char:
+        raise json.JSONDecodeError(f"Expecting {what}", text, pos)
+
+
+class LazyObject(Mapping):
+    """Read-only mapping over one JSON object inside a larger document.
+
+    Looking up a key scans forward only until that key is found. Values are
+    decoded the first time they are read: strings with the stdlib C string
+    scanner, nested objects as further LazyObjects, everything else with the
+    stdlib C decoder. Values the scan has to step over to reach a later key
+    are decoded once and memoized.
+
+    If a key appears more than once, the first occurrence wins.
+    """
+
+    def __init__(self, text: str, start: int):
+        _expect(text, start, '{', "'{'")
+        self._text = text
+        self._values = {}  # key -> decoded value, or _UNPARSED
+        self._pos = _skip_ws(text, start + 1)
+        self._pending = None  # (key, value offset) of the last scanned member
+        self._pending_end = None  # end of the pending value once parsed
+        self._end = None
+        if text[self._pos:self._pos + 1] == '}':
+            self._end = self._pos + 1
+
+    def _parse_value(self, pos: int) -> Tuple[Any, int]:
+        text = self._text
+        char = text[pos:pos + 1]
+        if char == '"':
+            return scanstring(text, pos + 1)
+        if char == '{':
+            # The end is only found if something scans past this member.
+            return LazyObject(text, pos), None
+        return _DECODER.raw_decode(text, pos)
+
+    def _finish_pending(self) -> None:
+        """Step over the value of the last scanned member and its delimiter."""
+        if self._pending is None:
+            return
+        key, start = self._pending
+        end = self._pending_end
+        self._pending = self._pending_end = None
+        # A key of None marks a duplicate member, which is parsed and dropped.
+        value = self._values[key] if key is not None else _UNPARSED
+        if value is _UNPARSED:
+            value, end = self._parse_value(start)
+            if key is not None:
+                self._values[key] = value
+        if isinstance(value, LazyObject):
+            end = value.end()
+
+        text = self._text
+        pos = _skip_ws(text, end)
+        char = text[pos:pos + 1]
+        if char == ',':
+            self._pos = _skip_ws(text, pos + 1)
+        elif char == '}':
+            self._end = pos + 1
+        else:
+            raise json.JSONDecodeError("Expecting ',' delimiter", text, pos)
+
+    def _scan_next(self) -> bool:
+        """Index the next member; return False once the object is exhausted."""
+        self._finish_pending()
+        if self._end is not None:
+            return False
+        text = self._text
+        _expect(text, self._pos, '"', "property name enclosed in double quotes")
+        key, pos = scanstring(text, self._pos + 1)
+        pos = _skip_ws(text, pos)
+        _expect(text, pos, ':', "':' delimiter")
+        pos = _skip_ws(text, pos + 1)
+        if key in self._values:
+            self._pending = (None, pos)
+        else:
+            self._values[key] = _UNPARSED
+            self._pending = (key, pos)
+        return True
+
+    def _locate(self, key: str) -> bool:
+        while key not in self._values:
+            if not self._scan_next():
+                return False
+        return True
+
+    def end(self) -> int:
+        """Scan to the closing brace and return the offset just past it."""
+        while self._scan_next():
+            pass
+        return self._end
+
+    def __getitem__(self, key: str) -> Any:
+        if not self._locate(key):
+            raise KeyError(key)
+        value = self._values[key]
+        if value is _UNPARSED:
+            # Only the most recently scanned member can still be unparsed.
+            value, self._pending_end = self._parse_value(self._pending[1])
+            self._values[key] = value
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self._locate(key)
+
+    def __iter__(self) -> Iterator[str]:
+        self.end()
+        return iter(list(self._values))
+
+    def __len__(self) -> int:
+        self.end()
+        return len(self._values)
+
+    def to_dict(self) -> dict:
+        """Fully decode this object into plain Python values."""
+        return {
+            key: value.to_dict() if isinstance(value, LazyObject) else value
+            for key, value in self.items()
+        }
+
+    def __repr__(self) -> str:
+        return f"LazyObject(keys={list(self._values)!r}, complete={self._end is not None})"
+
+
+def read_hook_input(stream: Optional[TextIO] = None) -> LazyObject:
+    """Read hook input from stdin (or stream) without decoding it.
+
+    Raises:
+        json.JSONDecodeError: If the payload is not a JSON object. Errors
+            further into the document surface when the affected key is read.
+    """
+    stream = stream or sys.stdin
+    buffer = getattr(stream, 'buffer', None)
+    if buffer is not None:
+        # Decoding the raw bytes in one go is several times faster than
+        # reading through the text layer's newline translation.
+        text = buffer.read().decode('utf-8', errors='replace')
+    else:
+        text = stream.read()
+    return LazyObject(text, _skip_ws(text, 0))
+
+
+def get_path(data: Mapping, path: str, default: Any = None) -> Any:
+    """Look up a dotted path such as "tool_input.file_path"."""
+    value = data
+    for part in path.split('.'):
+        if not isinstance(value, Mapping) or part not in value:
+            return default
+        value = value[part]
+    return value
+
+
+def select(data: Mapping, *paths: str) -> dict:
+    """Return {path: value} for each requested dotted path that is present."""
+    missing = object()
+    result = {}
+    for path in paths:
+        value = get_path(data, path, missing)
+        if value is not missing:
+            result[path] = value
+    return result
+
+
+# For testing
+if __name__ == '__main__':
+    import io
+
+    payload = json.dumps({
+        "session_id": "abc",
+        "tool_name": "Write",
+        "tool_input": {"file_path": "/tmp/x.py", "content": "print('hi')\n" * 3},
+    })
+    data = read_hook_input(io.StringIO(payload))
+    print("Selected:", select(data, "tool_name", "session_id", "tool_input.file_path"))
+    print("Lazy state:", data)
+    print("Round trip ok:", data.to_dict() == json.loads(payload))
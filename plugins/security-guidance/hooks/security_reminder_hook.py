@@ -4,30 +4,61 @@ Security Reminder Hook for Claude Code
 This hook checks for security patterns in file edits and warns about potential vulnerabilities.
 """
 
+import fnmatch
+import hashlib
 import json
 import os
 import random
+import re
+import sqlite3
 import sys
-from datetime import datetime
 
-# Debug log file
-DEBUG_LOG_FILE = "/tmp/security-warnings-log.txt"
+from event_log import HookEvent
+from hook_input import read_hook_input
+from state_store import WarningStateStore
 
+# Structured event for this invocation, written with one append on exit
+EVENT = HookEvent()
 
-def debug_log(message):
-    """Append debug message to log file with timestamp."""
-    try:
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-        with open(DEBUG_LOG_FILE, "a") as f:
-            f.write(f"[{timestamp}] {message}\n")
-    except Exception as e:
-        # Silently ignore logging errors to avoid disrupting the hook
-        pass
 
+def debug_log(message):
+    """Attach a debug message to this invocation's event log entry."""
+    EVENT.note(message)
+
+
+# File extensions for each language a content rule can be scoped to
+LANGUAGE_EXTENSIONS = {
+    "javascript": [".js", ".jsx", ".mjs", ".cjs"],
+    "typescript": [".ts", ".tsx", ".mts", ".cts"],
+    "html": [".html", ".htm", ".vue", ".svelte", ".astro"],
+    "python": [".py", ".pyw"],
+}
+
+# Files whose content is never scanned: docs, data, lockfiles and generated
+# assets. Matched against the lowercased basename.
+SKIP_CONTENT_GLOBS = [
+    "*.md",
+    "*.mdx",
+    "*.markdown",
+    "*.rst",
+    "*.txt",
+    "*.json",
+    "*.jsonc",
+    "*.lock",
+    "*-lock.yaml",
+    "*.min.js",
+    "*.min.css",
+    "*.map",
+    "*.svg",
+    "*.csv",
+]
 
-# State file to track warnings shown (session-scoped using session ID)
+# Content at least this long is hashed and its scan verdict cached per
+# session; below this, rescanning is cheaper than a cache lookup.
+VERDICT_CACHE_MIN_CHARS = 64 * 1024
 
-# Security patterns configuration
+# Security patterns configuration. Content rules list the "languages" they
+# apply to; a rule without "languages" applies to every file type.
 SECURITY_PATTERNS = [
     {
         "ruleName": "github_actions_workflow",
@@ -68,6 +99,7 @@ Other risky inputs to be careful with:
     },
     {
         "ruleName": "child_process_exec",
+        "languages": ["javascript", "typescript"],
         "substrings": ["child_process.exec", "exec(", "execSync("],
         "reminder": """⚠️ Security Warning: Using child_process.exec() can lead to command injection vulnerabilities.
 
@@ -90,113 +122,225 @@ Only use exec() if you absolutely need shell features and the input is guarantee
     },
     {
         "ruleName": "new_function_injection",
+        "languages": ["javascript", "typescript", "html"],
         "substrings": ["new Function"],
         "reminder": "⚠️ Security Warning: Using new Function() with dynamic strings can lead to code injection vulnerabilities. Consider alternative approaches that don't evaluate arbitrary code. Only use new Function() if you truly need to evaluate arbitrary dynamic code.",
     },
     {
         "ruleName": "eval_injection",
+        "languages": ["javascript", "typescript", "html", "python"],
         "substrings": ["eval("],
         "reminder": "⚠️ Security Warning: eval() executes arbitrary code and is a major security risk. Consider using JSON.parse() for data parsing or alternative design patterns that don't require code evaluation. Only use eval() if you truly need to evaluate arbitrary code.",
     },
     {
         "ruleName": "react_dangerously_set_html",
+        "languages": ["javascript", "typescript"],
         "substrings": ["dangerouslySetInnerHTML"],
         "reminder": "⚠️ Security Warning: dangerouslySetInnerHTML can lead to XSS vulnerabilities if used with untrusted content. Ensure all content is properly sanitized using an HTML sanitizer library like DOMPurify, or use safe alternatives.",
     },
     {
         "ruleName": "document_write_xss",
+        "languages": ["javascript", "typescript", "html"],
         "substrings": ["document.write"],
         "reminder": "⚠️ Security Warning: document.write() can be exploited for XSS attacks and has performance issues. Use DOM manipulation methods like createElement() and appendChild() instead.",
     },
     {
         "ruleName": "innerHTML_xss",
+        "languages": ["javascript", "typescript", "html"],
         "substrings": [".innerHTML =", ".innerHTML="],
         "reminder": "⚠️ Security Warning: Setting innerHTML with untrusted content can lead to XSS vulnerabilities. Use textContent for plain text or safe DOM methods for HTML content. If you need HTML support, consider using an HTML sanitizer library such as DOMPurify.",
     },
     {
         "ruleName": "pickle_deserialization",
+        "languages": ["python"],
         "substrings": ["pickle"],
         "reminder": "⚠️ Security Warning: Using pickle with untrusted content can lead to arbitrary code execution. Consider using JSON or other safe serialization formats instead. Only use pickle if it is explicitly needed or requested by the user.",
     },
     {
         "ruleName": "os_system_injection",
+        "languages": ["python"],
         "substrings": ["os.system", "from os import system"],
         "reminder": "⚠️ Security Warning: This code appears to use os.system. This should only be used with static arguments and never with arguments that could be user-controlled.",
     },
 ]
 
 
-def get_state_file(session_id):
-    """Get session-specific state file path."""
-    return os.path.expanduser(f"~/.claude/security_warnings_state_{session_id}.json")
+_state_store = None
 
 
-def cleanup_old_state_files():
-    """Remove state files older than 30 days."""
-    try:
-        state_dir = os.path.expanduser("~/.claude")
-        if not os.path.exists(state_dir):
-            return
-
-        current_time = datetime.now().timestamp()
-        thirty_days_ago = current_time - (30 * 24 * 60 * 60)
-
-        for filename in os.listdir(state_dir):
-            if filename.startswith("security_warnings_state_") and filename.endswith(
-                ".json"
-            ):
-                file_path = os.path.join(state_dir, filename)
-                try:
-                    file_mtime = os.path.getmtime(file_path)
-                    if file_mtime < thirty_days_ago:
-                        os.remove(file_path)
-                except (OSError, IOError):
-                    pass  # Ignore errors for individual file cleanup
-    except Exception:
-        pass  # Silently ignore cleanup errors
-
-
-def load_state(session_id):
-    """Load the state of shown warnings from file."""
-    state_file = get_state_file(session_id)
-    if os.path.exists(state_file):
+def get_state_store():
+    """Open the shared state store once per process; None if it is unavailable."""
+    global _state_store
+    if _state_store is None:
         try:
-            with open(state_file, "r") as f:
-                return set(json.load(f))
-        except (json.JSONDecodeError, IOError):
-            return set()
-    return set()
-
-
-def save_state(session_id, shown_warnings):
-    """Save the state of shown warnings to file."""
-    state_file = get_state_file(session_id)
+            _state_store = WarningStateStore()
+            # Periodically expire old sessions (10% chance per opening)
+            if random.random() < 0.1:
+                _state_store.expire()
+        except (sqlite3.Error, OSError) as e:
+            debug_log(f"Failed to open warning state: {e}")
+            _state_store = False
+    return _state_store or None
+
+
+def mark_warnings_shown(session_id, file_path, rule_names):
+    """Record warnings as shown for this session; return the ones that are new."""
+    store = get_state_store()
+    if store is not None:
+        try:
+            return store.mark_shown(session_id, file_path, rule_names)
+        except sqlite3.Error as e:
+            debug_log(f"Failed to update warning state: {e}")
+    return list(rule_names)  # Fail open: show the warnings again
+
+
+class ContentScanner:
+    """Finds every content rule that matches, with the offset of its first hit.
+
+    The literals of all rules are compiled once into a table keyed by literal,
+    so a literal shared by several rules is only searched for once. Each
+    literal is located with str.find, which runs in C and skips through the
+    text far faster than a character-by-character automaton can in Python.
+    """
+
+    def __init__(self, patterns):
+        self.rule_order = []
+        self.literals = {}  # literal -> [ruleName, ...]
+        for pattern in patterns:
+            if "substrings" not in pattern:
+                continue
+            self.rule_order.append(pattern["ruleName"])
+            for substring in pattern["substrings"]:
+                self.literals.setdefault(substring, []).append(pattern["ruleName"])
+
+    def scan(self, content):
+        """Return [(ruleName, literal, offset), ...] in rule order."""
+        first_hits = {}
+        if content:
+            for literal, rule_names in self.literals.items():
+                offset = content.find(literal)
+                if offset < 0:
+                    continue
+                for rule_name in rule_names:
+                    hit = first_hits.get(rule_name)
+                    if hit is None or offset < hit[1]:
+                        first_hits[rule_name] = (literal, offset)
+        return [
+            (rule_name,) + first_hits[rule_name]
+            for rule_name in self.rule_order
+            if rule_name in first_hits
+        ]
+
+
+def build_scanner_index(patterns):
+    """Map each known file extension to a scanner over the rules for it."""
+    rules_by_extension = {ext: [] for exts in LANGUAGE_EXTENSIONS.values() for ext in exts}
+    for pattern in patterns:
+        if "substrings" not in pattern:
+            continue
+        if "languages" in pattern:
+            extensions = {ext for lang in pattern["languages"] for ext in LANGUAGE_EXTENSIONS[lang]}
+        else:
+            extensions = rules_by_extension.keys()
+        for ext in extensions:
+            rules_by_extension[ext].append(pattern)
+    return {ext: ContentScanner(rules) for ext, rules in rules_by_extension.items()}
+
+
+# Compiled once per process: all content rules (for unrecognized file types),
+# one scanner per known extension, and the skip list as a single regex.
+CONTENT_SCANNER = ContentScanner(SECURITY_PATTERNS)
+SCANNERS_BY_EXTENSION = build_scanner_index(SECURITY_PATTERNS)
+SKIP_CONTENT_RE = re.compile("|".join(fnmatch.translate(glob) for glob in SKIP_CONTENT_GLOBS))
+REMINDERS = {pattern["ruleName"]: pattern["reminder"] for pattern in SECURITY_PATTERNS}
+
+# Identifies the content rules in effect, so cached verdicts from an older
+# rule set are never reused.
+PATTERN_SET_VERSION = hashlib.blake2b(
+    repr(
+        (
+            [
+                (p["ruleName"], p.get("languages"), p["substrings"])
+                for p in SECURITY_PATTERNS
+                if "substrings" in p
+            ],
+            LANGUAGE_EXTENSIONS,
+            SKIP_CONTENT_GLOBS,
+        )
+    ).encode("utf-8"),
+    digest_size=8,
+).digest()
+
+
+def content_scanner_for(file_path):
+    """Return the scanner for this file's type, or None to skip content checks."""
+    basename = os.path.basename(file_path).lower()
+    if SKIP_CONTENT_RE.match(basename):
+        return None
+    scanner = SCANNERS_BY_EXTENSION.get(os.path.splitext(basename)[1], CONTENT_SCANNER)
+    return scanner if scanner.literals else None
+
+
+def verdict_digest(file_path, content):
+    """Hash (pattern set, file path, content) into a verdict cache key."""
+    digest = hashlib.blake2b(PATTERN_SET_VERSION, digest_size=16)
+    digest.update(file_path.encode("utf-8", "surrogatepass"))
+    digest.update(b"\0")
+    digest.update(content.encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
+
+def scan_content(scanner, file_path, content, session_id=None):
+    """Return [(ruleName, offset), ...] for the content rules that match.
+
+    Large content is looked up in the session's verdict cache first, so an
+    agent rewriting the same generated file is only scanned once.
+    """
+    store = None
+    if session_id is not None and len(content) >= VERDICT_CACHE_MIN_CHARS:
+        store = get_state_store()
+    if store is None:
+        return [(rule_name, offset) for rule_name, _, offset in scanner.scan(content)]
+
+    digest = verdict_digest(file_path, content)
     try:
-        os.makedirs(os.path.dirname(state_file), exist_ok=True)
-        with open(state_file, "w") as f:
-            json.dump(list(shown_warnings), f)
-    except IOError as e:
-        debug_log(f"Failed to save state file: {e}")
-        pass  # Fail silently if we can't save state
+        cached = store.get_verdict(session_id, digest)
+        if cached is not None:
+            EVENT.update(cache="hit")
+            return cached
+    except sqlite3.Error as e:
+        debug_log(f"Failed to read verdict cache: {e}")
+
+    hits = [(rule_name, offset) for rule_name, _, offset in scanner.scan(content)]
+    EVENT.update(cache="miss")
+    try:
+        store.put_verdict(session_id, digest, hits)
+    except sqlite3.Error as e:
+        debug_log(f"Failed to write verdict cache: {e}")
+    return hits
+
 
+def check_patterns(file_path, content, session_id=None):
+    """Return every security rule matched by the file path or content.
 
-def check_patterns(file_path, content):
-    """Check if file path or content matches any security patterns."""
+    Each match is a (ruleName, reminder, offset) tuple in SECURITY_PATTERNS
+    order; offset is the first content hit, or None for path-based rules.
+    Passing session_id enables the verdict cache for large content.
+    """
     # Normalize path by removing leading slashes
     normalized_path = file_path.lstrip("/")
 
+    matches = []
     for pattern in SECURITY_PATTERNS:
-        # Check path-based patterns
         if "path_check" in pattern and pattern["path_check"](normalized_path):
-            return pattern["ruleName"], pattern["reminder"]
+            matches.append((pattern["ruleName"], pattern["reminder"], None))
 
-        # Check content-based patterns
-        if "substrings" in pattern and content:
-            for substring in pattern["substrings"]:
-                if substring in content:
-                    return pattern["ruleName"], pattern["reminder"]
+    scanner = content_scanner_for(file_path)
+    if scanner is not None and content:
+        for rule_name, offset in scan_content(scanner, file_path, content, session_id):
+            matches.append((rule_name, REMINDERS[rule_name], offset))
 
-    return None, None
+    return matches
 
 
 def extract_content_from_input(tool_name, tool_input):
@@ -221,60 +365,75 @@ def main():
 
     # Only run if security reminders are enabled
     if security_reminder_enabled == "0":
+        EVENT.update(reason="disabled")
         sys.exit(0)
 
-    # Periodically clean up old state files (10% chance per run)
-    if random.random() < 0.1:
-        cleanup_old_state_files()
-
-    # Read input from stdin
+    # Read input from stdin. Values are decoded lazily, so the file content
+    # is only decoded once we know this edit needs to be scanned.
     try:
-        raw_input = sys.stdin.read()
-        input_data = json.loads(raw_input)
+        input_data = read_hook_input()
+
+        # Extract session ID and tool information from the hook input
+        tool_name = input_data.get("tool_name", "")
+        EVENT.update(tool=tool_name)
+
+        # Check if this is a relevant tool
+        if tool_name not in ["Edit", "Write", "MultiEdit"]:
+            EVENT.update(reason="irrelevant_tool")
+            sys.exit(0)  # Allow non-file tools to proceed
+
+        session_id = input_data.get("session_id", "default")
+        tool_input = input_data.get("tool_input", {})
+        EVENT.update(session_id=session_id)
+
+        # Extract file path from tool_input
+        file_path = tool_input.get("file_path", "")
+        if not file_path:
+            EVENT.update(reason="no_file_path")
+            sys.exit(0)  # Allow if no file path
+        EVENT.update(file_path=file_path)
+
+        # Extract content to check, unless no content rule covers this file type
+        content = ""
+        if content_scanner_for(file_path) is not None:
+            content = extract_content_from_input(tool_name, tool_input)
     except json.JSONDecodeError as e:
         debug_log(f"JSON decode error: {e}")
+        EVENT.update(reason="parse_error")
         sys.exit(0)  # Allow tool to proceed if we can't parse input
 
-    # Extract session ID and tool information from the hook input
-    session_id = input_data.get("session_id", "default")
-    tool_name = input_data.get("tool_name", "")
-    tool_input = input_data.get("tool_input", {})
-
-    # Check if this is a relevant tool
-    if tool_name not in ["Edit", "Write", "MultiEdit"]:
-        sys.exit(0)  # Allow non-file tools to proceed
-
-    # Extract file path from tool_input
-    file_path = tool_input.get("file_path", "")
-    if not file_path:
-        sys.exit(0)  # Allow if no file path
-
-    # Extract content to check
-    content = extract_content_from_input(tool_name, tool_input)
-
     # Check for security patterns
-    rule_name, reminder = check_patterns(file_path, content)
-
-    if rule_name and reminder:
-        # Create unique warning key
-        warning_key = f"{file_path}-{rule_name}"
-
-        # Load existing warnings for this session
-        shown_warnings = load_state(session_id)
-
-        # Check if we've already shown this warning in this session
-        if warning_key not in shown_warnings:
-            # Add to shown warnings and save
-            shown_warnings.add(warning_key)
-            save_state(session_id, shown_warnings)
-
-            # Output the warning to stderr and block execution
-            print(reminder, file=sys.stderr)
+    EVENT.update(bytes_scanned=len(content))
+    matches = check_patterns(file_path, content, session_id)
+    EVENT.update(rules_hit=[rule_name for rule_name, _, _ in matches])
+
+    if matches:
+        # Only warn about rules not already shown for this file in this session
+        new_rules = mark_warnings_shown(
+            session_id, file_path, [rule_name for rule_name, _, _ in matches]
+        )
+
+        EVENT.update(warnings_shown=new_rules)
+        if new_rules:
+            EVENT.update(reason="warned")
+            # Output the warnings to stderr and block execution
+            print("\n\n".join(REMINDERS[rule] for rule in new_rules), file=sys.stderr)
             sys.exit(2)  # Block tool execution (exit code 2 for PreToolUse hooks)
 
+        EVENT.update(reason="already_warned")
+    else:
+        EVENT.update(reason="no_match")
+
     # Allow tool to proceed
     sys.exit(0)
 
 
 if __name__ == "__main__":
-    main()
+    decision = "error"
+    try:
+        main()
+    except SystemExit as e:
+        decision = "block" if e.code == 2 else "allow"
+        raise
+    finally:
+        EVENT.flush(decision=decision)
@@ -0,0 +1,178 @@
+"""
+Session warning state for the security reminder hook.
+
+All sessions share one SQLite database in WAL mode, keyed by
+(session, file, rule). Marking a warning as shown is a single INSERT OR IGNORE,
+so concurrent hook processes cannot both show the same warning, and expiring
+old sessions is an indexed DELETE instead of a scan of ~/.claude.
+
+The same database holds a bounded per-session cache of scan verdicts keyed by
+a content hash, so rewriting an unchanged large file skips the rescan.
+"""
+
+import json
+import os
+import sqlite3
+import time
+
+STATE_DIR = os.path.expanduser("~/.claude")
+STATE_DB = os.path.join(STATE_DIR, "security_warnings_state.db")
+LEGACY_PREFIX = "security_warnings_state_"
+MAX_AGE_SECONDS = 30 * 24 * 60 * 60
+VERDICT_CACHE_ENTRIES = 256  # per session
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS shown_warnings (
+    session_id TEXT NOT NULL,
+    file_path TEXT NOT NULL,
+    rule_name TEXT NOT NULL,
+    shown_at REAL NOT NULL,
+    PRIMARY KEY (session_id, file_path, rule_name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS shown_warnings_shown_at ON shown_warnings (shown_at);
+CREATE TABLE IF NOT EXISTS scan_verdicts (
+    session_id TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    matches TEXT NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (session_id, digest)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS scan_verdicts_session_lru ON scan_verdicts (session_id, last_used);
+CREATE INDEX IF NOT EXISTS scan_verdicts_last_used ON scan_verdicts (last_used);
+"""
+
+
+class WarningStateStore:
+    """Records which (file, rule) warnings each session has already seen."""
+
+    def __init__(self, path=STATE_DB, busy_timeout=5.0):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Autocommit mode; writes below use explicit IMMEDIATE transactions.
+        self.conn = sqlite3.connect(path, timeout=busy_timeout, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            self._create_schema()
+
+    def _create_schema(self):
+        with self._transaction():
+            # Re-check under the write lock: another hook may have won the race.
+            version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+            if version >= SCHEMA_VERSION:
+                return
+            for statement in SCHEMA.split(";"):
+                if statement.strip():
+                    self.conn.execute(statement)
+            if version < 1:
+                self._import_legacy_files()
+            self.conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def _import_legacy_files(self):
+        """One-time migration of the old per-session JSON state files."""
+        state_dir = os.path.dirname(self.path)
+        cutoff = time.time() - MAX_AGE_SECONDS
+        for filename in os.listdir(state_dir):
+            if not (filename.startswith(LEGACY_PREFIX) and filename.endswith(".json")):
+                continue
+            file_path = os.path.join(state_dir, filename)
+            session_id = filename[len(LEGACY_PREFIX):-len(".json")]
+            try:
+                shown_at = os.path.getmtime(file_path)
+                if shown_at >= cutoff:
+                    with open(file_path, "r") as f:
+                        warning_keys = json.load(f)
+                    rows = []
+                    for key in warning_keys:
+                        # Legacy keys are f"{file_path}-{rule_name}"; rule
+                        # names never contain "-".
+                        path, _, rule_name = key.rpartition("-")
+                        if path:
+                            rows.append((session_id, path, rule_name, shown_at))
+                    self.conn.executemany(
+                        "INSERT OR IGNORE INTO shown_warnings VALUES (?, ?, ?, ?)",
+                        rows,
+                    )
+                os.remove(file_path)
+            except (OSError, ValueError, TypeError):
+                pass  # Ignore errors for individual legacy files
+
+    def _transaction(self):
+        return _ImmediateTransaction(self.conn)
+
+    def mark_shown(self, session_id, file_path, rule_names):
+        """Record warnings as shown; return the rule names that were new."""
+        now = time.time()
+        new_rules = []
+        with self._transaction():
+            for rule_name in rule_names:
+                cursor = self.conn.execute(
+                    "INSERT OR IGNORE INTO shown_warnings VALUES (?, ?, ?, ?)",
+                    (session_id, file_path, rule_name, now),
+                )
+                if cursor.rowcount:
+                    new_rules.append(rule_name)
+        return new_rules
+
+    def get_verdict(self, session_id, digest):
+        """Return the cached scan matches for a content digest, or None."""
+        row = self.conn.execute(
+            "SELECT matches FROM scan_verdicts WHERE session_id = ? AND digest = ?",
+            (session_id, digest),
+        ).fetchone()
+        if row is None:
+            return None
+        self.conn.execute(
+            "UPDATE scan_verdicts SET last_used = ? WHERE session_id = ? AND digest = ?",
+            (time.time(), session_id, digest),
+        )
+        return [tuple(match) for match in json.loads(row[0])]
+
+    def put_verdict(self, session_id, digest, matches, max_entries=VERDICT_CACHE_ENTRIES):
+        """Cache scan matches for a digest, evicting the session's oldest entries."""
+        with self._transaction():
+            self.conn.execute(
+                "INSERT OR REPLACE INTO scan_verdicts VALUES (?, ?, ?, ?)",
+                (session_id, digest, json.dumps(matches), time.time()),
+            )
+            self.conn.execute(
+                """DELETE FROM scan_verdicts WHERE session_id = ? AND last_used < (
+                       SELECT last_used FROM scan_verdicts WHERE session_id = ?
+                       ORDER BY last_used DESC LIMIT 1 OFFSET ?)""",
+                (session_id, session_id, max_entries - 1),
+            )
+
+    def expire(self, max_age_seconds=MAX_AGE_SECONDS):
+        """Drop warnings and verdicts older than max_age_seconds; return how many."""
+        cutoff = time.time() - max_age_seconds
+        with self._transaction():
+            removed = self.conn.execute(
+                "DELETE FROM shown_warnings WHERE shown_at < ?", (cutoff,)
+            ).rowcount
+            removed += self.conn.execute(
+                "DELETE FROM scan_verdicts WHERE last_used < ?", (cutoff,)
+            ).rowcount
+        return removed
+
+    def close(self):
+        self.conn.close()
+
+
+class _ImmediateTransaction:
+    """BEGIN IMMEDIATE ... COMMIT, rolling back on error.
+
+    Taking the write lock up front makes concurrent hooks queue on the busy
+    timeout instead of failing with "database is locked" on upgrade.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
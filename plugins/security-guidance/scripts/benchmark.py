@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the security reminder hook.
+
+Usage:
+    python3 benchmark.py input [--size-mb 10] [--repeat 5]
+    python3 benchmark.py scan [--size-mb 10] [--repeat 5]
+    python3 benchmark.py cache [--size-mb 10] [--repeat 5]
+"""
+
+import argparse
+import io
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "hooks"))
+
+from hook_input import get_path, read_hook_input  # noqa: E402
+import security_reminder_hook  # noqa: E402
+from security_reminder_hook import CONTENT_SCANNER, SECURITY_PATTERNS  # noqa: E402
+from state_store import WarningStateStore  # noqa: E402
+
+SAMPLE_LINE = 'const el = document.getElementById("app"); render(el, {"title": "x\\ty"});\n'
+
+
+def make_payload(size_mb, tool_name="Write", file_path="/repo/src/generated/bundle.js"):
+    """Build a PreToolUse payload whose content is roughly size_mb megabytes."""
+    content = SAMPLE_LINE * max(1, int(size_mb * 1024 * 1024) // len(SAMPLE_LINE))
+    return json.dumps(
+        {
+            "session_id": "benchmark-session",
+            "transcript_path": "/tmp/transcript.jsonl",
+            "cwd": "/repo",
+            "hook_event_name": "PreToolUse",
+            "tool_name": tool_name,
+            "tool_input": {"file_path": file_path, "content": content},
+        }
+    )
+
+
+def best_of(repeat, func):
+    """Return the fastest of `repeat` runs of func(), in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def stdin_like(payload):
+    """Wrap a payload the way sys.stdin presents it to a hook."""
+    return io.TextIOWrapper(io.BytesIO(payload), encoding="utf-8")
+
+
+def bench_input(args):
+    payload = make_payload(args.size_mb).encode("utf-8")
+    print(f"Payload: {len(payload) / 1024 / 1024:.1f} MB, best of {args.repeat}")
+
+    def eager_tool_name():
+        json.load(stdin_like(payload))["tool_name"]
+
+    def lazy_tool_name():
+        read_hook_input(stdin_like(payload))["tool_name"]
+
+    def lazy_file_path():
+        get_path(read_hook_input(stdin_like(payload)), "tool_input.file_path")
+
+    def lazy_content():
+        get_path(read_hook_input(stdin_like(payload)), "tool_input.content")
+
+    cases = [
+        ("json.load, read tool_name", eager_tool_name),
+        ("lazy, read tool_name", lazy_tool_name),
+        ("lazy, read tool_input.file_path", lazy_file_path),
+        ("lazy, read tool_input.content", lazy_content),
+    ]
+    baseline = None
+    for label, func in cases:
+        elapsed = best_of(args.repeat, func)
+        baseline = baseline or elapsed
+        print(f"  {label:<34} {elapsed:9.2f} ms  ({baseline / elapsed:6.1f}x)")
+
+
+def first_hit_scan(content):
+    """The pre-scanner check: one `in` per substring, stop at the first hit."""
+    for pattern in SECURITY_PATTERNS:
+        for substring in pattern.get("substrings", []):
+            if substring in content:
+                return pattern["ruleName"]
+    return None
+
+
+def bench_scan(args):
+    clean = SAMPLE_LINE * max(1, int(args.size_mb * 1024 * 1024) // len(SAMPLE_LINE))
+    # Hits spread through the file, so first-hit and all-matches differ
+    dirty = "eval(x)\n" + clean + "el.innerHTML = html;\nimport pickle\n"
+    literals = sorted(CONTENT_SCANNER.literals, key=len, reverse=True)
+    alternation = re.compile("|".join(re.escape(literal) for literal in literals))
+
+    cases = [
+        ("first hit (`in` per substring)", first_hit_scan),
+        ("ContentScanner.scan, all rules", CONTENT_SCANNER.scan),
+        ("regex alternation, one pass", lambda text: alternation.findall(text)),
+    ]
+    try:
+        import ahocorasick
+
+        automaton = ahocorasick.Automaton()
+        for literal in literals:
+            automaton.add_word(literal, literal)
+        automaton.make_automaton()
+        cases.append(("pyahocorasick, one pass", lambda text: list(automaton.iter(text))))
+    except ImportError:
+        print("(pyahocorasick not installed; skipping the C automaton)")
+
+    for name, content in (("clean", clean), ("with hits", dirty)):
+        size_mb = len(content) / 1024 / 1024
+        print(f"Content: {size_mb:.1f} MB, {name}, best of {args.repeat}")
+        print(f"  matches: {[rule for rule, _, _ in CONTENT_SCANNER.scan(content)]}")
+        for label, func in cases:
+            elapsed = best_of(args.repeat, lambda: func(content))
+            print(f"  {label:<34} {elapsed:9.2f} ms  ({size_mb / elapsed * 1000:7.1f} MB/s)")
+
+
+def bench_cache(args):
+    content = SAMPLE_LINE * max(1, int(args.size_mb * 1024 * 1024) // len(SAMPLE_LINE))
+    file_path = "/repo/src/generated/bundle.js"
+    print(f"Content: {len(content) / 1024 / 1024:.1f} MB, best of {args.repeat}")
+
+    with tempfile.TemporaryDirectory() as state_dir:
+        store = WarningStateStore(os.path.join(state_dir, "state.db"))
+        security_reminder_hook._state_store = store
+
+        def uncached():
+            security_reminder_hook.check_patterns(file_path, content)
+
+        def cold():
+            store.conn.execute("DELETE FROM scan_verdicts")
+            security_reminder_hook.check_patterns(file_path, content, "bench")
+
+        def warm():
+            security_reminder_hook.check_patterns(file_path, content, "bench")
+
+        cases = [("no cache", uncached), ("cache miss (scan + store)", cold), ("cache hit", warm)]
+        for label, func in cases:
+            print(f"  {label:<34} {best_of(args.repeat, func):9.2f} ms")
+        store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    input_parser = subparsers.add_parser("input", help="Eager vs lazy hook input decoding")
+    input_parser.add_argument("--size-mb", type=float, default=10)
+    input_parser.add_argument("--repeat", type=int, default=5)
+    input_parser.set_defaults(func=bench_input)
+
+    scan_parser = subparsers.add_parser("scan", help="Content rule scanning throughput")
+    scan_parser.add_argument("--size-mb", type=float, default=10)
+    scan_parser.add_argument("--repeat", type=int, default=5)
+    scan_parser.set_defaults(func=bench_scan)
+
+    cache_parser = subparsers.add_parser("cache", help="Verdict cache hit vs rescan")
+    cache_parser.add_argument("--size-mb", type=float, default=10)
+    cache_parser.add_argument("--repeat", type=int, default=5)
+    cache_parser.set_defaults(func=bench_cache)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
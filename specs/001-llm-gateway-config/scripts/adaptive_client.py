@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Adaptive client-side rate limiting for gateway scripts
+
+Purpose: Let long sweeps and load tests run at the highest rate the gateway
+         accepts instead of hammering it and counting 429s as failures.
+
+AdaptiveSession is a drop-in requests.Session. Every request passes through
+an AdaptiveRateLimiter, which
+  - caps requests in flight with AIMD: +1 per window of successes, halved on
+    a 429/503 (at most once per round trip, like TCP congestion control);
+  - paces requests with a token bucket once the gateway's X-RateLimit-* /
+    RateLimit-* headers show the budget nearly spent (or after a 429),
+    spreading what remains until the reset; no pacing while budget is ample;
+  - pauses all callers until Retry-After has passed after a 429.
+
+Example:
+    session = AdaptiveSession(max_concurrency=32, max_retries=2)
+    session.post(f"{url}/v1/messages", json=payload, headers=headers)
+"""
+
+import threading
+import time
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Dict, Mapping, Optional
+
+import requests
+
+# Header names in the formats RateLimitTester.extract_rate_limit_headers reads
+LIMIT_HEADERS = ("X-RateLimit-Limit", "X-Rate-Limit-Limit", "RateLimit-Limit",
+                 "X-RateLimit-Limit-Requests")
+REMAINING_HEADERS = ("X-RateLimit-Remaining", "X-Rate-Limit-Remaining", "RateLimit-Remaining",
+                     "X-RateLimit-Remaining-Requests")
+RESET_HEADERS = ("X-RateLimit-Reset", "X-Rate-Limit-Reset", "RateLimit-Reset",
+                 "X-RateLimit-Reset-Requests")
+THROTTLE_STATUSES = (429, 503)
+
+
+def _header(headers: Mapping[str, str], names) -> Optional[str]:
+    lowered = {key.lower(): value for key, value in headers.items()}
+    for name in names:
+        value = lowered.get(name.lower())
+        if value is not None:
+            return value
+    return None
+
+
+def _seconds(value: Optional[str], now: float) -> Optional[float]:
+    """Seconds from now for a delay, epoch timestamp, HTTP date or "1m30s" duration."""
+    if value is None:
+        return None
+    value = value.strip()
+    try:
+        number = float(value.rstrip("s"))
+        return max(number - now, 0.0) if number > 1e9 else number
+    except ValueError:
+        pass
+    if value[-1:] in ("s", "m", "h") and any(ch.isdigit() for ch in value):
+        # Go-style durations such as "1m30s" or "250ms"
+        total, number = 0.0, ""
+        units = {"h": 3600, "m": 60, "s": 1, "ms": 0.001}
+        rest = value
+        while rest:
+            while rest and (rest[0].isdigit() or rest[0] == "."):
+                number, rest = number + rest[0], rest[1:]
+            unit = "ms" if rest.startswith("ms") else rest[:1]
+            if not number or unit not in units:
+                return None
+            total += float(number) * units[unit]
+            number, rest = "", rest[len(unit):]
+        return total
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - now, 0.0)
+    except (TypeError, ValueError):
+        pass
+    try:
+        # RFC 3339, as in anthropic-ratelimit-*-reset
+        return max(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp() - now, 0.0)
+    except ValueError:
+        return None
+
+
+def parse_rate_limit_headers(headers: Mapping[str, str]) -> Dict[str, Optional[float]]:
+    """Limit, remaining budget and reset/retry delays (seconds) from response headers."""
+    now = time.time()
+
+    def number(names) -> Optional[float]:
+        value = _header(headers, names)
+        try:
+            # IETF drafts allow "100, 100;w=60"; the first item is the one that applies
+            return float(value.split(",")[0].split(";")[0]) if value is not None else None
+        except ValueError:
+            return None
+
+    return {
+        "limit": number(LIMIT_HEADERS),
+        "remaining": number(REMAINING_HEADERS),
+        "reset": _seconds(_header(headers, RESET_HEADERS), now),
+        "retry_after": _seconds(_header(headers, ("Retry-After",)), now),
+    }
+
+
+class TokenBucket:
+    """Thread-safe pacing: `rate` requests/second with bursts up to `capacity`."""
+
+    def __init__(self, rate: Optional[float] = None, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def set_rate(self, rate: Optional[float], capacity: Optional[float] = None):
+        with self.lock:
+            self._refill()
+            self.rate = rate
+            if capacity is not None:
+                self.capacity = max(1.0, capacity)
+                self.tokens = min(self.tokens, self.capacity)
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.rate:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self) -> float:
+        """Block until a token is available; return seconds waited."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                if not self.rate:
+                    return waited
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class AdaptiveRateLimiter:
+    """AIMD concurrency window plus header-driven token-bucket pacing."""
+
+    def __init__(self, max_concurrency: int = 16, initial_concurrency: Optional[int] = None,
+                 min_concurrency: int = 1, decrease_factor: float = 0.5,
+                 window_seconds: float = 60.0, rate: Optional[float] = None,
+                 low_water: float = 0.1):
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.window = float(initial_concurrency or self.max_concurrency)
+        self.decrease_factor = decrease_factor
+        self.window_seconds = window_seconds  # Period a bare "limit" header refers to
+        self.low_water = low_water  # Fraction of the limit left when pacing starts
+        self.rate = rate
+        self.bucket = TokenBucket(rate, capacity=self.max_concurrency)
+        self.condition = threading.Condition()
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.last_decrease = 0.0
+        self.backoff = 1.0
+        self.stats = {"requests": 0, "throttled": 0, "waited_seconds": 0.0, "min_window": self.window}
+
+    def acquire(self) -> float:
+        """Wait for a concurrency slot, any Retry-After pause and a pacing token.
+
+        Returns the monotonic time the request was admitted; pass it to release().
+        """
+        start = time.monotonic()
+        with self.condition:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    self.condition.wait(self.paused_until - now)
+                elif self.in_flight >= int(self.window):
+                    self.condition.wait()
+                else:
+                    self.in_flight += 1
+                    break
+        self.bucket.acquire()
+        admitted = time.monotonic()
+        with self.condition:
+            self.stats["requests"] += 1
+            self.stats["waited_seconds"] += admitted - start
+        return admitted
+
+    def release(self, admitted: float, status: Optional[int], headers: Mapping[str, str]):
+        """Record a finished request (status None for a transport error)."""
+        info = parse_rate_limit_headers(headers or {})
+        now = time.monotonic()
+        with self.condition:
+            self.in_flight -= 1
+            if status in THROTTLE_STATUSES:
+                self.stats["throttled"] += 1
+                # One decrease per round trip: requests sent before the last
+                # cut were already in flight when it happened.
+                if admitted >= self.last_decrease:
+                    self.window = max(self.min_concurrency, self.window * self.decrease_factor)
+                    self.stats["min_window"] = min(self.stats["min_window"], self.window)
+                    self.last_decrease = now
+                delay = info["retry_after"]
+                if delay is None:
+                    delay = self.backoff
+                    self.backoff = min(self.backoff * 2, 60.0)
+                self.paused_until = max(self.paused_until, now + delay)
+            elif status is not None and status < 500:
+                self.window = min(self.max_concurrency, self.window + 1.0 / self.window)
+                self.backoff = 1.0
+            window = self.window
+            self.condition.notify_all()
+        self._update_pacing(info, status in THROTTLE_STATUSES, window)
+
+    def _update_pacing(self, info: Dict[str, Optional[float]], throttled: bool, window: float):
+        """Pace only when the budget is nearly spent or the gateway throttled us."""
+        limit, remaining, reset = info["limit"], info["remaining"], info["reset"]
+        if not limit:
+            return
+        # Requests already in flight will spend budget too
+        if not throttled and remaining is not None and remaining > max(window, limit * self.low_water):
+            self.bucket.set_rate(self.rate, capacity=self.max_concurrency)
+            return
+        # The long-run rate, or what is left spread evenly until the reset if
+        # that is faster (a token bucket's reset is when it is full again)
+        rate = limit / self.window_seconds
+        if remaining and reset:
+            rate = max(rate, remaining / reset)
+        self.bucket.set_rate(rate, capacity=max(1.0, min(remaining or 1.0, self.max_concurrency)))
+
+    def snapshot(self) -> Dict:
+        with self.condition:
+            return {
+                **{key: round(value, 3) if isinstance(value, float) else value
+                   for key, value in self.stats.items()},
+                "window": round(self.window, 2),
+                "pacing_rate": round(self.bucket.rate, 3) if self.bucket.rate else None,
+            }
+
+
+class AdaptiveSession(requests.Session):
+    """requests.Session that runs every request through an AdaptiveRateLimiter.
+
+    With max_retries > 0, a throttled request (429) is retried after the
+    limiter's Retry-After pause instead of being returned.
+    """
+
+    def __init__(self, limiter: Optional[AdaptiveRateLimiter] = None, max_retries: int = 0,
+                 **limiter_options):
+        super().__init__()
+        self.limiter = limiter or AdaptiveRateLimiter(**limiter_options)
+        self.max_retries = max_retries
+
+    def request(self, method, url, *args, **kwargs):
+        attempt = 0
+        while True:
+            admitted = self.limiter.acquire()
+            try:
+                response = super().request(method, url, *args, **kwargs)
+            except Exception:
+                self.limiter.release(admitted, None, {})
+                raise
+            self.limiter.release(admitted, response.status_code, response.headers)
+            if response.status_code != 429 or attempt >= self.max_retries:
+                return response
+            attempt += 1
+            response.close()
@@ -3,20 +3,36 @@
 Model Availability Checker
 Purpose: Verify which Vertex AI models are available in your GCP project/region
 Usage: python check-model-availability.py [--project PROJECT_ID] [--location LOCATION]
+       python check-model-availability.py --matrix [--locations us-central1,europe-west1] [--json]
+
+Matrix mode checks every model in VERTEX_AI_MODELS in every listed region
+on a bounded thread pool. Results are cached on disk per backend, project
+and region (~/.cache/llm-gateway-config/availability, or
+$GATEWAY_AVAILABILITY_CACHE_DIR; "off" disables it) and reused for
+--cache-ttl seconds. The backend is any callable(project_id, location,
+model_id) -> {"available": bool, "error": str or None, ...}; pass one to
+check_matrix(), or --backend module:function, to run against a stub offline.
 """
 
 import argparse
+import hashlib
+import importlib
 import json
+import os
 import sys
-from typing import Dict, Any
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Optional
 
 try:
     from google.cloud import aiplatform
     from google.api_core import exceptions
 except ImportError:
-    print("Error: google-cloud-aiplatform is required", file=sys.stderr)
-    print("Install with: pip install google-cloud-aiplatform", file=sys.stderr)
-    sys.exit(1)
+    # Only the default backend needs it; main() reports the missing package
+    aiplatform = None
 
 
 # Model definitions from research.md
@@ -71,6 +87,16 @@ VERTEX_AI_MODELS = [
     },
 ]
 
+# Regions matrix mode checks by default (the common regions validate-config.py knows)
+DEFAULT_MATRIX_LOCATIONS = ["us-central1", "us-east1", "us-west1", "europe-west1", "asia-east1"]
+DEFAULT_CACHE_TTL = 3600
+CACHE_ENV = "GATEWAY_AVAILABILITY_CACHE_DIR"
+
+Backend = Callable[[str, str, str], Dict[str, Any]]
+
+# aiplatform.init() sets process-wide defaults; serialize it across matrix workers
+_init_lock = threading.Lock()
+
 
 def check_model_availability(
     project_id: str,
@@ -84,7 +110,8 @@ def check_model_availability(
         dict with keys: available (bool), error (str or None)
     """
     try:
-        aiplatform.init(project=project_id, location=location)
+        with _init_lock:
+            aiplatform.init(project=project_id, location=location)
         
         # Try to get model information
         # Note: This is a simplified check. In production, you might want to
@@ -112,10 +139,177 @@ def check_model_availability(
     except Exception as e:
         return {
             "available": False,
-            "error": f"Error: {str(e)}"
+            "error": f"Error: {str(e)}",
+            "retryable": True  # Not cached: may be a transient failure
         }
 
 
+def _cache_dir() -> Path:
+    configured = os.environ.get(CACHE_ENV)
+    if configured:
+        return Path(configured)
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "llm-gateway-config" / "availability"
+
+
+def _cache_path(backend_name: str, project_id: str, location: str) -> Path:
+    # Hashed so project/backend names never form odd paths
+    key = hashlib.sha256(f"{backend_name}\0{project_id}\0{location}".encode()).hexdigest()[:32]
+    return _cache_dir() / f"{key}.json"
+
+
+def load_cached_region(backend_name: str, project_id: str, location: str,
+                       ttl: float) -> Optional[Dict[str, Any]]:
+    """Cached {"checked_at", "models"} for a region, or None if missing or older than ttl."""
+    if os.environ.get(CACHE_ENV) == "off" or ttl <= 0:
+        return None
+    try:
+        with open(_cache_path(backend_name, project_id, location)) as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if time.time() - entry.get("checked_at", 0) > ttl:
+        return None
+    return entry
+
+
+def store_cached_region(backend_name: str, project_id: str, location: str,
+                        models: Dict[str, Dict[str, Any]]):
+    """Write a region's results atomically; a cache that cannot be written is skipped."""
+    if os.environ.get(CACHE_ENV) == "off":
+        return
+    path = _cache_path(backend_name, project_id, location)
+    entry = {
+        "backend": backend_name,
+        "project": project_id,
+        "location": location,
+        "checked_at": time.time(),
+        "models": models,
+    }
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+        fd, temp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(entry, f, indent=2)
+        os.replace(temp, path)
+    except OSError:
+        pass
+
+
+def check_matrix(
+    project_id: str,
+    locations: List[str],
+    models: List[Dict[str, str]] = VERTEX_AI_MODELS,
+    backend: Backend = check_model_availability,
+    max_workers: int = 8,
+    cache_ttl: float = DEFAULT_CACHE_TTL,
+    backend_name: Optional[str] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Check every model in every location, concurrently.
+    
+    Regions with a fresh cache entry are answered from it; the remaining
+    (location, model) pairs run on a pool of max_workers threads.
+    
+    Returns:
+        {location: {"cached": bool, "checked_at": float, "models": {model_id: result}}}
+    """
+    backend_name = backend_name or f"{backend.__module__}.{backend.__qualname__}"
+    matrix: Dict[str, Dict[str, Any]] = {}
+    pending = []
+    for location in locations:
+        cached = load_cached_region(backend_name, project_id, location, cache_ttl)
+        model_results = cached["models"] if cached else {}
+        if cached and all(model["id"] in model_results for model in models):
+            matrix[location] = {"cached": True, "checked_at": cached["checked_at"],
+                                "models": model_results}
+        else:
+            matrix[location] = {"cached": False, "checked_at": time.time(), "models": {}}
+            pending.extend((location, model["id"]) for model in models)
+    
+    def run(pair):
+        location, model_id = pair
+        try:
+            return backend(project_id, location, model_id)
+        except Exception as e:
+            # A backend bug should cost one cell, not the whole matrix
+            return {"available": False, "error": f"Error: {e}", "retryable": True}
+    
+    if pending:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending)))) as pool:
+            for (location, model_id), result in zip(pending, pool.map(run, pending)):
+                matrix[location]["models"][model_id] = result
+    
+    for location, entry in matrix.items():
+        if not entry["cached"]:
+            stable = {model_id: result for model_id, result in entry["models"].items()
+                      if not result.get("retryable")}
+            if len(stable) == len(entry["models"]):
+                store_cached_region(backend_name, project_id, location, stable)
+    
+    return matrix
+
+
+def load_backend(spec: str) -> Backend:
+    """Resolve --backend module:function (module importable from the current path)."""
+    module_name, _, function_name = spec.partition(":")
+    if not function_name:
+        raise ValueError(f"--backend must look like module:function, got '{spec}'")
+    sys.path.insert(0, os.getcwd())
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def print_matrix(project_id: str, matrix: Dict[str, Dict[str, Any]],
+                 models: List[Dict[str, str]] = VERTEX_AI_MODELS):
+    """Print a models × regions availability table."""
+    locations = list(matrix)
+    print("=" * 60)
+    print("Vertex AI Model Availability Matrix")
+    print("=" * 60)
+    print()
+    print(f"Project: {project_id}")
+    print(f"Regions: {', '.join(locations)}")
+    print()
+    
+    width = max(14, max(len(location) for location in locations) + 2)
+    print(f"{'Model':<20} {'Priority':<9}" + "".join(f"{location:>{width}}" for location in locations))
+    print("-" * (30 + width * len(locations)))
+    for model in models:
+        cells = []
+        for location in locations:
+            result = matrix[location]["models"].get(model["id"], {})
+            cells.append("✓" if result.get("available") else "✗")
+        print(f"{model['name']:<20} {model['priority']:<9}" + "".join(f"{cell:>{width}}" for cell in cells))
+    
+    print()
+    for location in locations:
+        entry = matrix[location]
+        available = sum(1 for result in entry["models"].values() if result.get("available"))
+        source = (f"cached {time.time() - entry['checked_at']:.0f}s ago" if entry["cached"]
+                  else "checked now")
+        print(f"  {location}: {available}/{len(models)} available ({source})")
+        for model_id, result in entry["models"].items():
+            if result.get("error"):
+                print(f"    ✗ {model_id}: {result['error']}")
+    
+    missing = unavailable_everywhere(matrix, models)
+    print()
+    if missing:
+        print(f"⚠️  Not available in any listed region: {', '.join(missing)}")
+    else:
+        print("✓ Every model is available in at least one region")
+    print()
+
+
+def unavailable_everywhere(matrix: Dict[str, Dict[str, Any]],
+                           models: List[Dict[str, str]] = VERTEX_AI_MODELS) -> List[str]:
+    """Names of models no listed region can serve."""
+    return [
+        model["name"] for model in models
+        if not any(entry["models"].get(model["id"], {}).get("available") for entry in matrix.values())
+    ]
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Check Vertex AI model availability",
@@ -124,6 +318,13 @@ def main():
 Examples:
   python check-model-availability.py --project my-project --location us-central1
   python check-model-availability.py --project my-project --location us-central1 --json
+
+  # All models across regions, 8 checks at a time, cached for an hour
+  python check-model-availability.py --project my-project --matrix \\
+    --locations us-central1,us-east5,europe-west1 --max-workers 8
+
+  # Offline, against a stub backend: def check(project, location, model_id) -> dict
+  python check-model-availability.py --project test --matrix --backend stub_backend:check
         """
     )
     parser.add_argument(
@@ -140,9 +341,54 @@ Examples:
         action="store_true",
         help="Output results as JSON"
     )
+    parser.add_argument(
+        "--matrix",
+        action="store_true",
+        help="Check all models across --locations concurrently"
+    )
+    parser.add_argument(
+        "--locations",
+        default=",".join(DEFAULT_MATRIX_LOCATIONS),
+        help=f"Comma-separated regions for --matrix (default: {','.join(DEFAULT_MATRIX_LOCATIONS)})"
+    )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=8,
+        help="Checks in flight at once in --matrix mode (default: 8)"
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=DEFAULT_CACHE_TTL,
+        help=f"Reuse cached --matrix results younger than this many seconds; 0 = always recheck (default: {DEFAULT_CACHE_TTL})"
+    )
+    parser.add_argument(
+        "--backend",
+        help="Availability backend for --matrix as module:function (default: Vertex AI via google-cloud-aiplatform)"
+    )
     
     args = parser.parse_args()
     
+    locations = [location.strip() for location in args.locations.split(",") if location.strip()]
+    if args.matrix and not locations:
+        parser.error("--locations must name at least one region")
+    if args.backend and not args.matrix:
+        parser.error("--backend is only used with --matrix")
+    
+    if args.backend:
+        try:
+            backend = load_backend(args.backend)
+        except (ImportError, AttributeError, ValueError) as e:
+            print(f"Error: cannot load backend '{args.backend}': {e}", file=sys.stderr)
+            sys.exit(1)
+    elif aiplatform is None:
+        print("Error: google-cloud-aiplatform is required", file=sys.stderr)
+        print("Install with: pip install google-cloud-aiplatform", file=sys.stderr)
+        sys.exit(1)
+    else:
+        backend = check_model_availability
+    
     # Get project ID from gcloud if not provided
     if not args.project:
         try:
@@ -159,6 +405,30 @@ Examples:
             print("Please provide --project argument or set gcloud config", file=sys.stderr)
             sys.exit(1)
     
+    if args.matrix:
+        matrix = check_matrix(args.project, locations, backend=backend,
+                              max_workers=args.max_workers, cache_ttl=args.cache_ttl,
+                              backend_name=args.backend or "vertex")
+        missing = unavailable_everywhere(matrix)
+        if args.json:
+            print(json.dumps({
+                "project": args.project,
+                "locations": locations,
+                "matrix": matrix,
+                "summary": {
+                    "total": len(VERTEX_AI_MODELS),
+                    "regions": len(locations),
+                    "available": {
+                        location: sum(1 for r in matrix[location]["models"].values() if r.get("available"))
+                        for location in locations
+                    },
+                    "unavailable_everywhere": missing
+                }
+            }, indent=2))
+        else:
+            print_matrix(args.project, matrix)
+        sys.exit(1 if missing else 0)
+    
     if not args.json:
         print("=" * 60)
         print("Vertex AI Model Availability Check")
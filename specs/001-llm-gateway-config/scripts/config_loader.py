@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Shared YAML config loading for the gateway scripts
+
+Purpose: Parse each LiteLLM config once per content, however many validators
+         in a process read it. validate-config.py,
+         validate-provider-env-vars.py, migrate-config.py,
+         tests/test-yaml-schemas.py and gateway-doctor.py all load configs
+         through here.
+
+- Parsing uses libyaml's CSafeLoader when PyYAML was built with it (roughly
+  10x faster on large configs), else the pure-Python SafeLoader.
+- Parsed configs are cached in-process by path. A file whose size and mtime
+  are unchanged is served without being read; otherwise it is re-read and
+  only re-parsed when its sha256 changed.
+- Callers get an immutable view (FrozenDict / FrozenList, which still pass
+  isinstance checks for dict / list) so one caller cannot change what the
+  next one sees. Use load_config_copy() or copy.deepcopy() for a mutable copy.
+
+Requires PyYAML.
+"""
+
+import hashlib
+import io
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+import yaml
+
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def _immutable(self, *args, **kwargs):
+    raise TypeError(f"{type(self).__name__} is read-only; use load_config_copy() to edit a config")
+
+
+class FrozenDict(dict):
+    """Read-only dict returned by load_config()"""
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = __ior__ = _immutable
+
+    def __reduce__(self):
+        return FrozenDict, (dict(self),)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+
+class FrozenList(list):
+    """Read-only list returned by load_config()"""
+
+    __setitem__ = __delitem__ = append = extend = insert = pop = remove = clear = _immutable
+    sort = reverse = __iadd__ = __imul__ = _immutable
+
+    def __reduce__(self):
+        return FrozenList, (list(self),)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+
+# Let yaml.dump / yaml.safe_dump write frozen views like plain mappings and lists
+for _dumper in (yaml.Dumper, yaml.SafeDumper):
+    yaml.add_representer(FrozenDict, yaml.representer.SafeRepresenter.represent_dict, Dumper=_dumper)
+    yaml.add_representer(FrozenList, yaml.representer.SafeRepresenter.represent_list, Dumper=_dumper)
+
+
+def freeze(value: Any) -> Any:
+    """Immutable view of parsed YAML data."""
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return FrozenList(freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Plain, mutable deep copy of (possibly frozen) parsed YAML data."""
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [thaw(item) for item in value]
+    return value
+
+
+def parse_yaml(text: Union[str, bytes], name: Optional[str] = None) -> Any:
+    """Parse YAML with the fastest available safe loader; name labels error marks."""
+    if name is not None:
+        stream = io.BytesIO(text) if isinstance(text, bytes) else io.StringIO(text)
+        stream.name = name
+        return yaml.load(stream, Loader=SafeLoader)
+    return yaml.load(text, Loader=SafeLoader)
+
+
+# resolved path -> ((size, mtime_ns), sha256, frozen view)
+_memory: Dict[str, Tuple[Tuple[int, int], str, Any]] = {}
+_lock = threading.Lock()
+stats = {"memory_hits": 0, "parses": 0}
+
+
+def load_config(path: Union[str, Path]) -> Any:
+    """Parsed YAML file as an immutable view, parsing only when its content is new.
+    
+    Raises OSError for unreadable files and yaml.YAMLError for invalid YAML,
+    like open() + yaml.safe_load().
+    """
+    path = Path(path)
+    key = str(path.resolve())
+    stat = path.stat()
+    signature = (stat.st_size, stat.st_mtime_ns)
+
+    with _lock:
+        cached = _memory.get(key)
+        if cached and cached[0] == signature:
+            stats["memory_hits"] += 1
+            return cached[2]
+
+    with open(path, "rb") as f:
+        content = f.read()
+    digest = hashlib.sha256(content).hexdigest()
+    if cached and cached[1] == digest:
+        # Touched but unchanged: keep the parse, remember the new mtime
+        view = cached[2]
+        stats["memory_hits"] += 1
+    else:
+        view = freeze(parse_yaml(content, str(path)))
+        stats["parses"] += 1
+
+    with _lock:
+        _memory[key] = (signature, digest, view)
+    return view
+
+
+def load_config_copy(path: Union[str, Path]) -> Any:
+    """Parsed YAML file as plain, mutable dicts and lists (still cached)."""
+    return thaw(load_config(path))
+
+
+def clear_cache():
+    """Drop the in-process cache."""
+    with _lock:
+        _memory.clear()
+
+
+if __name__ == "__main__":
+    # Parse check: python config_loader.py config.yaml [...]
+    for name in sys.argv[1:]:
+        try:
+            load_config(name)
+        except (OSError, yaml.YAMLError) as e:
+            print(f"Error: {name}: {e}", file=sys.stderr)
+            sys.exit(1)
+    print(f"loader={SafeLoader.__name__} {stats}")
@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""
+Gateway Doctor - In-Process Validation Runner
+
+Purpose: Run every gateway validator in one Python process and produce one
+         combined report, instead of validate-all.sh starting a fresh
+         interpreter (imports, YAML parse) per script, one after another
+Usage: python gateway-doctor.py --config litellm_config.yaml [--url URL --token KEY] [--json]
+
+The validators are imported as modules and run as a dependency graph:
+  offline   yaml-schemas        YAMLSchemaValidator   (tests/test-yaml-schemas.py)
+            config              ConfigValidator       (validate-config.py)
+            provider-env        provider env vars     (validate-provider-env-vars.py), after config
+            env-vars            EnvVarValidator       (tests/test-env-vars.py)
+            proxy-auth          proxy auth method     (validate-proxy-auth.py)
+  network   gateway-health      GET /health, after env-vars
+            gateway-compat      GatewayValidator      (validate-gateway-compatibility.py), after gateway-health
+            proxy-connectivity  request through the proxy (validate-proxy-auth.py), after proxy-auth
+
+All offline checks start at once; network checks start as soon as their
+dependencies pass, at most --network-concurrency at a time. A check whose
+dependency failed or was skipped is skipped. Each check's printed output is
+captured separately (shown with --verbose, included in --json), so
+concurrent checks never interleave.
+
+Exit Codes: 0 (no check failed), 1 (a check failed)
+"""
+
+import argparse
+import importlib.util
+import io
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+TESTS_DIR = SCRIPTS_DIR.parent / "tests"
+TEMPLATES_DIR = SCRIPTS_DIR.parent / "templates"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+# Modules imported by the checks: name -> file (hyphenated names need importlib)
+VALIDATOR_FILES = {
+    "validate_config": SCRIPTS_DIR / "validate-config.py",
+    "validate_provider_env_vars": SCRIPTS_DIR / "validate-provider-env-vars.py",
+    "validate_proxy_auth": SCRIPTS_DIR / "validate-proxy-auth.py",
+    "validate_gateway_compatibility": SCRIPTS_DIR / "validate-gateway-compatibility.py",
+    "test_yaml_schemas": TESTS_DIR / "test-yaml-schemas.py",
+    "test_env_vars": TESTS_DIR / "test-env-vars.py",
+}
+STATUSES = ("pass", "warn", "fail", "skip")
+
+
+class Colors:
+    """ANSI color codes for terminal output"""
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    YELLOW = '\033[93m'
+    BLUE = '\033[94m'
+    BOLD = '\033[1m'
+    RESET = '\033[0m'
+
+
+STATUS_LABELS = {
+    "pass": f"{Colors.GREEN}✓ PASS{Colors.RESET}",
+    "warn": f"{Colors.YELLOW}⚠ WARN{Colors.RESET}",
+    "fail": f"{Colors.RED}✗ FAIL{Colors.RESET}",
+    "skip": f"{Colors.BLUE}- SKIP{Colors.RESET}",
+}
+
+_modules: Dict[str, Any] = {}
+_modules_lock = threading.Lock()
+
+
+def load_validator(name: str):
+    """Import a validator module once, from any check thread"""
+    with _modules_lock:
+        if name not in _modules:
+            spec = importlib.util.spec_from_file_location(name, VALIDATOR_FILES[name])
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            _modules[name] = module
+        return _modules[name]
+
+
+class ThreadOutput(io.TextIOBase):
+    """sys.stdout/sys.stderr stand-in routing each check thread's prints to its own buffer"""
+
+    def __init__(self, stream, local: threading.local):
+        self.stream = stream
+        self.local = local
+
+    def write(self, text: str) -> int:
+        buffer = getattr(self.local, "buffer", None)
+        return (self.stream if buffer is None else buffer).write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+    def isatty(self) -> bool:
+        return False
+
+
+def result(status: str, summary: str, details: Optional[List[str]] = None, **data) -> Dict:
+    """Outcome of one check"""
+    return {"status": status, "summary": summary, "details": details or [], "data": data}
+
+
+class Check:
+    """One node of the check graph"""
+
+    def __init__(self, name: str, kind: str, run: Callable[[], Dict],
+                 depends_on: Optional[List[str]] = None, skip_reason: Optional[str] = None):
+        self.name = name
+        self.kind = kind  # "offline" or "network"
+        self.run = run
+        self.depends_on = depends_on or []
+        self.skip_reason = skip_reason  # set when the check cannot run with these options
+
+
+class GatewayDoctor:
+    """Builds the check graph from the options and runs it concurrently"""
+
+    def __init__(self, config_file: Optional[str] = None, templates_dir: Path = TEMPLATES_DIR,
+                 gateway_url: Optional[str] = None, token: Optional[str] = None,
+                 offline: bool = False, network_concurrency: int = 4,
+                 client_timeout: Optional[float] = None, verbose: bool = False):
+        self.config_file = config_file
+        self.templates_dir = Path(templates_dir)
+        self.gateway_url = gateway_url.rstrip('/') if gateway_url else None
+        self.token = token
+        self.offline = offline
+        self.network_concurrency = max(1, network_concurrency)
+        self.client_timeout = client_timeout
+        self.verbose = verbose
+        self.proxy_url = os.environ.get('HTTPS_PROXY') or os.environ.get('HTTP_PROXY')
+        self.checks = self._build_checks()
+        self.results: Dict[str, Dict] = {}
+        self.timing: Dict[str, Any] = {}
+
+    def _build_checks(self) -> List[Check]:
+        no_config = None if self.config_file else "no config file (use --config)"
+        no_gateway = None
+        if self.offline:
+            no_gateway = "offline mode"
+        elif not self.gateway_url:
+            no_gateway = "no gateway URL (use --url or ANTHROPIC_BASE_URL)"
+        no_proxy = None if self.proxy_url else "no HTTPS_PROXY / HTTP_PROXY configured"
+        return [
+            Check("yaml-schemas", "offline", self.check_yaml_schemas),
+            Check("config", "offline", self.check_config, skip_reason=no_config),
+            Check("provider-env", "offline", self.check_provider_env, ["config"], no_config),
+            Check("env-vars", "offline", self.check_env_vars),
+            Check("proxy-auth", "offline", self.check_proxy_auth, skip_reason=no_proxy),
+            Check("gateway-health", "network", self.check_gateway_health, ["env-vars"], no_gateway),
+            Check("gateway-compat", "network", self.check_gateway_compat, ["gateway-health"],
+                  no_gateway if no_gateway or self.token else "no gateway token (use --token)"),
+            Check("proxy-connectivity", "network", self.check_proxy_connectivity, ["proxy-auth"],
+                  "offline mode" if self.offline else no_proxy),
+        ]
+
+    # Offline checks
+
+    def check_yaml_schemas(self) -> Dict:
+        validator = load_validator("test_yaml_schemas").YAMLSchemaValidator(verbose=self.verbose)
+        if not self.templates_dir.exists():
+            return result("skip", f"templates directory not found: {self.templates_dir}")
+        validator.validate_directory(self.templates_dir)
+        total = validator.passed + validator.failed
+        status = "fail" if validator.failed else ("warn" if validator.warnings else "pass")
+        return result(status, f"{validator.passed}/{total} YAML files valid",
+                      validator.errors + validator.warnings,
+                      passed=validator.passed, failed=validator.failed)
+
+    def check_config(self) -> Dict:
+        module = load_validator("validate_config")
+        validator = module.ConfigValidator(
+            self.config_file, self.client_timeout or module.DEFAULT_CLIENT_TIMEOUT
+        )
+        valid = validator.validate()
+        status = "fail" if not valid else ("warn" if validator.warnings else "pass")
+        return result(status, f"{len(validator.errors)} error(s), {len(validator.warnings)} warning(s)",
+                      validator.errors + validator.warnings,
+                      errors=validator.errors, warnings=validator.warnings)
+
+    def check_provider_env(self) -> Dict:
+        module = load_validator("validate_provider_env_vars")
+        config = module.load_yaml_config(self.config_file)
+        providers = sorted(module.detect_providers(config))
+        if not providers:
+            return result("warn", "no providers detected in configuration")
+        errors: List[str] = []
+        warnings: List[str] = []
+        for provider in providers:
+            _, provider_errors, provider_warnings = module.validate_provider(
+                provider, module.PROVIDER_REQUIREMENTS[provider]
+            )
+            errors += provider_errors
+            warnings += provider_warnings
+        for _, more_errors, more_warnings in (module.validate_litellm(config), module.validate_claude_code()):
+            errors += more_errors
+            warnings += more_warnings
+        status = "fail" if errors else ("warn" if warnings else "pass")
+        return result(status, f"providers: {', '.join(providers)}",
+                      [line.strip() for line in errors + warnings],
+                      providers=providers, errors=len(errors), warnings=len(warnings))
+
+    def check_env_vars(self) -> Dict:
+        validator = load_validator("test_env_vars").EnvVarValidator(verbose=self.verbose)
+        validator.run_all_tests()
+        status = "fail" if validator.failed else ("warn" if validator.warnings else "pass")
+        return result(status, f"{validator.passed} passed, {validator.failed} failed, "
+                              f"{validator.warnings} warning(s)",
+                      passed=validator.passed, failed=validator.failed, warnings=validator.warnings)
+
+    def check_proxy_auth(self) -> Dict:
+        module = load_validator("validate_proxy_auth")
+        valid, issues = module.validate_proxy_url_format(self.proxy_url)
+        method, findings = module.validate_authentication_method()
+        if not valid:
+            status = "fail"
+        elif issues or method in ("none", "inline"):
+            status = "warn"
+        else:
+            status = "pass"
+        return result(status, f"authentication method: {method}",
+                      [line.strip() for line in issues + findings], method=method)
+
+    # Network checks
+
+    def check_gateway_health(self) -> Dict:
+        import requests
+        url = f"{self.gateway_url}/health"
+        headers = {"Authorization": f"Bearer {self.token}"} if self.token else {}
+        try:
+            response = requests.get(url, headers=headers, timeout=10)
+        except requests.exceptions.RequestException as e:
+            return result("fail", f"{url} unreachable", [str(e)])
+        elapsed = response.elapsed.total_seconds()
+        if response.status_code == 200:
+            return result("pass", f"HTTP 200 in {elapsed * 1000:.0f} ms", latency_seconds=elapsed)
+        if response.status_code == 401:
+            # The gateway is up; /health just needs a different key
+            return result("warn", "HTTP 401 (gateway up, health endpoint requires auth)",
+                          latency_seconds=elapsed)
+        return result("fail", f"HTTP {response.status_code}", [response.text[:200]])
+
+    def check_gateway_compat(self) -> Dict:
+        module = load_validator("validate_gateway_compatibility")
+        validator = module.GatewayValidator(self.gateway_url, self.token, self.verbose,
+                                            concurrency=self.network_concurrency)
+        passed, failed, skipped = validator.run_validation()
+        status = "fail" if failed else ("pass" if passed else "skip")
+        return result(status, f"{passed} passed, {failed} failed, {skipped} skipped",
+                      [f"{r['check']}: {r['message']}" for r in validator.results if r["passed"] is False],
+                      results=validator.results, timing=validator.timing)
+
+    def check_proxy_connectivity(self) -> Dict:
+        outcome = load_validator("validate_proxy_auth").test_proxy_authentication()
+        if outcome is None:
+            return result("skip", "requests library not available")
+        return result("pass" if outcome else "fail",
+                      "request through proxy succeeded" if outcome else "request through proxy failed")
+
+    # Scheduling
+
+    def _execute(self, check: Check, local: threading.local) -> Dict:
+        """Run one check on a worker thread with its output captured"""
+        local.buffer = io.StringIO()
+        start = time.perf_counter()
+        try:
+            outcome = check.run()
+        except SystemExit as e:
+            # Some validators exit on fatal input errors; report instead of stopping the run
+            outcome = result("fail", f"validator exited with status {e.code}")
+        except Exception as e:
+            outcome = result("fail", f"unexpected error: {type(e).__name__}: {e}")
+        finally:
+            output = local.buffer.getvalue()
+            local.buffer = None
+        outcome.update(duration_seconds=round(time.perf_counter() - start, 3), output=output)
+        return outcome
+
+    def run(self) -> Dict[str, Dict]:
+        """Run the check graph: offline checks at once, network checks bounded"""
+        local = threading.local()
+        stdout, stderr = sys.stdout, sys.stderr
+        sys.stdout, sys.stderr = ThreadOutput(stdout, local), ThreadOutput(stderr, local)
+        offline_checks = [check for check in self.checks if check.kind == "offline"]
+        pending = {check.name: check for check in self.checks}
+        running = {}
+        start = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, len(offline_checks)),
+                                    thread_name_prefix="offline") as offline_pool, \
+                 ThreadPoolExecutor(max_workers=self.network_concurrency,
+                                    thread_name_prefix="network") as network_pool:
+                while pending or running:
+                    for name, check in list(pending.items()):
+                        blocked = [dep for dep in check.depends_on
+                                   if self.results.get(dep, {}).get("status") in ("fail", "skip")]
+                        if check.skip_reason or blocked:
+                            reason = check.skip_reason or f"depends on {', '.join(blocked)}"
+                            self.results[name] = {**result("skip", reason), "duration_seconds": 0.0,
+                                                  "output": ""}
+                            del pending[name]
+                        elif all(dep in self.results for dep in check.depends_on):
+                            pool = offline_pool if check.kind == "offline" else network_pool
+                            running[pool.submit(self._execute, check, local)] = name
+                            del pending[name]
+                    if not running:
+                        continue
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self.results[running.pop(future)] = future.result()
+        finally:
+            sys.stdout, sys.stderr = stdout, stderr
+        wall_clock = time.perf_counter() - start
+
+        sequential = sum(r["duration_seconds"] for r in self.results.values())
+        self.timing = {
+            "wall_clock_seconds": round(wall_clock, 3),
+            "sequential_seconds": round(sequential, 3),
+            "saved_seconds": round(max(0.0, sequential - wall_clock), 3),
+            "network_concurrency": self.network_concurrency,
+        }
+        # Report in graph order, not completion order
+        self.results = {check.name: self.results[check.name] for check in self.checks}
+        return self.results
+
+    def summary(self) -> Dict[str, int]:
+        counts = {status: 0 for status in STATUSES}
+        for outcome in self.results.values():
+            counts[outcome["status"]] += 1
+        return {"total": len(self.results), **counts}
+
+    def report(self) -> Dict:
+        """Combined JSON report"""
+        return {
+            "timestamp": time.strftime('%Y-%m-%d %H:%M:%S'),
+            "config_file": self.config_file,
+            "gateway_url": self.gateway_url,
+            "checks": [
+                {"name": check.name, "kind": check.kind, "depends_on": check.depends_on,
+                 **self.results[check.name]}
+                for check in self.checks
+            ],
+            "timing": self.timing,
+            "summary": self.summary(),
+        }
+
+    def print_report(self):
+        """Combined human-readable report"""
+        print(f"\n{Colors.BOLD}{'='*60}")
+        print("Gateway Doctor")
+        print(f"{'='*60}{Colors.RESET}\n")
+        if self.config_file:
+            print(f"Config:  {self.config_file}")
+        if self.gateway_url:
+            print(f"Gateway: {self.gateway_url}")
+        print()
+
+        for check in self.checks:
+            outcome = self.results[check.name]
+            print(f"{STATUS_LABELS[outcome['status']]} - {check.name:<19} {outcome['summary']} "
+                  f"({outcome['duration_seconds']:.2f}s)")
+            if outcome["status"] in ("fail", "warn") or self.verbose:
+                for detail in outcome["details"]:
+                    print(f"         • {detail}")
+            if self.verbose and outcome["output"].strip():
+                for line in outcome["output"].rstrip().splitlines():
+                    print(f"         | {line}")
+
+        counts = self.summary()
+        print(f"\n{Colors.BOLD}Summary:{Colors.RESET} {counts['total']} checks - "
+              f"{Colors.GREEN}{counts['pass']} passed{Colors.RESET}, "
+              f"{Colors.YELLOW}{counts['warn']} warnings{Colors.RESET}, "
+              f"{Colors.RED}{counts['fail']} failed{Colors.RESET}, "
+              f"{counts['skip']} skipped")
+        print(f"Wall clock: {self.timing['wall_clock_seconds']:.2f}s "
+              f"(sequential: {self.timing['sequential_seconds']:.2f}s, "
+              f"saved: {self.timing['saved_seconds']:.2f}s)\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run all gateway validators in one process and report once",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Offline checks only (templates, config, environment, proxy)
+  python gateway-doctor.py --config litellm_config.yaml --offline
+
+  # Everything, including the gateway compatibility suite
+  python gateway-doctor.py --config litellm_config.yaml \\
+    --url http://localhost:4000 --token sk-1234
+
+  # Machine-readable report for CI
+  python gateway-doctor.py --config litellm_config.yaml --json > doctor.json
+
+Checks: yaml-schemas, config, provider-env, env-vars, proxy-auth (offline);
+gateway-health, gateway-compat, proxy-connectivity (network).
+        """
+    )
+    parser.add_argument('--config', '-c', help='LiteLLM configuration file to validate')
+    parser.add_argument('--templates', default=str(TEMPLATES_DIR),
+                        help='Templates directory for the YAML schema check (default: ../templates)')
+    parser.add_argument('--url', default=os.environ.get('ANTHROPIC_BASE_URL'),
+                        help='Gateway base URL (default: $ANTHROPIC_BASE_URL)')
+    parser.add_argument('--token', default=os.environ.get('ANTHROPIC_AUTH_TOKEN') or os.environ.get('ANTHROPIC_API_KEY'),
+                        help='Gateway API key (default: $ANTHROPIC_AUTH_TOKEN or $ANTHROPIC_API_KEY)')
+    parser.add_argument('--offline', action='store_true', help='Skip network checks')
+    parser.add_argument('--network-concurrency', type=int, default=4,
+                        help='Network checks (and gateway requests) in flight at once (default: 4)')
+    parser.add_argument('--client-timeout', type=float,
+                        help='Client request timeout in seconds, for the config retry/timeout lint')
+    parser.add_argument('--json', action='store_true', help='Print the JSON report instead of the summary')
+    parser.add_argument('--output', help='Also write the JSON report to a file')
+    parser.add_argument('--verbose', '-v', action='store_true',
+                        help='Show details and captured validator output for every check')
+
+    args = parser.parse_args()
+
+    doctor = GatewayDoctor(args.config, Path(args.templates), args.url, args.token, args.offline,
+                           args.network_concurrency, args.client_timeout, args.verbose)
+    doctor.run()
+    report = doctor.report()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        doctor.print_report()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        if not args.json:
+            print(f"Report written to: {args.output}")
+
+    sys.exit(1 if report["summary"]["fail"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Open-Loop Load Generator for LLM Gateways
+
+Purpose: Measure how a gateway behaves at a target arrival rate, for sizing
+         LiteLLM deployments from data rather than guesswork
+Usage: python gateway-loadtest.py --url https://gateway.example.com --token your-api-key --rps 20 --duration 60
+
+Unlike the closed loop in tests/test-rate-limiting.py, requests are sent on a
+fixed schedule (constant or Poisson arrivals) whether or not earlier requests
+have finished. Each request is issued through RateLimitTester.make_request on a
+bounded worker pool sharing one pooled session.
+
+Latency is measured from each request's *intended* send time, so time spent
+waiting for a free worker while the gateway is slow is counted instead of
+silently omitted (correction for coordinated omission). Service time, measured
+from the moment a worker actually sends the request, is reported alongside.
+
+With --adaptive the shared session is an adaptive_client.AdaptiveSession, so
+requests are held back client-side according to the gateway's rate-limit
+headers; that wait shows up as service time rather than as 429s.
+"""
+
+import argparse
+import importlib.util
+import json
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+from latency_histogram import LatencyHistogram, format_table
+
+TESTS_DIR = Path(__file__).resolve().parent.parent / "tests"
+
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    YELLOW = '\033[93m'
+    BLUE = '\033[94m'
+    BOLD = '\033[1m'
+    RESET = '\033[0m'
+
+
+def load_rate_limit_tester():
+    """Import RateLimitTester from tests/test-rate-limiting.py"""
+    spec = importlib.util.spec_from_file_location(
+        "test_rate_limiting", TESTS_DIR / "test-rate-limiting.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.RateLimitTester
+
+
+def status_class(status: int) -> str:
+    """Bucket a status code for reporting (0 means the request raised)"""
+    if status == 0:
+        return "error"
+    if status == 429:
+        return "429"
+    return f"{status // 100}xx"
+
+
+class LoadGenerator:
+    """Fires requests on an open-loop schedule and records their latencies"""
+
+    def __init__(self, tester, rps: float, duration: float, arrival: str = "constant",
+                 workers: int = 32, seed: int = None):
+        self.tester = tester
+        self.rps = rps
+        self.duration = duration
+        self.arrival = arrival
+        self.workers = workers
+        self.random = random.Random(seed)
+
+        self.lock = threading.Lock()
+        self.response_time: Dict[str, LatencyHistogram] = {}
+        self.service_time = LatencyHistogram()
+        self.queue_time = LatencyHistogram()
+        self.max_schedule_lag = 0.0
+        self.sent = 0
+        self.elapsed = 0.0
+
+        # Size the session's connection pool to the worker pool so every
+        # worker can hold a keep-alive connection.
+        from requests.adapters import HTTPAdapter
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        tester.session.mount("http://", adapter)
+        tester.session.mount("https://", adapter)
+
+    def arrivals(self) -> Iterator[float]:
+        """Yield intended send times as offsets (seconds) from the start"""
+        offset = 0.0
+        while True:
+            if self.arrival == "poisson":
+                offset += self.random.expovariate(self.rps)
+            else:
+                offset += 1.0 / self.rps
+            if offset >= self.duration:
+                return
+            yield offset
+
+    def _fire(self, intended: float):
+        """Worker: issue one request and record it against its intended time"""
+        started = time.perf_counter()
+        status, _headers, _latency = self.tester.make_request()
+        finished = time.perf_counter()
+
+        with self.lock:
+            bucket = status_class(status)
+            if bucket not in self.response_time:
+                self.response_time[bucket] = LatencyHistogram()
+            self.response_time[bucket].record(finished - intended)
+            self.service_time.record(finished - started)
+            self.queue_time.record(started - intended)
+
+    def run(self):
+        """Run the schedule to completion and wait for outstanding requests"""
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for offset in self.arrivals():
+                intended = start + offset
+                delay = intended - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    self.max_schedule_lag = max(self.max_schedule_lag, -delay)
+                pool.submit(self._fire, intended)
+                self.sent += 1
+        self.elapsed = time.perf_counter() - start
+
+    def overall(self) -> LatencyHistogram:
+        combined = LatencyHistogram()
+        for histogram in self.response_time.values():
+            combined.merge(histogram)
+        return combined
+
+    def report(self) -> Dict:
+        """Results as a JSON-serialisable dict"""
+        overall = self.overall()
+        return {
+            "target_rps": self.rps,
+            "arrival": self.arrival,
+            "duration_seconds": self.duration,
+            "workers": self.workers,
+            "requests_sent": self.sent,
+            "achieved_rps": round(overall.total / self.elapsed, 3) if self.elapsed else None,
+            "max_schedule_lag_ms": round(self.max_schedule_lag * 1000, 3),
+            "response_time_by_status": {
+                bucket: histogram.summary()
+                for bucket, histogram in sorted(self.response_time.items())
+            },
+            "response_time": overall.summary(),
+            "service_time": self.service_time.summary(),
+            "queue_time": self.queue_time.summary(),
+            "rate_limiter": self.limiter_snapshot()
+        }
+
+    def limiter_snapshot(self) -> Optional[Dict]:
+        limiter = getattr(self.tester.session, "limiter", None)
+        return limiter.snapshot() if limiter else None
+
+    def print_report(self):
+        overall = self.overall()
+        print(f"\n{Colors.BOLD}{'='*60}")
+        print("Load Test Results")
+        print(f"{'='*60}{Colors.RESET}\n")
+        print(f"Requests: {overall.total} completed in {self.elapsed:.1f}s "
+              f"({overall.total / self.elapsed:.2f} req/s achieved, {self.rps:g} target)")
+        if self.max_schedule_lag > 0.01:
+            print(f"{Colors.YELLOW}⚠ Scheduler fell behind by up to "
+                  f"{self.max_schedule_lag * 1000:.0f}ms; results understate the offered load{Colors.RESET}")
+
+        print(f"\n{Colors.BOLD}Response time by status (ms, from intended send time){Colors.RESET}")
+        rows = dict(sorted(self.response_time.items()))
+        rows["all"] = overall
+        print(format_table(rows))
+
+        print(f"\n{Colors.BOLD}Where the time went (ms){Colors.RESET}")
+        print(format_table({"service": self.service_time, "queued": self.queue_time}))
+
+        limiter = self.limiter_snapshot()
+        if limiter:
+            pacing = f"{limiter['pacing_rate']:g} req/s" if limiter['pacing_rate'] else "unpaced"
+            print(f"\n{Colors.BOLD}Adaptive limiter{Colors.RESET}: {limiter['throttled']} throttled, "
+                  f"{limiter['waited_seconds']:.1f}s waited, window {limiter['window']:g} "
+                  f"(min {limiter['min_window']:g}), pacing {pacing}")
+
+        errors = sum(h.total for b, h in self.response_time.items() if b not in ("2xx",))
+        if overall.total and errors:
+            color = Colors.YELLOW if errors < overall.total * 0.05 else Colors.RED
+            print(f"\n{color}Non-2xx responses: {errors} ({errors / overall.total:.1%}){Colors.RESET}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Open-loop load generator for LLM gateways",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # 20 requests/second for one minute, evenly spaced
+  python gateway-loadtest.py \\
+    --url https://gateway.example.com \\
+    --token your-api-key \\
+    --rps 20 --duration 60
+
+  # Poisson arrivals (bursty, like real users) with a JSON report
+  python gateway-loadtest.py \\
+    --url https://gateway.example.com \\
+    --token your-api-key \\
+    --rps 50 --duration 120 --arrival poisson --workers 128 \\
+    --output loadtest.json
+
+  # Let the client back off to the gateway's advertised rate limit
+  python gateway-loadtest.py \\
+    --url https://gateway.example.com \\
+    --token your-api-key \\
+    --rps 20 --duration 60 --adaptive
+
+Reading the results:
+  - Response time is measured from when each request *should* have been sent,
+    so it includes queueing when all workers are busy (coordinated omission
+    corrected). Service time excludes that queueing.
+  - If "queued" percentiles grow, the gateway cannot sustain the target rate
+    (or --workers is too small for its latency).
+        """
+    )
+
+    parser.add_argument('--url', required=True, help='Gateway base URL')
+    parser.add_argument('--token', required=True, help='Gateway API key/token')
+    parser.add_argument('--rps', type=float, required=True, help='Target arrival rate (requests/second)')
+    parser.add_argument('--duration', type=float, default=60, help='Test duration in seconds (default: 60)')
+    parser.add_argument('--arrival', choices=['constant', 'poisson'], default='constant',
+                        help='Inter-arrival distribution (default: constant)')
+    parser.add_argument('--workers', type=int, default=32,
+                        help='Maximum concurrent requests / pooled connections (default: 32)')
+    parser.add_argument('--model', default='claude-3-5-sonnet-20241022', help='Model to request')
+    parser.add_argument('--seed', type=int, help='Random seed for Poisson arrivals')
+    parser.add_argument('--adaptive', action='store_true',
+                        help='Throttle client-side from rate-limit headers (AIMD + token bucket)')
+    parser.add_argument('--output', help='Export results to JSON file')
+
+    args = parser.parse_args()
+    if args.rps <= 0 or args.duration <= 0 or args.workers <= 0:
+        parser.error("--rps, --duration and --workers must be positive")
+
+    tester = load_rate_limit_tester()(args.url, args.token, rpm_limit=int(args.rps * 60))
+    tester.model = args.model
+    if args.adaptive:
+        from adaptive_client import AdaptiveSession
+        tester.session = AdaptiveSession(max_concurrency=args.workers)
+
+    print(f"Offering {args.rps:g} req/s ({args.arrival}) for {args.duration:g}s "
+          f"to {args.url} with {args.workers} workers...")
+    generator = LoadGenerator(tester, args.rps, args.duration, args.arrival, args.workers, args.seed)
+    generator.run()
+    generator.print_report()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(generator.report(), f, indent=2)
+        print(f"\nResults exported to: {args.output}")
+
+    sys.exit(0 if generator.overall().total else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Latency histogram shared by the gateway load and profiling tools
+
+Purpose: Record millions of latency samples in constant memory and report
+         percentiles (p50/p90/p99/p99.9) with bounded relative error, in the
+         style of HdrHistogram.
+"""
+
+import math
+from typing import Dict, Iterable, List, Optional
+
+
+class LatencyHistogram:
+    """Log-linear latency histogram with microsecond resolution.
+
+    Values below 2**(sub_bucket_bits + 1) microseconds are counted exactly.
+    Larger values share a bucket with the values that agree with them in the
+    top sub_bucket_bits + 1 bits, so the relative error of any reported
+    percentile is below 1 / 2**sub_bucket_bits (under 1% with the default 7).
+    """
+
+    def __init__(self, sub_bucket_bits: int = 7):
+        self.sub_bucket_bits = sub_bucket_bits
+        self._exact_limit = 1 << (sub_bucket_bits + 1)
+        self.counts: Dict[int, int] = {}
+        self.total = 0
+        self.min_us: Optional[int] = None
+        self.max_us: Optional[int] = None
+        self.sum_us = 0
+
+    def _bucket(self, value_us: int) -> int:
+        if value_us < self._exact_limit:
+            return value_us
+        shift = value_us.bit_length() - (self.sub_bucket_bits + 1)
+        return (shift << (self.sub_bucket_bits + 1)) | (value_us >> shift)
+
+    def _highest_equivalent(self, bucket: int) -> int:
+        if bucket < self._exact_limit:
+            return bucket
+        shift = bucket >> (self.sub_bucket_bits + 1)
+        mantissa = bucket & (self._exact_limit - 1)
+        return ((mantissa + 1) << shift) - 1
+
+    def record(self, seconds: float, count: int = 1):
+        """Record a latency given in seconds."""
+        value_us = max(0, int(round(seconds * 1_000_000)))
+        bucket = self._bucket(value_us)
+        self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.total += count
+        self.sum_us += value_us * count
+        if self.min_us is None or value_us < self.min_us:
+            self.min_us = value_us
+        if self.max_us is None or value_us > self.max_us:
+            self.max_us = value_us
+
+    def merge(self, other: "LatencyHistogram"):
+        """Add another histogram's samples (same sub_bucket_bits) to this one."""
+        if other.sub_bucket_bits != self.sub_bucket_bits:
+            raise ValueError("Cannot merge histograms with different precision")
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.total += other.total
+        self.sum_us += other.sum_us
+        for value in (other.min_us, other.max_us):
+            if value is not None:
+                self.min_us = value if self.min_us is None else min(self.min_us, value)
+                self.max_us = value if self.max_us is None else max(self.max_us, value)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Latency in seconds at the given percentile (nearest rank)."""
+        if not self.total:
+            return None
+        rank = max(1, math.ceil(self.total * pct / 100.0))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                # Never report beyond the largest value actually recorded
+                return min(self._highest_equivalent(bucket), self.max_us) / 1_000_000
+        return self.max_us / 1_000_000
+
+    def mean(self) -> Optional[float]:
+        return self.sum_us / self.total / 1_000_000 if self.total else None
+
+    def summary(self, percentiles: Iterable[float] = (50, 90, 99, 99.9)) -> Dict[str, Optional[float]]:
+        """Count, min/mean/max and percentiles, in milliseconds."""
+        def ms(seconds: Optional[float]) -> Optional[float]:
+            return None if seconds is None else round(seconds * 1000, 3)
+
+        result: Dict[str, Optional[float]] = {"count": self.total}
+        result["min_ms"] = ms(None if self.min_us is None else self.min_us / 1_000_000)
+        result["mean_ms"] = ms(self.mean())
+        for pct in percentiles:
+            result[f"p{pct:g}_ms"] = ms(self.percentile(pct))
+        result["max_ms"] = ms(None if self.max_us is None else self.max_us / 1_000_000)
+        return result
+
+
+def histogram_of(samples: Iterable[float]) -> LatencyHistogram:
+    """Build a histogram from latencies in seconds."""
+    histogram = LatencyHistogram()
+    for sample in samples:
+        histogram.record(sample)
+    return histogram
+
+
+def format_table(rows: Dict[str, LatencyHistogram],
+                 percentiles: List[float] = (50, 90, 99, 99.9)) -> str:
+    """Render labelled histograms as an aligned text table (milliseconds)."""
+    headers = ["", "count"] + [f"p{pct:g}" for pct in percentiles] + ["max"]
+    lines = ["  ".join(f"{h:>10}" for h in headers)]
+    for label, histogram in rows.items():
+        values = [histogram.percentile(pct) for pct in percentiles]
+        values.append(None if histogram.max_us is None else histogram.max_us / 1_000_000)
+        cells = [f"{label:>10}", f"{histogram.total:>10}"]
+        cells += [f"{value * 1000:>10.1f}" if value is not None else f"{'-':>10}" for value in values]
+        lines.append("  ".join(cells))
+    return "\n".join(lines)
@@ -2,15 +2,24 @@
 """
 Configuration Migration Helper
 Helps migrate LiteLLM configurations between versions
+
+Given a directory instead of a file, migrates every config under it (bulk
+mode): files are planned in a process pool, originals go into one
+consolidated backup archive, and each output is written atomically.
 """
 
 import argparse
+import difflib
 import os
 import shutil
 import sys
+import tarfile
+import tempfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 
 try:
     import yaml
@@ -18,12 +27,19 @@ except ImportError:
     print("Error: PyYAML is required. Install with: pip install pyyaml")
     sys.exit(1)
 
+from config_loader import load_config_copy, parse_yaml
+
+# libyaml's emitter when available; output matches the pure-Python Dumper
+Dumper = getattr(yaml, "CDumper", yaml.Dumper)
+
 
 class ConfigMigrator:
     """Handles configuration migration between versions."""
     
     def __init__(self, verbose: bool = False):
         self.verbose = verbose
+        # When a list, errors are collected here instead of printed (bulk mode)
+        self.errors: Optional[List[str]] = None
         self.migrations: List[Tuple[str, str, callable]] = [
             ("0.1.0", "0.2.0", self.migrate_0_1_to_0_2),
             ("0.2.0", "1.0.0", self.migrate_0_2_to_1_0),
@@ -31,7 +47,9 @@ class ConfigMigrator:
     
     def log(self, message: str, level: str = "INFO"):
         """Log a message if verbose is enabled."""
-        if self.verbose or level == "ERROR":
+        if level == "ERROR" and self.errors is not None:
+            self.errors.append(message)
+        elif self.verbose or level == "ERROR":
             prefix = {"INFO": "[INFO]", "WARN": "[WARN]", "ERROR": "[ERROR]"}
             print(f"{prefix.get(level, '[INFO]')} {message}")
     
@@ -45,6 +63,24 @@ class ConfigMigrator:
         
         return backup_path
     
+    @staticmethod
+    def render(config: Dict[str, Any]) -> str:
+        """Serialize a configuration the way migrated files are written."""
+        return yaml.dump(config, Dumper=Dumper, default_flow_style=False, sort_keys=False)
+    
+    @staticmethod
+    def write_atomic(config_path: Path, text: str):
+        """Replace a file in one step, keeping its permissions; readers never see a partial file."""
+        fd, temp = tempfile.mkstemp(dir=config_path.parent, prefix=f".{config_path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(text)
+            shutil.copymode(config_path, temp)
+            os.replace(temp, config_path)
+        except BaseException:
+            os.unlink(temp)
+            raise
+    
     def detect_version(self, config: Dict[str, Any]) -> str:
         """Detect the version of the configuration."""
         # Check for version field
@@ -142,7 +178,9 @@ class ConfigMigrator:
         migrated_config = config.copy()
         
         for from_v, to_v, migration_func in self.migrations:
-            if self.version_gte(current_version, from_v) and self.version_lt(current_version, to_version):
+            # Only steps that start at or before, and end after, the current version
+            if (self.version_gte(current_version, from_v) and self.version_lt(current_version, to_v)
+                    and self.version_lt(current_version, to_version)):
                 self.log(f"Applying migration: {from_v} → {to_v}")
                 migrated_config = migration_func(migrated_config)
                 current_version = to_v
@@ -197,9 +235,8 @@ class ConfigMigrator:
                     backup: bool = True, dry_run: bool = False) -> bool:
         """Migrate a configuration file."""
         try:
-            # Load config
-            with open(config_path, 'r') as f:
-                config = yaml.safe_load(f)
+            # Load config (a mutable copy: migrations edit it in place)
+            config = load_config_copy(config_path)
             
             # Detect current version
             current_version = self.detect_version(config)
@@ -226,10 +263,9 @@ class ConfigMigrator:
             if dry_run:
                 self.log("DRY RUN - Changes not written")
                 print("\nMigrated configuration:")
-                print(yaml.dump(migrated_config, default_flow_style=False, sort_keys=False))
+                print(self.render(migrated_config))
             else:
-                with open(config_path, 'w') as f:
-                    yaml.dump(migrated_config, f, default_flow_style=False, sort_keys=False)
+                self.write_atomic(config_path, self.render(migrated_config))
                 self.log(f"Configuration migrated to version {to_version}")
             
             return True
@@ -243,6 +279,156 @@ class ConfigMigrator:
         except Exception as e:
             self.log(f"Migration error: {e}", "ERROR")
             return False
+    
+    def plan_file(self, config_path: Path, to_version: str = "1.0.0") -> Dict[str, Any]:
+        """Migrate a file in memory, without writing anything.
+        
+        Returns a dict with path, status ("migrate", "current", "skipped" for
+        YAML that is not a LiteLLM config, or "failed"), detected version,
+        the original text, the migrated text and an error message.
+        """
+        plan = {"path": str(config_path), "status": "failed", "version": None,
+                "original": None, "migrated": None, "error": None}
+        self.errors = []
+        try:
+            with open(config_path) as f:
+                plan["original"] = f.read()
+            config = parse_yaml(plan["original"], str(config_path))
+            if not isinstance(config, dict) or not ({"model_list", "models"} & config.keys()):
+                plan["status"] = "skipped"
+                return plan
+            
+            plan["version"] = str(self.detect_version(config))
+            if plan["version"] == to_version:
+                plan["status"] = "current"
+                return plan
+            
+            migrated_config = self.migrate(plan["version"], to_version, config)
+            if not self.validate_config(migrated_config):
+                plan["error"] = "migrated configuration failed validation: " + "; ".join(self.errors)
+                return plan
+            plan["migrated"] = self.render(migrated_config)
+            plan["status"] = "migrate"
+        except (OSError, UnicodeDecodeError, yaml.YAMLError) as e:
+            if isinstance(e, yaml.MarkedYAMLError) and e.problem_mark is not None:
+                # One line per file in the summary, but still say where it broke
+                mark = e.problem_mark
+                plan["error"] = (f"line {mark.line + 1}, column {mark.column + 1}: "
+                                 f"{e.problem or e.context or type(e).__name__}")
+            else:
+                plan["error"] = " ".join(str(e).split()) or type(e).__name__
+        except Exception as e:
+            plan["error"] = f"Migration error: {e}"
+        finally:
+            self.errors = None
+        return plan
+    
+    def migrate_tree(self, root: Path, to_version: str = "1.0.0", jobs: int = 1,
+                     backup: bool = True, backup_dir: Optional[Path] = None,
+                     dry_run: bool = False) -> Dict[str, Any]:
+        """Migrate every LiteLLM config under a directory.
+        
+        Files are planned in a process pool (results in sorted path order),
+        then all originals that will change go into a single backup archive
+        before any file is replaced. Dry runs print unified diffs instead.
+        """
+        config_paths = discover_configs(root)
+        if jobs > 1 and len(config_paths) > 1:
+            workers = min(jobs, len(config_paths))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                plans = list(pool.map(_plan_file, config_paths, [to_version] * len(config_paths),
+                                      chunksize=max(1, len(config_paths) // (workers * 4))))
+        else:
+            plans = [self.plan_file(path, to_version) for path in config_paths]
+        
+        changes = [plan for plan in plans if plan["status"] == "migrate"]
+        summary = {
+            "root": str(root),
+            "to_version": to_version,
+            "scanned": len(plans),
+            "versions": dict(sorted(Counter(plan["version"] for plan in plans if plan["version"]).items())),
+            "statuses": dict(Counter(plan["status"] for plan in plans)),
+            "failed": [(plan["path"], plan["error"]) for plan in plans if plan["status"] == "failed"],
+            "backup_archive": None,
+            "written": 0,
+        }
+        
+        if dry_run:
+            for plan in changes:
+                relative = os.path.relpath(plan["path"], root)
+                sys.stdout.writelines(difflib.unified_diff(
+                    plan["original"].splitlines(keepends=True), plan["migrated"].splitlines(keepends=True),
+                    f"a/{relative}", f"b/{relative}"
+                ))
+            return summary
+        
+        if changes and backup:
+            summary["backup_archive"] = str(self.backup_tree(root, [Path(plan["path"]) for plan in changes],
+                                                             backup_dir or root))
+        for plan in changes:
+            try:
+                self.write_atomic(Path(plan["path"]), plan["migrated"])
+                summary["written"] += 1
+                self.log(f"Migrated {plan['path']} ({plan['version']} → {to_version})")
+            except OSError as e:
+                summary["failed"].append((plan["path"], str(e)))
+        return summary
+    
+    def backup_tree(self, root: Path, paths: List[Path], backup_dir: Path) -> Path:
+        """Archive files (relative to root) into one timestamped .tar.gz, written atomically."""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        backup_dir.mkdir(parents=True, exist_ok=True)
+        archive_path = backup_dir / f"config-migration-backup.{timestamp}.tar.gz"
+        fd, temp = tempfile.mkstemp(dir=backup_dir, prefix=".config-migration-backup.", suffix=".tmp")
+        os.close(fd)
+        try:
+            with tarfile.open(temp, "w:gz") as archive:
+                for path in paths:
+                    archive.add(path, arcname=os.path.relpath(path, root))
+            os.replace(temp, archive_path)
+        except BaseException:
+            os.unlink(temp)
+            raise
+        self.log(f"Backup archive created: {archive_path} ({len(paths)} files)")
+        return archive_path
+
+
+def discover_configs(root: Path) -> List[Path]:
+    """YAML files under root in sorted order, skipping hidden directories and backups."""
+    return sorted(
+        path for path in root.rglob("*")
+        if path.suffix in (".yaml", ".yml") and path.is_file()
+        and not any(part.startswith(".") for part in path.relative_to(root).parts)
+    )
+
+
+def _plan_file(config_path: Path, to_version: str) -> Dict[str, Any]:
+    """Process-pool worker: plan one file with a fresh, quiet migrator."""
+    return ConfigMigrator().plan_file(config_path, to_version)
+
+
+def print_tree_summary(summary: Dict[str, Any], dry_run: bool, file=sys.stdout):
+    """Print the result of a bulk migration."""
+    statuses = summary["statuses"]
+    print(f"\n{'='*60}", file=file)
+    print(f"Bulk Migration{' (dry run)' if dry_run else ''}: {summary['root']} → {summary['to_version']}", file=file)
+    print(f"{'='*60}\n", file=file)
+    print(f"YAML files scanned: {summary['scanned']} "
+          f"({statuses.get('skipped', 0)} not LiteLLM configs, skipped)", file=file)
+    print("Detected versions:", file=file)
+    for version, count in summary["versions"].items():
+        print(f"  {version}: {count}", file=file)
+    print(f"\nAlready at {summary['to_version']}: {statuses.get('current', 0)}", file=file)
+    if dry_run:
+        print(f"Would migrate: {statuses.get('migrate', 0)}", file=file)
+    else:
+        print(f"Migrated: {summary['written']}", file=file)
+        if summary["backup_archive"]:
+            print(f"Backup archive: {summary['backup_archive']}", file=file)
+    if summary["failed"]:
+        print(f"Failed: {len(summary['failed'])}", file=file)
+        for path, error in summary["failed"]:
+            print(f"  ✗ {path}: {error}", file=file)
 
 
 def main():
@@ -262,10 +448,17 @@ Examples:
   
   # Migrate without backup
   python migrate-config.py config/litellm.yaml --no-backup
+  
+  # Bulk: every config under a tree, one backup archive, 8 worker processes
+  python migrate-config.py teams/ --jobs 8
+  
+  # Bulk dry run: unified diff of every change
+  python migrate-config.py teams/ --dry-run > migration.diff
         """
     )
     
-    parser.add_argument("config_path", type=str, help="Path to configuration file")
+    parser.add_argument("config_path", type=str,
+                       help="Path to configuration file, or a directory to migrate every config under it")
     parser.add_argument("--to-version", type=str, default="1.0.0", 
                        help="Target version (default: 1.0.0)")
     parser.add_argument("--no-backup", action="store_true", 
@@ -274,12 +467,30 @@ Examples:
                        help="Preview changes without writing")
     parser.add_argument("--verbose", "-v", action="store_true", 
                        help="Enable verbose output")
+    parser.add_argument("--jobs", "-j", type=int, default=0,
+                       help="Bulk mode: plan files in N worker processes; 0 = one per CPU (default: 0)")
+    parser.add_argument("--backup-dir", type=str,
+                       help="Bulk mode: where to write the backup archive (default: the directory migrated)")
     
     args = parser.parse_args()
     
     # Initialize migrator
     migrator = ConfigMigrator(verbose=args.verbose)
     
+    if Path(args.config_path).is_dir():
+        root = Path(args.config_path)
+        summary = migrator.migrate_tree(
+            root,
+            to_version=args.to_version,
+            jobs=args.jobs if args.jobs > 0 else (os.cpu_count() or 1),
+            backup=not args.no_backup,
+            backup_dir=Path(args.backup_dir) if args.backup_dir else None,
+            dry_run=args.dry_run
+        )
+        # On dry runs stdout carries only the patch
+        print_tree_summary(summary, args.dry_run, sys.stderr if args.dry_run else sys.stdout)
+        sys.exit(1 if summary["failed"] else 0)
+    
     # Migrate
     config_path = Path(args.config_path)
     success = migrator.migrate_file(
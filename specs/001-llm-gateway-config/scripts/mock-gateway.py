@@ -0,0 +1,527 @@
+#!/usr/bin/env python3
+"""
+Mock Anthropic/LiteLLM Gateway
+
+Purpose: Local stand-in for an LLM gateway so validators, tests and load tools
+         run offline (CI, air-gapped machines) and at request rates a real
+         provider would not allow
+Usage: python mock-gateway.py --port 4000 [--profile mock-profile.yaml]
+
+Endpoints:
+  POST /v1/messages            Anthropic Messages API (JSON, or SSE with "stream": true)
+  POST /chat/completions       OpenAI-compatible (also /v1/chat/completions), JSON or SSE
+  GET  /health                 LiteLLM-style health report
+  GET  /model/info             LiteLLM model info (also /v1/model/info)
+  GET  /models                 OpenAI-style model list (also /v1/models)
+
+Each model has a profile controlling its latency distribution, token rate,
+requests-per-minute limit (429 with Retry-After and X-RateLimit-* headers),
+5xx fault injection and stalled streams. Profiles come from --profile (a mock
+profile, or a LiteLLM config whose model_list rpm limits are reused) and the
+command-line defaults. Only requests using one of the --api-key values are
+accepted; anything else gets 401, as from a real gateway.
+
+Requires PyYAML only for YAML profiles; JSON profiles need nothing beyond the
+standard library.
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    YELLOW = '\033[93m'
+    BLUE = '\033[94m'
+    BOLD = '\033[1m'
+    RESET = '\033[0m'
+
+
+class ModelProfile:
+    """Simulated behaviour of one model behind the gateway"""
+
+    FIELDS = {
+        "latency_ms": 300.0,        # median time to first token
+        "latency_sigma": 0.3,       # log-normal shape; 0 for a fixed latency
+        "tokens_per_second": 80.0,  # generation rate after the first token
+        "output_tokens": 40,        # tokens generated (capped by max_tokens)
+        "rpm": 0,                   # requests per minute per API key; 0 = unlimited
+        "error_rate": 0.0,          # share of requests answered with a 5xx
+        "error_statuses": [500, 502, 503],
+        "slow_stream_rate": 0.0,    # share of streams that stall mid-stream
+        "stall_ms": 2000.0,         # length of a stall
+    }
+
+    def __init__(self, **settings):
+        unknown = set(settings) - set(self.FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown profile setting(s): {', '.join(sorted(unknown))}")
+        for name, default in self.FIELDS.items():
+            setattr(self, name, settings.get(name, default))
+
+    def with_overrides(self, settings: Dict) -> "ModelProfile":
+        merged = {name: getattr(self, name) for name in self.FIELDS}
+        merged.update(settings)
+        return ModelProfile(**merged)
+
+    def as_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+
+class TokenBucket:
+    """Requests-per-minute limiter: capacity rpm, refilled at rpm/60 per second"""
+
+    def __init__(self, rpm: int):
+        self.capacity = float(rpm)
+        self.rate = rpm / 60.0
+        self.tokens = float(rpm)
+        self.updated = time.monotonic()
+
+    def take(self) -> Tuple[bool, int, float]:
+        """Try to admit one request; return (admitted, remaining, seconds until a token)"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True, int(self.tokens), 0.0
+        return False, 0, (1 - self.tokens) / self.rate
+
+    def seconds_to_full(self) -> float:
+        return (self.capacity - self.tokens) / self.rate
+
+
+class MockGateway:
+    """Model profiles, rate-limit state and request counters shared by handler threads"""
+
+    def __init__(self, default: ModelProfile, models: Dict[str, ModelProfile],
+                 api_keys: List[str], strict_models: bool = False, seed: Optional[int] = None):
+        self.default = default
+        self.models = models
+        self.api_keys = set(api_keys)
+        self.strict_models = strict_models
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self.counters: Dict[str, int] = {}
+        self.started = time.time()
+
+    def profile(self, model: str) -> Optional[ModelProfile]:
+        if model in self.models:
+            return self.models[model]
+        return None if self.strict_models else self.default
+
+    def count(self, key: str):
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + 1
+
+    def admit(self, api_key: str, model: str, profile: ModelProfile) -> Tuple[bool, Dict[str, str]]:
+        """Apply the model's rpm limit; return (admitted, rate-limit headers)"""
+        if not profile.rpm:
+            return True, {}
+        with self.lock:
+            bucket = self.buckets.get((api_key, model))
+            if bucket is None:
+                bucket = self.buckets[(api_key, model)] = TokenBucket(profile.rpm)
+            admitted, remaining, wait = bucket.take()
+            reset = bucket.seconds_to_full()
+        headers = {
+            "X-RateLimit-Limit": str(profile.rpm),
+            "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset": str(math.ceil(reset)),
+        }
+        if not admitted:
+            headers["Retry-After"] = str(max(1, math.ceil(wait)))
+        return admitted, headers
+
+    def sample_latency(self, profile: ModelProfile) -> float:
+        """Time to first token in seconds, drawn from the profile's distribution"""
+        median = profile.latency_ms / 1000.0
+        if median <= 0:
+            return 0.0
+        with self.lock:
+            if profile.latency_sigma > 0:
+                return self.random.lognormvariate(math.log(median), profile.latency_sigma)
+            return median
+
+    def chance(self, probability: float) -> bool:
+        with self.lock:
+            return probability > 0 and self.random.random() < probability
+
+    def pick_error(self, profile: ModelProfile) -> int:
+        with self.lock:
+            return self.random.choice(profile.error_statuses)
+
+
+class GatewayHandler(BaseHTTPRequestHandler):
+    """HTTP/1.1 keep-alive handler; the MockGateway is on self.server.gateway"""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "MockGateway/1.0"
+    # Headers and body are separate writes; without TCP_NODELAY a kept-alive
+    # client waits ~40ms on delayed ACK for every response body.
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            sys.stderr.write(f"{self.address_string()} - {format % args}\n")
+
+    # Routing
+
+    def do_GET(self):
+        gateway = self.server.gateway
+        path = self.path.split("?", 1)[0].rstrip("/")
+        gateway.count(f"GET {path}")
+        if path == "/health":
+            self.send_json(200, self.health())
+        elif path in ("/health/liveliness", "/health/readiness"):
+            self.send_json(200, {"status": "healthy"})
+        elif path in ("/model/info", "/v1/model/info"):
+            self.send_json(200, {"data": [
+                {
+                    "model_name": name,
+                    "litellm_params": {"model": f"mock/{name}"},
+                    "model_info": {"id": name, "mode": "chat", "rpm": profile.rpm,
+                                   "mock_profile": profile.as_dict()},
+                }
+                for name, profile in sorted(gateway.models.items())
+            ]})
+        elif path in ("/models", "/v1/models"):
+            self.send_json(200, {"object": "list", "data": [
+                {"id": name, "object": "model", "created": int(gateway.started), "owned_by": "mock"}
+                for name in sorted(gateway.models)
+            ]})
+        else:
+            self.send_error_json(404, "not_found_error", f"Unknown endpoint: {path}")
+
+    def do_POST(self):
+        path = self.path.split("?", 1)[0].rstrip("/")
+        self.server.gateway.count(f"POST {path}")
+        if path == "/v1/messages":
+            self.handle_completion(anthropic=True)
+        elif path in ("/chat/completions", "/v1/chat/completions"):
+            self.handle_completion(anthropic=False)
+        else:
+            self.read_body()
+            self.send_error_json(404, "not_found_error", f"Unknown endpoint: {path}")
+
+    def health(self) -> Dict:
+        endpoints = [{"model": f"mock/{name}", "model_name": name}
+                     for name in sorted(self.server.gateway.models)]
+        return {
+            "status": "healthy",
+            "healthy_endpoints": endpoints,
+            "unhealthy_endpoints": [],
+            "healthy_count": len(endpoints),
+            "unhealthy_count": 0,
+            "uptime_seconds": round(time.time() - self.server.gateway.started, 1),
+            "requests": dict(self.server.gateway.counters),
+        }
+
+    # Completions
+
+    def handle_completion(self, anthropic: bool):
+        gateway = self.server.gateway
+        try:
+            body = json.loads(self.read_body() or b"{}")
+        except json.JSONDecodeError:
+            return self.send_error_json(400, "invalid_request_error", "Request body is not valid JSON")
+
+        api_key = self.api_key()
+        if api_key not in gateway.api_keys:
+            return self.send_error_json(401, "authentication_error", "Invalid API key")
+
+        model = body.get("model")
+        if not model or not body.get("messages"):
+            return self.send_error_json(400, "invalid_request_error", "model and messages are required")
+        profile = gateway.profile(model)
+        if profile is None:
+            return self.send_error_json(400, "invalid_request_error", f"Invalid model name: {model}")
+
+        admitted, limit_headers = gateway.admit(api_key, model, profile)
+        if not admitted:
+            gateway.count("429")
+            return self.send_error_json(429, "rate_limit_error",
+                                        f"Rate limit of {profile.rpm} requests/minute exceeded",
+                                        limit_headers)
+
+        latency = gateway.sample_latency(profile)
+        if gateway.chance(profile.error_rate):
+            time.sleep(latency)
+            status = gateway.pick_error(profile)
+            gateway.count(str(status))
+            return self.send_error_json(status, "api_error", "Injected upstream failure",
+                                        limit_headers)
+
+        output_tokens = max(1, min(profile.output_tokens, int(body.get("max_tokens") or profile.output_tokens)))
+        input_tokens = max(1, len(json.dumps(body.get("messages"))) // 4)
+        gateway.count("2xx")
+
+        if body.get("stream"):
+            stall = profile.stall_ms / 1000.0 if gateway.chance(profile.slow_stream_rate) else 0.0
+            time.sleep(latency)
+            self.stream(anthropic, model, input_tokens, output_tokens, profile, stall, limit_headers)
+        else:
+            time.sleep(latency + (output_tokens - 1) / profile.tokens_per_second)
+            if anthropic:
+                payload = {
+                    "id": f"msg_mock_{uuid.uuid4().hex[:24]}",
+                    "type": "message",
+                    "role": "assistant",
+                    "model": model,
+                    "content": [{"type": "text", "text": self.completion_text(output_tokens)}],
+                    "stop_reason": "end_turn",
+                    "stop_sequence": None,
+                    "usage": {"input_tokens": input_tokens, "output_tokens": output_tokens},
+                }
+            else:
+                payload = {
+                    "id": f"chatcmpl-mock-{uuid.uuid4().hex[:24]}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": self.completion_text(output_tokens)},
+                        "finish_reason": "stop",
+                    }],
+                    "usage": {"prompt_tokens": input_tokens, "completion_tokens": output_tokens,
+                              "total_tokens": input_tokens + output_tokens},
+                }
+            self.send_json(200, payload, limit_headers)
+
+    def stream(self, anthropic: bool, model: str, input_tokens: int, output_tokens: int,
+               profile: ModelProfile, stall: float, headers: Dict[str, str]):
+        """Write an SSE response, pacing deltas at the profile's token rate"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+
+        message_id = f"{'msg_mock_' if anthropic else 'chatcmpl-mock-'}{uuid.uuid4().hex[:24]}"
+        interval = 1.0 / profile.tokens_per_second
+        stall_at = output_tokens // 2 if stall else -1
+        try:
+            if anthropic:
+                self.write_event("message_start", {"type": "message_start", "message": {
+                    "id": message_id, "type": "message", "role": "assistant", "model": model,
+                    "content": [], "stop_reason": None,
+                    "usage": {"input_tokens": input_tokens, "output_tokens": 1}}})
+                self.write_event("content_block_start", {"type": "content_block_start", "index": 0,
+                                                         "content_block": {"type": "text", "text": ""}})
+            for index in range(output_tokens):
+                if index:
+                    time.sleep(interval)
+                if index == stall_at:
+                    time.sleep(stall)
+                text = f"{index + 1} "
+                if anthropic:
+                    self.write_event("content_block_delta", {"type": "content_block_delta", "index": 0,
+                                                             "delta": {"type": "text_delta", "text": text}})
+                else:
+                    self.write_event(None, {"id": message_id, "object": "chat.completion.chunk",
+                                            "model": model, "choices": [{"index": 0, "delta": {"content": text},
+                                                                         "finish_reason": None}]})
+            if anthropic:
+                self.write_event("content_block_stop", {"type": "content_block_stop", "index": 0})
+                self.write_event("message_delta", {"type": "message_delta",
+                                                   "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                                                   "usage": {"output_tokens": output_tokens}})
+                self.write_event("message_stop", {"type": "message_stop"})
+            else:
+                self.write_event(None, {"id": message_id, "object": "chat.completion.chunk", "model": model,
+                                        "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                                        "usage": {"prompt_tokens": input_tokens,
+                                                  "completion_tokens": output_tokens,
+                                                  "total_tokens": input_tokens + output_tokens}})
+                self.write_chunk(b"data: [DONE]\n\n")
+            self.write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True  # Client went away mid-stream
+
+    # Helpers
+
+    def read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def api_key(self) -> str:
+        authorization = self.headers.get("Authorization", "")
+        if authorization.lower().startswith("bearer "):
+            return authorization[7:].strip()
+        return self.headers.get("x-api-key", "")
+
+    @staticmethod
+    def completion_text(output_tokens: int) -> str:
+        return " ".join(str(i + 1) for i in range(output_tokens))
+
+    def write_event(self, event: Optional[str], data: Dict):
+        prefix = f"event: {event}\n" if event else ""
+        self.write_chunk(f"{prefix}data: {json.dumps(data, separators=(',', ':'))}\n\n".encode("utf-8"))
+
+    def write_chunk(self, payload: bytes):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(payload), payload))
+        self.wfile.flush()
+
+    def send_json(self, status: int, payload: Dict, headers: Optional[Dict[str, str]] = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_error_json(self, status: int, error_type: str, message: str,
+                        headers: Optional[Dict[str, str]] = None):
+        self.send_json(status, {"type": "error", "error": {"type": error_type, "message": message}}, headers)
+
+
+class MockGatewayServer(ThreadingHTTPServer):
+    """Threaded server with a listen backlog deep enough for load tests"""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, address: Tuple[str, int], gateway: MockGateway, verbose: bool = False):
+        super().__init__(address, GatewayHandler)
+        self.gateway = gateway
+        self.verbose = verbose
+
+    def handle_error(self, request, client_address):
+        # Clients that time out and hang up mid-response are routine here
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def load_profiles(path: str, default: ModelProfile) -> Tuple[ModelProfile, Dict[str, ModelProfile]]:
+    """Read a mock profile file, or derive profiles from a LiteLLM config's model_list"""
+    if path.endswith(('.yaml', '.yml')):
+        try:
+            import yaml  # noqa: F401
+        except ImportError:
+            print("Error: PyYAML not installed. Install with: pip install pyyaml")
+            sys.exit(1)
+        from config_loader import load_config
+        data = load_config(path) or {}
+    else:
+        with open(path, 'r') as f:
+            data = json.load(f)
+
+    if "model_list" in data:
+        models = {}
+        for entry in data["model_list"]:
+            params = entry.get("litellm_params", {})
+            # Deployments sharing a model_name share one limit, as summed by the router
+            rpm = models[entry["model_name"]].rpm if entry["model_name"] in models else 0
+            models[entry["model_name"]] = default.with_overrides({"rpm": rpm + int(params.get("rpm") or 0)})
+        return default, models
+
+    default = default.with_overrides(data.get("default", {}))
+    models = {name: default.with_overrides(settings or {})
+              for name, settings in data.get("models", {}).items()}
+    return default, models
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Local mock Anthropic/LiteLLM gateway for offline tests and benchmarks",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Start on port 4000 with default behaviour (300ms median latency, 80 tok/s)
+  python mock-gateway.py --port 4000
+
+  # Mirror the models and rpm limits of a LiteLLM config
+  python mock-gateway.py --port 4000 --profile ../templates/litellm-complete.yaml
+
+  # Flaky, rate-limited gateway for retry and fallback testing
+  python mock-gateway.py --rpm 60 --error-rate 0.05 --slow-stream-rate 0.1
+
+  # Then point any validator or load tool at it
+  python validate-gateway-compatibility.py --url http://localhost:4000 --token sk-1234
+  python gateway-loadtest.py --url http://localhost:4000 --token sk-1234 --rps 200 --duration 30 --workers 256
+
+Profile file (JSON or YAML):
+  default:
+    latency_ms: 300
+  models:
+    gemini-2.5-flash: {latency_ms: 150, tokens_per_second: 200, rpm: 600}
+    gemini-2.5-pro:   {latency_ms: 900, latency_sigma: 0.6, error_rate: 0.02}
+
+Profile settings: latency_ms, latency_sigma, tokens_per_second, output_tokens,
+rpm, error_rate, error_statuses, slow_stream_rate, stall_ms
+        """
+    )
+
+    parser.add_argument('--host', default='127.0.0.1', help='Address to bind (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=4000, help='Port to listen on (default: 4000)')
+    parser.add_argument('--api-key', action='append', dest='api_keys',
+                        help='Accepted API key; repeat for several (default: sk-1234)')
+    parser.add_argument('--profile', help='Mock profile or LiteLLM config (JSON or YAML)')
+    parser.add_argument('--models', nargs='+', help='Model names to serve with the default profile')
+    parser.add_argument('--strict-models', action='store_true',
+                        help='Reject models not in the profile (default: serve any model)')
+    parser.add_argument('--latency-ms', type=float, help='Median time to first token')
+    parser.add_argument('--latency-sigma', type=float, help='Log-normal latency shape (0 = fixed)')
+    parser.add_argument('--tokens-per-second', type=float, help='Generation rate')
+    parser.add_argument('--output-tokens', type=int, help='Tokens generated per response')
+    parser.add_argument('--rpm', type=int, help='Requests per minute per API key and model (0 = unlimited)')
+    parser.add_argument('--error-rate', type=float, help='Share of requests answered with a 5xx')
+    parser.add_argument('--slow-stream-rate', type=float, help='Share of streams that stall')
+    parser.add_argument('--stall-ms', type=float, help='Length of a stream stall')
+    parser.add_argument('--seed', type=int, help='Random seed for reproducible runs')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Log every request')
+
+    args = parser.parse_args()
+
+    overrides = {name: getattr(args, name) for name in
+                 ("latency_ms", "latency_sigma", "tokens_per_second", "output_tokens",
+                  "rpm", "error_rate", "slow_stream_rate", "stall_ms")
+                 if getattr(args, name) is not None}
+    try:
+        default = ModelProfile(**overrides)
+        models: Dict[str, ModelProfile] = {}
+        if args.profile:
+            default, models = load_profiles(args.profile, default)
+            # Command-line settings win over the file
+            default = default.with_overrides(overrides)
+            models = {name: profile.with_overrides(overrides) for name, profile in models.items()}
+        for name in args.models or []:
+            models.setdefault(name, default)
+    except (OSError, ValueError, TypeError, KeyError) as e:
+        print(f"{Colors.RED}Error loading profile: {e}{Colors.RESET}")
+        sys.exit(1)
+
+    gateway = MockGateway(default, models, args.api_keys or ["sk-1234"], args.strict_models, args.seed)
+    server = MockGatewayServer((args.host, args.port), gateway, args.verbose)
+
+    host, port = server.server_address[:2]
+    print(f"{Colors.GREEN}Mock gateway listening on http://{host}:{port}{Colors.RESET}")
+    print(f"  API keys: {', '.join(sorted(gateway.api_keys))}")
+    print(f"  Models: {', '.join(sorted(models)) or 'any (default profile)'}")
+    print(f"  Default profile: {json.dumps(default.as_dict())}")
+    sys.stdout.flush()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,592 @@
+#!/usr/bin/env python3
+"""
+Offline Routing Simulator for LiteLLM Configurations
+
+Purpose: Predict how a LiteLLM config behaves under load - throughput, p99
+         latency, retry amplification and cooldown flapping - and compare
+         routing strategies before rollout, without spending real traffic
+Usage: python routing-simulator.py --config ../templates/litellm-complete.yaml --rps 5 --duration 600
+
+A discrete-event simulation of the LiteLLM router. It reads model_list
+(deployments and their rpm/tpm limits) and router_settings / litellm_settings
+(routing_strategy, num_retries, retry_policy, allowed_fails, cooldown_time,
+fallbacks, timeout), then replays a synthetic or recorded arrival trace.
+
+Deployment behaviour comes from the same profiles as mock-gateway.py
+(latency_ms, latency_sigma, tokens_per_second, output_tokens, error_rate),
+looked up by deployment model, then model_name, then the default profile.
+
+Router behaviour modelled:
+  - strategies: simple-shuffle (rpm-weighted), least-busy, usage-based-routing
+    (lowest tpm this minute, skipping deployments at their rpm/tpm limit),
+    latency-based-routing (lowest recent mean latency), cost-based-routing
+    (first listed deployment; no price data offline)
+  - the provider answers 429 when a deployment's rpm/tpm is exceeded over a
+    sliding minute, a 5xx at the profile's error_rate, and a timeout when the
+    sampled latency exceeds the router timeout
+  - retries per error type (retry_policy, else num_retries); immediate when
+    another healthy deployment exists, else exponential backoff / Retry-After
+  - a 429 cools a deployment down at once; other errors after allowed_fails
+    in a minute; the only deployment of a group is never cooled down
+  - after retries are exhausted, each fallback group is tried in order with
+    its own retries
+
+Requires PyYAML.
+"""
+
+import argparse
+import bisect
+import heapq
+import importlib.util
+import json
+import math
+import random
+import sys
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import yaml
+except ImportError:
+    print("Error: PyYAML not installed. Install with: pip install pyyaml")
+    sys.exit(1)
+
+from config_loader import load_config
+from latency_histogram import LatencyHistogram
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+STRATEGIES = ["simple-shuffle", "least-busy", "usage-based-routing",
+              "usage-based-routing-v2", "latency-based-routing", "cost-based-routing"]
+
+# Router defaults when the config leaves a setting out
+DEFAULT_NUM_RETRIES = 3
+DEFAULT_ALLOWED_FAILS = 3
+DEFAULT_COOLDOWN_TIME = 5.0
+DEFAULT_TIMEOUT = 600.0
+
+RATE_LIMIT_LATENCY = 0.05   # time for a provider to answer 429
+MAX_BACKOFF = 8.0           # cap of the exponential retry backoff
+LATENCY_WINDOW = 10         # samples per deployment for latency-based-routing
+ERROR_TYPES = {
+    "rate_limit": "RateLimitErrorRetries",
+    "server_error": "InternalServerErrorRetries",
+    "timeout": "TimeoutErrorRetries",
+}
+
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    YELLOW = '\033[93m'
+    BLUE = '\033[94m'
+    BOLD = '\033[1m'
+    RESET = '\033[0m'
+
+
+def load_mock_gateway():
+    """Import mock-gateway.py (hyphenated file name) for its profile model"""
+    spec = importlib.util.spec_from_file_location("mock_gateway", SCRIPTS_DIR / "mock-gateway.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def deployment_limit(entry: Dict, key: str) -> Optional[float]:
+    """rpm/tpm of a model_list entry, from litellm_params, the entry or model_info"""
+    for source in (entry.get("litellm_params") or {}, entry, entry.get("model_info") or {}):
+        value = source.get(key)
+        if isinstance(value, (int, float)) and value > 0:
+            return float(value)
+    return None
+
+
+def parse_fallbacks(value) -> Dict[str, List[str]]:
+    """LiteLLM fallbacks ([{model: [fallback, ...]}, ...] or {model: [...]}) as a dict"""
+    fallbacks: Dict[str, List[str]] = {}
+    items = value if isinstance(value, list) else [value] if isinstance(value, dict) else []
+    for item in items:
+        if isinstance(item, dict):
+            for model, targets in item.items():
+                targets = targets if isinstance(targets, list) else [targets]
+                fallbacks.setdefault(model, []).extend(str(t) for t in targets)
+    return fallbacks
+
+
+class Deployment:
+    """One model_list entry: limits, behaviour profile and simulated state"""
+
+    def __init__(self, index: int, group: str, model: str, rpm: Optional[float],
+                 tpm: Optional[float], profile):
+        self.index = index
+        self.group = group
+        self.model = model
+        self.name = f"{group}[{index}]"
+        self.rpm = rpm
+        self.tpm = tpm
+        self.profile = profile
+
+        self.in_flight = 0
+        self.requests = deque()          # provider-side sliding minute: send times
+        self.tokens = deque()            # (time, tokens)
+        self.token_total = 0
+        self.minute = -1                 # router-side usage for the current minute
+        self.minute_requests = 0
+        self.minute_tokens = 0
+        self.failures = deque()          # failure times, for allowed_fails per minute
+        self.cooldown_until = 0.0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+        self.stats = {"calls": 0, "success": 0, "rate_limited": 0, "server_error": 0,
+                      "timeout": 0, "cooldowns": 0, "flaps": 0, "cooldown_seconds": 0.0}
+
+    def _expire(self, now: float):
+        while self.requests and self.requests[0] <= now - 60:
+            self.requests.popleft()
+        while self.tokens and self.tokens[0][0] <= now - 60:
+            self.token_total -= self.tokens.popleft()[1]
+        while self.failures and self.failures[0] <= now - 60:
+            self.failures.popleft()
+
+    def provider_admits(self, now: float, tokens: int) -> Tuple[bool, float]:
+        """Whether the provider accepts a call now; else seconds until it would"""
+        self._expire(now)
+        if self.rpm and len(self.requests) >= self.rpm:
+            return False, self.requests[0] + 60 - now
+        if self.tpm and self.token_total + tokens > self.tpm:
+            return False, self.tokens[0][0] + 60 - now if self.tokens else 60.0
+        return True, 0.0
+
+    def router_usage(self, now: float) -> Tuple[int, int]:
+        """Requests and tokens this calendar minute, as the router tracks them"""
+        if int(now // 60) != self.minute:
+            self.minute, self.minute_requests, self.minute_tokens = int(now // 60), 0, 0
+        return self.minute_requests, self.minute_tokens
+
+    def record_send(self, now: float, tokens: int, admitted: bool):
+        """Count a call; only admitted calls use the provider's quota"""
+        self.router_usage(now)
+        self.minute_requests += 1
+        self.minute_tokens += tokens
+        self.stats["calls"] += 1
+        if admitted:
+            self.requests.append(now)
+            self.tokens.append((now, tokens))
+            self.token_total += tokens
+
+
+class SimRequest:
+    """A client request working its way through its model group and fallbacks"""
+
+    def __init__(self, arrival: float, model: str, tokens: int, groups: List[str]):
+        self.arrival = arrival
+        self.model = model
+        self.tokens = tokens
+        self.groups = groups
+        self.group_index = 0
+        self.retries: Dict[str, int] = {}
+
+    @property
+    def group(self) -> str:
+        return self.groups[self.group_index]
+
+
+class RouterSimulator:
+    """Discrete-event model of the LiteLLM router for one routing strategy"""
+
+    def __init__(self, config: Dict, profiles: Tuple, strategy: Optional[str] = None,
+                 seed: Optional[int] = None):
+        router = config.get("router_settings") or {}
+        litellm_settings = config.get("litellm_settings") or {}
+
+        def setting(key, default):
+            for source in (router, litellm_settings):
+                if source.get(key) is not None:
+                    return source[key]
+            return default
+
+        self.strategy = strategy or router.get("routing_strategy") or "simple-shuffle"
+        if self.strategy not in STRATEGIES:
+            raise ValueError(f"Unknown routing strategy: {self.strategy}")
+        self.num_retries = int(setting("num_retries", DEFAULT_NUM_RETRIES))
+        self.retry_policy = router.get("retry_policy") or {}
+        self.allowed_fails = int(setting("allowed_fails", DEFAULT_ALLOWED_FAILS))
+        self.cooldown_time = float(setting("cooldown_time", DEFAULT_COOLDOWN_TIME))
+        self.timeout = float(setting("timeout", setting("request_timeout", DEFAULT_TIMEOUT)))
+        self.fallbacks = parse_fallbacks(setting("fallbacks", []))
+        self.random = random.Random(seed)
+
+        default, by_name = profiles
+        self.groups: Dict[str, List[Deployment]] = {}
+        for entry in config.get("model_list") or []:
+            group = entry.get("model_name")
+            if not group:
+                continue
+            model = (entry.get("litellm_params") or {}).get("model", group)
+            profile = by_name.get(model) or by_name.get(group) or default
+            deployments = self.groups.setdefault(group, [])
+            deployments.append(Deployment(len(deployments), group, model,
+                                          deployment_limit(entry, "rpm"),
+                                          deployment_limit(entry, "tpm"), profile))
+        if not self.groups:
+            raise ValueError("model_list has no deployments")
+
+        self.events: List = []
+        self.sequence = 0
+        self.latency = LatencyHistogram()
+        self.counts = {"requests": 0, "succeeded": 0, "failed": 0, "provider_calls": 0,
+                       "retries": 0, "fallbacks": 0, "no_deployment": 0}
+        self.last_event = 0.0
+
+    # Event queue
+
+    def schedule(self, at: float, action, *args):
+        self.sequence += 1
+        heapq.heappush(self.events, (at, self.sequence, action, args))
+
+    def run(self, arrivals: List[Tuple[float, str, int]]) -> Dict:
+        """Replay (time, model, tokens) arrivals to completion; return the metrics"""
+        for at, model, tokens in arrivals:
+            self.schedule(at, self.arrive, model, tokens)
+        while self.events:
+            now, _, action, args = heapq.heappop(self.events)
+            self.last_event = now
+            action(now, *args)
+        duration = arrivals[-1][0] if arrivals else 0.0
+        return self.report(duration)
+
+    # Request lifecycle
+
+    def arrive(self, now: float, model: str, tokens: int):
+        self.counts["requests"] += 1
+        groups = [model] + [g for g in self.fallbacks.get(model, []) if g in self.groups]
+        request = SimRequest(now, model, tokens, groups)
+        if model not in self.groups:
+            self.finish(now, request, success=False)
+            return
+        self.dispatch(now, request)
+
+    def healthy(self, group: str, now: float) -> List[Deployment]:
+        return [d for d in self.groups[group] if d.cooldown_until <= now]
+
+    def pick(self, candidates: List[Deployment], now: float, tokens: int) -> Optional[Deployment]:
+        """Choose a deployment the way the configured routing strategy does"""
+        if self.strategy == "least-busy":
+            lowest = min(d.in_flight for d in candidates)
+            return self.random.choice([d for d in candidates if d.in_flight == lowest])
+        if self.strategy.startswith("usage-based-routing"):
+            # Only deployments with rpm/tpm headroom this minute are eligible
+            eligible = []
+            for d in candidates:
+                used_requests, used_tokens = d.router_usage(now)
+                if (not d.rpm or used_requests + 1 <= d.rpm) and (not d.tpm or used_tokens + tokens <= d.tpm):
+                    eligible.append((used_tokens, self.random.random(), d))
+            return min(eligible, key=lambda item: item[:2])[2] if eligible else None
+        if self.strategy == "latency-based-routing":
+            # Untried deployments first, then the lowest recent mean latency
+            def mean_latency(d: Deployment) -> float:
+                return sum(d.latencies) / len(d.latencies) if d.latencies else -1.0
+            return min(candidates, key=lambda d: (mean_latency(d), self.random.random()))
+        if self.strategy == "cost-based-routing":
+            return candidates[0]
+        weights = [d.rpm for d in candidates]
+        if all(weights):
+            cumulative, total = [], 0.0
+            for weight in weights:
+                total += weight
+                cumulative.append(total)
+            return candidates[bisect.bisect_right(cumulative, self.random.random() * total)]
+        return self.random.choice(candidates)
+
+    def dispatch(self, now: float, request: SimRequest):
+        """Route one attempt within the request's current model group"""
+        candidates = self.healthy(request.group, now)
+        deployment = self.pick(candidates, now, request.tokens) if candidates else None
+        if deployment is None:
+            # LiteLLM fails fast with "no deployments available" and moves on
+            self.counts["no_deployment"] += 1
+            self.next_group(now, request)
+            return
+
+        admitted, retry_after = deployment.provider_admits(now, request.tokens)
+        deployment.record_send(now, request.tokens, admitted)
+        self.counts["provider_calls"] += 1
+        if not admitted:
+            self.schedule(now + RATE_LIMIT_LATENCY, self.complete, request, deployment,
+                          now, "rate_limit", retry_after)
+            return
+        deployment.in_flight += 1
+        profile = deployment.profile
+        latency = self.sample_latency(profile)
+        if latency > self.timeout:
+            self.schedule(now + self.timeout, self.complete, request, deployment, now, "timeout", 0.0)
+        elif profile.error_rate > 0 and self.random.random() < profile.error_rate:
+            self.schedule(now + latency, self.complete, request, deployment, now, "server_error", 0.0)
+        else:
+            self.schedule(now + latency, self.complete, request, deployment, now, None, 0.0)
+
+    def sample_latency(self, profile) -> float:
+        first_token = profile.latency_ms / 1000.0
+        if first_token > 0 and profile.latency_sigma > 0:
+            first_token = self.random.lognormvariate(math.log(first_token), profile.latency_sigma)
+        generation = profile.output_tokens / profile.tokens_per_second if profile.tokens_per_second else 0.0
+        return first_token + generation
+
+    def complete(self, now: float, request: SimRequest, deployment: Deployment, sent: float,
+                 error: Optional[str], retry_after: float):
+        if error != "rate_limit":
+            deployment.in_flight -= 1
+        if error is None:
+            deployment.stats["success"] += 1
+            deployment.latencies.append(now - sent)
+            self.finish(now, request, success=True)
+            return
+
+        deployment.stats["rate_limited" if error == "rate_limit" else error] += 1
+        self.record_failure(now, deployment, error)
+
+        allowed = int(self.retry_policy.get(ERROR_TYPES[error], self.num_retries))
+        used = request.retries.get(request.group, 0)
+        if used >= allowed:
+            self.next_group(now, request)
+            return
+        request.retries[request.group] = used + 1
+        self.counts["retries"] += 1
+        if any(d is not deployment for d in self.healthy(request.group, now)):
+            # Another deployment can take the retry straight away
+            delay = 0.0
+        elif error == "rate_limit" and retry_after > 0:
+            delay = retry_after
+        else:
+            delay = min(MAX_BACKOFF, 0.5 * 2 ** used)
+        self.schedule(now + delay, self.dispatch, request)
+
+    def record_failure(self, now: float, deployment: Deployment, error: str):
+        """Apply allowed_fails / cooldown_time to a failed deployment"""
+        if len(self.groups[deployment.group]) == 1:
+            return
+        deployment.failures.append(now)
+        deployment._expire(now)
+        if error != "rate_limit" and len(deployment.failures) < self.allowed_fails:
+            return
+        if deployment.cooldown_until > now:
+            return
+        stats = deployment.stats
+        # Re-entering cooldown within one cooldown period of leaving it is a flap
+        if stats["cooldowns"] and now - deployment.cooldown_until < self.cooldown_time:
+            stats["flaps"] += 1
+        stats["cooldowns"] += 1
+        stats["cooldown_seconds"] += self.cooldown_time
+        deployment.cooldown_until = now + self.cooldown_time
+        deployment.failures.clear()
+
+    def next_group(self, now: float, request: SimRequest):
+        if request.group_index + 1 < len(request.groups):
+            request.group_index += 1
+            self.counts["fallbacks"] += 1
+            self.dispatch(now, request)
+        else:
+            self.finish(now, request, success=False)
+
+    def finish(self, now: float, request: SimRequest, success: bool):
+        if success:
+            self.counts["succeeded"] += 1
+            self.latency.record(now - request.arrival)
+        else:
+            self.counts["failed"] += 1
+
+    # Results
+
+    def report(self, duration: float) -> Dict:
+        counts = self.counts
+        span = max(duration, self.last_event) or 1.0
+        deployments = [d for group in self.groups.values() for d in group]
+        cooldowns = sum(d.stats["cooldowns"] for d in deployments)
+        flaps = sum(d.stats["flaps"] for d in deployments)
+        return {
+            "strategy": self.strategy,
+            "requests": counts["requests"],
+            "succeeded": counts["succeeded"],
+            "failed": counts["failed"],
+            "success_rate": round(counts["succeeded"] / counts["requests"], 4) if counts["requests"] else None,
+            "offered_rps": round(counts["requests"] / duration, 3) if duration else None,
+            "throughput_rps": round(counts["succeeded"] / span, 3),
+            "latency": self.latency.summary(),
+            "retry_amplification": round(counts["provider_calls"] / counts["requests"], 3) if counts["requests"] else None,
+            "provider_calls": counts["provider_calls"],
+            "retries": counts["retries"],
+            "fallbacks": counts["fallbacks"],
+            "no_deployment_available": counts["no_deployment"],
+            "cooldowns": cooldowns,
+            "cooldown_flaps": flaps,
+            "flaps_per_hour": round(flaps / span * 3600, 1),
+            "deployments": {
+                d.name: {"model": d.model, "rpm": d.rpm, "tpm": d.tpm,
+                         **{k: round(v, 1) if isinstance(v, float) else v for k, v in d.stats.items()}}
+                for d in deployments
+            },
+        }
+
+
+def synthetic_arrivals(models: List[Tuple[str, float]], rps: float, duration: float,
+                       arrival: str, tokens: int, seed: Optional[int]) -> List[Tuple[float, str, int]]:
+    """Constant or Poisson arrivals with the model chosen by weight"""
+    rng = random.Random(seed)
+    names = [name for name, _ in models]
+    weights = [weight for _, weight in models]
+    arrivals, now = [], 0.0
+    while True:
+        now += rng.expovariate(rps) if arrival == "poisson" else 1.0 / rps
+        if now >= duration:
+            return arrivals
+        arrivals.append((now, rng.choices(names, weights)[0], tokens))
+
+
+def load_trace(path: str, tokens: int) -> List[Tuple[float, str, int]]:
+    """Recorded trace: JSON lines with t (seconds or epoch), model and optional tokens"""
+    arrivals = []
+    with open(path, 'r') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                arrivals.append((float(record.get("t", record.get("timestamp"))), str(record["model"]),
+                                 int(record.get("tokens", tokens))))
+            except (ValueError, KeyError, TypeError) as e:
+                raise ValueError(f"{path}:{line_number}: bad trace record ({e})")
+    arrivals.sort()
+    start = arrivals[0][0] if arrivals else 0.0
+    return [(at - start, model, count) for at, model, count in arrivals]
+
+
+def parse_mix(value: Optional[str], groups: List[str]) -> List[Tuple[str, float]]:
+    """"model=weight,..." request mix; uniform over model groups by default"""
+    if not value:
+        return [(group, 1.0) for group in groups]
+    mix = []
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        mix.append((name.strip(), float(weight or 1)))
+    return mix
+
+
+def print_comparison(results: List[Dict]):
+    print(f"\n{Colors.BOLD}{'='*78}")
+    print("Routing Simulation")
+    print(f"{'='*78}{Colors.RESET}\n")
+    rows = [
+        ("throughput (req/s)", lambda r: f"{r['throughput_rps']:.2f}"),
+        ("success rate", lambda r: f"{r['success_rate']:.1%}" if r['success_rate'] is not None else "-"),
+        ("p50 latency (ms)", lambda r: f"{r['latency']['p50_ms']:.0f}" if r['latency']['p50_ms'] is not None else "-"),
+        ("p99 latency (ms)", lambda r: f"{r['latency']['p99_ms']:.0f}" if r['latency']['p99_ms'] is not None else "-"),
+        ("retry amplification", lambda r: f"{r['retry_amplification']:.2f}x" if r['retry_amplification'] else "-"),
+        ("retries", lambda r: str(r['retries'])),
+        ("fallbacks", lambda r: str(r['fallbacks'])),
+        ("no deployment", lambda r: str(r['no_deployment_available'])),
+        ("cooldowns", lambda r: str(r['cooldowns'])),
+        ("cooldown flaps/hour", lambda r: f"{r['flaps_per_hour']:g}"),
+    ]
+    width = max(14, max(len(r["strategy"]) for r in results) + 2)
+    print(f"{'':<22}" + "".join(f"{r['strategy']:>{width}}" for r in results))
+    for label, cell in rows:
+        print(f"{label:<22}" + "".join(f"{cell(r):>{width}}" for r in results))
+
+    first = results[0]
+    print(f"\nOffered load: {first['requests']} requests ({first['offered_rps']:g} req/s)")
+    for result in results:
+        if result["flaps_per_hour"] > 0:
+            flapping = [name for name, d in result["deployments"].items() if d["flaps"]]
+            print(f"{Colors.YELLOW}⚠ {result['strategy']}: cooldown flapping on {', '.join(flapping)}"
+                  f"{Colors.RESET}")
+        if result["success_rate"] is not None and result["success_rate"] < 0.99:
+            print(f"{Colors.RED}✗ {result['strategy']}: {result['failed']} requests failed "
+                  f"after retries and fallbacks{Colors.RESET}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Offline discrete-event simulator for LiteLLM routing configurations",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Ten minutes at 5 req/s against the configured strategy
+  python routing-simulator.py --config ../templates/litellm-complete.yaml --rps 5 --duration 600
+
+  # Compare strategies on the same Poisson trace, with a flaky model
+  python routing-simulator.py --config ../templates/multi-provider/multi-provider-config.yaml \\
+    --rps 3 --duration 1800 --arrival poisson --seed 7 \\
+    --compare simple-shuffle least-busy usage-based-routing latency-based-routing \\
+    --profile profiles.yaml
+
+  # Replay a recorded trace (JSON lines: {"t": 12.5, "model": "gemini-2.5-pro", "tokens": 3000})
+  python routing-simulator.py --config litellm.yaml --trace requests.jsonl --output sim.json
+
+Profile file: the mock-gateway.py format, keyed by model_name or deployment model
+  default: {latency_ms: 800, latency_sigma: 0.4}
+  models:
+    gemini-2.5-pro: {latency_ms: 2500, error_rate: 0.05}
+        """
+    )
+
+    parser.add_argument('--config', required=True, help='LiteLLM config (YAML)')
+    parser.add_argument('--profile', help='Deployment behaviour profiles (mock-gateway format)')
+    parser.add_argument('--trace', help='Recorded arrivals (JSON lines) instead of a synthetic trace')
+    parser.add_argument('--rps', type=float, default=2.0, help='Synthetic arrival rate (default: 2)')
+    parser.add_argument('--duration', type=float, default=600, help='Synthetic trace length in seconds (default: 600)')
+    parser.add_argument('--arrival', choices=['constant', 'poisson'], default='poisson',
+                        help='Synthetic inter-arrival distribution (default: poisson)')
+    parser.add_argument('--mix', help='Request mix as model=weight,... (default: uniform over model_name)')
+    parser.add_argument('--tokens', type=int, default=1000, help='Tokens per request for tpm limits (default: 1000)')
+    parser.add_argument('--error-rate', type=float, help='Override every profile\'s error_rate')
+    parser.add_argument('--compare', nargs='+', choices=STRATEGIES, metavar='STRATEGY',
+                        help=f'Strategies to compare (choices: {", ".join(STRATEGIES)})')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1)')
+    parser.add_argument('--verbose', action='store_true', help='Show per-deployment results')
+    parser.add_argument('--output', help='Export results to JSON file')
+
+    args = parser.parse_args()
+    if args.rps <= 0 or args.duration <= 0:
+        parser.error("--rps and --duration must be positive")
+
+    try:
+        config = load_config(args.config) or {}
+        mock = load_mock_gateway()
+        default, by_name = mock.ModelProfile(), {}
+        if args.profile:
+            default, by_name = mock.load_profiles(args.profile, default)
+        if args.error_rate is not None:
+            default = default.with_overrides({"error_rate": args.error_rate})
+            by_name = {name: p.with_overrides({"error_rate": args.error_rate}) for name, p in by_name.items()}
+        groups = sorted({e.get("model_name") for e in config.get("model_list") or [] if e.get("model_name")})
+        if args.trace:
+            arrivals = load_trace(args.trace, args.tokens)
+        else:
+            arrivals = synthetic_arrivals(parse_mix(args.mix, groups), args.rps, args.duration,
+                                          args.arrival, args.tokens, args.seed)
+        strategies = args.compare or [None]
+        results = [RouterSimulator(config, (default, by_name), strategy, args.seed).run(arrivals)
+                   for strategy in strategies]
+    except (OSError, ValueError, TypeError, yaml.YAMLError) as e:
+        print(f"{Colors.RED}Error: {e}{Colors.RESET}")
+        sys.exit(1)
+
+    print(f"Simulated {len(arrivals)} requests across {len(groups)} model groups")
+    print_comparison(results)
+    if args.verbose:
+        for result in results:
+            print(f"\n{Colors.BOLD}{result['strategy']}: per deployment{Colors.RESET}")
+            print(f"{'deployment':<34}{'calls':>8}{'ok':>8}{'429':>6}{'5xx':>6}{'t/o':>6}{'cooldowns':>11}{'flaps':>7}")
+            for name, d in result["deployments"].items():
+                print(f"{name:<34}{d['calls']:>8}{d['success']:>8}{d['rate_limited']:>6}"
+                      f"{d['server_error']:>6}{d['timeout']:>6}{d['cooldowns']:>11}{d['flaps']:>7}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"config": args.config, "results": results}, f, indent=2)
+        print(f"\nResults exported to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Streaming Latency Profiler for LLM Gateways
+
+Purpose: Measure what users feel when Claude Code streams through a gateway:
+         connection setup, time to first byte, time to first token,
+         inter-token gaps, tokens/second and total stream time, per model
+Usage: python stream-profiler.py --url https://gateway.example.com --token your-api-key --models claude-3-5-sonnet-20241022 --repeat 10
+
+Each run opens a fresh connection with http.client so that connection setup
+(DNS + TCP + TLS) and time to first byte are measured separately, then reads
+the body in raw chunks through an incremental SSE parser, timestamping each
+event as it arrives.
+
+A gateway or proxy that buffers the whole response before forwarding it
+still returns valid SSE, so check_streaming_support passes; here it shows up
+as all content_block_delta events arriving at once, and is flagged.
+"""
+
+import argparse
+import http.client
+import json
+import sys
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from latency_histogram import LatencyHistogram, format_table
+
+DEFAULT_MODELS = ["claude-3-5-sonnet-20241022"]
+DEFAULT_PROMPT = "Count from 1 to 50, one number per line."
+
+# A stream is considered buffered when its deltas arrive within this share of
+# the stream's total duration (and within MIN_DELTA_SPREAD seconds).
+BUFFERED_SPREAD_RATIO = 0.05
+MIN_DELTA_SPREAD = 0.02
+MIN_DELTAS_FOR_DETECTION = 3
+
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    YELLOW = '\033[93m'
+    BLUE = '\033[94m'
+    BOLD = '\033[1m'
+    RESET = '\033[0m'
+
+
+class SSEParser:
+    """Incremental Server-Sent Events parser.
+
+    feed() accepts raw bytes as they arrive from the socket and yields one
+    (event, data) pair per complete event. Bytes are kept in a single
+    bytearray, scanned once (`scan` remembers how far a partial event has
+    been searched for its blank line) and read through a memoryview; only
+    the event name is decoded and data stays as bytes, so callers decode
+    JSON only for the events they care about.
+    """
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.scan = 0
+
+    def feed(self, chunk: bytes) -> Iterator[Tuple[str, bytes]]:
+        buffer = self.buffer
+        buffer += chunk
+        start = 0
+        while True:
+            end, separator = self._find_boundary(buffer, start)
+            if end < 0:
+                break
+            event = self._parse_block(buffer, start, end)
+            start = end + separator
+            if event is not None:
+                yield event
+        if start:
+            del buffer[:start]
+            self.scan -= start
+
+    def _find_boundary(self, buffer: bytearray, start: int) -> Tuple[int, int]:
+        """Find the blank line ("\n\n" or "\r\n\r\n") ending the event at `start`."""
+        pos = max(start, self.scan)
+        while True:
+            newline = buffer.find(b"\n", pos)
+            if newline < 0:
+                self.scan = len(buffer)
+                return -1, 0
+            following = buffer[newline + 1:newline + 3]
+            if following[:1] == b"\n":
+                return newline, 2
+            if following == b"\r\n" and newline > start and buffer[newline - 1] == 13:
+                return newline - 1, 4
+            if len(following) < 2 and following in (b"", b"\r"):
+                # The rest of the separator has not arrived yet
+                self.scan = newline
+                return -1, 0
+            pos = newline + 1
+
+    @staticmethod
+    def _parse_block(buffer: bytearray, start: int, end: int) -> Optional[Tuple[str, bytes]]:
+        event = "message"
+        data = []
+        view = memoryview(buffer)
+        pos = start
+        while pos < end:
+            eol = buffer.find(b"\n", pos, end)
+            if eol < 0:
+                eol = end
+            line_end = eol - 1 if eol > pos and buffer[eol - 1] == 13 else eol
+            if buffer.startswith(b"data:", pos, line_end):
+                value = pos + 6 if pos + 5 < line_end and buffer[pos + 5] == 32 else pos + 5
+                data.append(view[value:line_end])
+            elif buffer.startswith(b"event:", pos, line_end):
+                event = bytes(view[pos + 6:line_end]).strip().decode("utf-8", "replace")
+            # Comments (":") and id/retry fields carry no timing information
+            pos = eol + 1
+        result = None if not data and event == "message" else (event, b"\n".join(data))
+        # Release the views so feed() can trim the buffer
+        data.clear()
+        view.release()
+        return result
+
+
+class StreamRun:
+    """Timings for one streamed request, in seconds from the start of the request"""
+
+    def __init__(self, model: str):
+        self.model = model
+        self.status = 0
+        self.error: Optional[str] = None
+        self.connect: Optional[float] = None
+        self.ttfb: Optional[float] = None
+        self.first_token: Optional[float] = None
+        self.total: Optional[float] = None
+        self.delta_times: List[float] = []
+        self.reads = 0
+        self.output_tokens: Optional[int] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 200 and self.error is None
+
+    @property
+    def gaps(self) -> List[float]:
+        return [b - a for a, b in zip(self.delta_times, self.delta_times[1:])]
+
+    @property
+    def tokens(self) -> int:
+        """Output tokens from usage when reported, else the delta count"""
+        return self.output_tokens if self.output_tokens else len(self.delta_times)
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        """Generation rate after the first token (None for buffered streams)"""
+        if self.first_token is None or self.total is None or self.tokens < 2 or self.buffered:
+            return None
+        generating = self.total - self.first_token
+        return (self.tokens - 1) / generating if generating > 0 else None
+
+    @property
+    def buffered(self) -> bool:
+        """True when every delta arrived in one burst at the end of the stream"""
+        if len(self.delta_times) < MIN_DELTAS_FOR_DETECTION or not self.total:
+            return False
+        spread = self.delta_times[-1] - self.delta_times[0]
+        return spread < max(MIN_DELTA_SPREAD, self.total * BUFFERED_SPREAD_RATIO)
+
+
+class StreamProfiler:
+    """Streams completions per model and aggregates their latency profile"""
+
+    def __init__(self, gateway_url: str, auth_token: str, prompt: str = DEFAULT_PROMPT,
+                 max_tokens: int = 256, timeout: float = 120):
+        parts = urlsplit(gateway_url.rstrip('/'))
+        self.scheme = parts.scheme or "https"
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = f"{parts.path}/v1/messages"
+        self.auth_token = auth_token
+        self.prompt = prompt
+        self.max_tokens = max_tokens
+        self.timeout = timeout
+        self.runs: Dict[str, List[StreamRun]] = {}
+
+    def _connection(self) -> http.client.HTTPConnection:
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def profile_once(self, model: str) -> StreamRun:
+        """Stream one completion on a fresh connection and time each phase"""
+        run = StreamRun(model)
+        body = json.dumps({
+            "model": model,
+            "max_tokens": self.max_tokens,
+            "messages": [{"role": "user", "content": self.prompt}],
+            "stream": True
+        }).encode("utf-8")
+        headers = {
+            "Authorization": f"Bearer {self.auth_token}",
+            "Content-Type": "application/json",
+            "Accept": "text/event-stream",
+            "anthropic-version": "2023-06-01"
+        }
+
+        conn = self._connection()
+        start = time.perf_counter()
+        try:
+            conn.connect()
+            run.connect = time.perf_counter() - start
+            conn.request("POST", self.path, body=body, headers=headers)
+            response = conn.getresponse()
+            run.ttfb = time.perf_counter() - start
+            run.status = response.status
+            if response.status != 200:
+                response.read()
+                run.total = time.perf_counter() - start
+                return run
+
+            parser = SSEParser()
+            stopped = False
+            while not stopped:
+                chunk = response.read1(65536)
+                if not chunk:
+                    break
+                now = time.perf_counter() - start
+                run.reads += 1
+                for event, data in parser.feed(chunk):
+                    if event == "content_block_delta":
+                        run.delta_times.append(now)
+                    elif event == "message_delta":
+                        usage = json.loads(data).get("usage") or {}
+                        run.output_tokens = usage.get("output_tokens", run.output_tokens)
+                    elif event == "error":
+                        run.error = data.decode("utf-8", "replace")[:200]
+                    elif event == "message_stop":
+                        stopped = True
+                        break
+            run.total = time.perf_counter() - start
+            if run.delta_times:
+                run.first_token = run.delta_times[0]
+        except (OSError, http.client.HTTPException, ValueError) as e:
+            run.error = f"{type(e).__name__}: {e}"
+        finally:
+            conn.close()
+        return run
+
+    def profile(self, models: List[str], repeat: int, verbose: bool = False):
+        for model in models:
+            print(f"{Colors.BLUE}Profiling {model} ({repeat} streams)...{Colors.RESET}")
+            runs = self.runs.setdefault(model, [])
+            for _ in range(repeat):
+                run = self.profile_once(model)
+                runs.append(run)
+                if verbose:
+                    print(f"  status={run.status} ttft={_ms(run.first_token)} "
+                          f"total={_ms(run.total)} deltas={len(run.delta_times)} reads={run.reads}"
+                          + (f" error={run.error}" if run.error else ""))
+
+    def model_histograms(self, runs: List[StreamRun]) -> Dict[str, LatencyHistogram]:
+        phases = {name: LatencyHistogram() for name in
+                  ("connect", "ttfb", "ttft", "token_gap", "total")}
+        for run in runs:
+            if not run.ok:
+                continue
+            for name, value in (("connect", run.connect), ("ttfb", run.ttfb),
+                                ("ttft", run.first_token), ("total", run.total)):
+                if value is not None:
+                    phases[name].record(value)
+            for gap in run.gaps:
+                phases["token_gap"].record(gap)
+        return phases
+
+    def report(self) -> Dict:
+        """Per-model results as a JSON-serialisable dict"""
+        models = {}
+        for model, runs in self.runs.items():
+            ok = [run for run in runs if run.ok]
+            rates = sorted(r for r in (run.tokens_per_second for run in ok) if r is not None)
+            models[model] = {
+                "streams": len(runs),
+                "succeeded": len(ok),
+                "errors": sorted({run.error or f"HTTP {run.status}" for run in runs if not run.ok}),
+                "buffered_streams": sum(run.buffered for run in ok),
+                "phases_ms": {name: histogram.summary()
+                              for name, histogram in self.model_histograms(runs).items()},
+                "tokens_per_second": {
+                    "p10": _rank(rates, 10), "p50": _rank(rates, 50), "p90": _rank(rates, 90)
+                }
+            }
+        return models
+
+    def print_report(self):
+        print(f"\n{Colors.BOLD}{'='*60}")
+        print("Streaming Latency Profile")
+        print(f"{'='*60}{Colors.RESET}")
+        buffering_detected = False
+
+        for model, summary in self.report().items():
+            print(f"\n{Colors.BOLD}{model}{Colors.RESET}: "
+                  f"{summary['succeeded']}/{summary['streams']} streams succeeded")
+            for error in summary["errors"]:
+                print(f"  {Colors.RED}✗ {error}{Colors.RESET}")
+            if not summary["succeeded"]:
+                continue
+            print(format_table(self.model_histograms(self.runs[model])))
+            rates = summary["tokens_per_second"]
+            if rates["p50"] is not None:
+                print(f"  tokens/s after first token: p10={rates['p10']:.1f} "
+                      f"p50={rates['p50']:.1f} p90={rates['p90']:.1f}")
+            if summary["buffered_streams"]:
+                buffering_detected = True
+                print(f"  {Colors.YELLOW}⚠ {summary['buffered_streams']}/{summary['succeeded']} "
+                      f"streams arrived in a single burst (response buffered){Colors.RESET}")
+
+        if buffering_detected:
+            print(f"\n{Colors.YELLOW}A gateway or proxy between you and the provider is buffering "
+                  f"SSE responses.{Colors.RESET}")
+            print("  Disable response buffering (e.g. nginx 'proxy_buffering off;' or the "
+                  "'X-Accel-Buffering: no' header) so tokens reach Claude Code as they are generated.")
+
+
+def _ms(seconds: Optional[float]) -> str:
+    return "-" if seconds is None else f"{seconds * 1000:.0f}ms"
+
+
+def _rank(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return round(sorted_values[int(rank) - 1], 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Profile streaming latency (TTFT, inter-token gaps) through an LLM gateway",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Profile the default model with 10 streams
+  python stream-profiler.py \\
+    --url https://gateway.example.com \\
+    --token your-api-key \\
+    --repeat 10
+
+  # Compare several models and export the results
+  python stream-profiler.py \\
+    --url http://localhost:4000 \\
+    --token sk-1234 \\
+    --models gemini-2.5-flash gemini-2.5-pro claude-3-5-sonnet-20241022 \\
+    --repeat 20 --output stream-profile.json
+
+Phases (ms, from the start of each request):
+  connect      DNS + TCP + TLS on a fresh connection
+  ttfb         response headers received
+  ttft         first content_block_delta event received (time to first token)
+  token_gap    time between consecutive content_block_delta events
+  total        end of stream
+        """
+    )
+
+    parser.add_argument('--url', required=True, help='Gateway base URL')
+    parser.add_argument('--token', required=True, help='Gateway API key/token')
+    parser.add_argument('--models', nargs='+', default=DEFAULT_MODELS, help='Models to profile')
+    parser.add_argument('--repeat', type=int, default=5, help='Streams per model (default: 5)')
+    parser.add_argument('--max-tokens', type=int, default=256, help='max_tokens per request (default: 256)')
+    parser.add_argument('--prompt', default=DEFAULT_PROMPT, help='Prompt to send')
+    parser.add_argument('--timeout', type=float, default=120, help='Socket timeout in seconds (default: 120)')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Print each stream as it completes')
+    parser.add_argument('--output', help='Export results to JSON file')
+
+    args = parser.parse_args()
+    if args.repeat <= 0:
+        parser.error("--repeat must be positive")
+
+    profiler = StreamProfiler(args.url, args.token, args.prompt, args.max_tokens, args.timeout)
+    profiler.profile(args.models, args.repeat, args.verbose)
+    profiler.print_report()
+
+    report = profiler.report()
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults exported to: {args.output}")
+
+    sys.exit(0 if all(model["succeeded"] for model in report.values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
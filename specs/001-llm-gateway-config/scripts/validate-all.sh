@@ -1,6 +1,16 @@
 #!/bin/bash
 # Master validation script - runs all validation checks
-# Usage: bash scripts/validate-all.sh [--verbose] [--config path/to/config.yaml]
+# Usage: bash scripts/validate-all.sh [--verbose] [--force] [--config path/to/config.yaml]
+#
+# Offline checks (YAML parsing, config and provider env var validation) are
+# cached by their inputs: the sha256 of every file they read, the names and
+# values of the environment variables they depend on, and the Python version.
+# A check whose inputs are unchanged replays its last result instead of
+# rerunning. Use --force to rerun everything, or set
+# GATEWAY_RESULT_CACHE_DIR=off to disable the cache.
+#
+# scripts/gateway-doctor.py runs the same validators in a single Python
+# process, concurrently, with a combined JSON report.
 
 set -e
 
@@ -14,6 +24,7 @@ NC='\033[0m' # No Color
 # Configuration
 VERBOSE=false
 CONFIG_FILE=""
+FORCE=false
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 PROJECT_ROOT="$(dirname "$SCRIPT_DIR")"
 
@@ -24,6 +35,10 @@ while [[ $# -gt 0 ]]; do
             VERBOSE=true
             shift
             ;;
+        --force|-f)
+            FORCE=true
+            shift
+            ;;
         --config|-c)
             CONFIG_FILE="$2"
             shift 2
@@ -34,6 +49,7 @@ while [[ $# -gt 0 ]]; do
             echo "Options:"
             echo "  --verbose, -v          Enable verbose output"
             echo "  --config FILE, -c FILE Use specific config file"
+            echo "  --force, -f            Rerun cached checks even if their inputs are unchanged"
             echo "  --help, -h             Show this help message"
             exit 0
             ;;
@@ -49,6 +65,19 @@ TOTAL_TESTS=0
 PASSED_TESTS=0
 FAILED_TESTS=0
 SKIPPED_TESTS=0
+CACHED_TESTS=0
+
+# Result cache: one entry per check, named by the hash of its inputs.
+# Bump RESULT_CACHE_VERSION when the way checks are run changes.
+RESULT_CACHE_VERSION=1
+RESULT_CACHE_DIR="${GATEWAY_RESULT_CACHE_DIR:-${XDG_CACHE_HOME:-$HOME/.cache}/llm-gateway-config/results}"
+
+# Variables read by validate-provider-env-vars.py (PROVIDER_REQUIREMENTS and LITELLM_REQUIREMENTS)
+PROVIDER_ENV_VARS="ANTHROPIC_API_KEY ANTHROPIC_BASE_URL ANTHROPIC_LOG \
+AWS_REGION AWS_ACCESS_KEY_ID AWS_SECRET_ACCESS_KEY AWS_SESSION_TOKEN ANTHROPIC_BEDROCK_BASE_URL \
+CLAUDE_CODE_SKIP_BEDROCK_AUTH VERTEX_PROJECT_ID VERTEX_LOCATION GOOGLE_APPLICATION_CREDENTIALS \
+ANTHROPIC_VERTEX_BASE_URL CLAUDE_CODE_SKIP_VERTEX_AUTH \
+LITELLM_MASTER_KEY REDIS_HOST REDIS_PORT REDIS_PASSWORD DATABASE_URL"
 
 # Log functions
 log_info() {
@@ -122,6 +151,106 @@ check_command() {
     fi
 }
 
+if check_command sha256sum; then
+    SHA256="sha256sum"
+elif check_command shasum; then
+    SHA256="shasum -a 256"
+else
+    RESULT_CACHE_DIR="off"
+fi
+
+# Hash of a check's inputs. Arguments are file paths, or env:NAME for an
+# environment variable; values are only ever stored hashed.
+result_key() {
+    local test_command="$1"
+    shift
+    {
+        echo "v$RESULT_CACHE_VERSION $PYTHON_VERSION"
+        echo "$test_command"
+        local input
+        for input in "$@"; do
+            if [[ "$input" == env:* ]]; then
+                local var="${input#env:}"
+                echo "$input ${!var+set} $(printf '%s' "${!var}" | $SHA256)"
+            elif [ -f "$input" ]; then
+                echo "file $input $($SHA256 < "$input")"
+            else
+                echo "file $input missing"
+            fi
+        done
+    } | $SHA256 | cut -d' ' -f1
+}
+
+# Like run_test ("quiet") or run_test_with_output ("output"), but replays the
+# stored result when the inputs listed after the command are unchanged.
+run_cached_test() {
+    local mode="$1"
+    local test_name="$2"
+    local test_command="$3"
+    shift 3
+
+    if [ "$RESULT_CACHE_DIR" = "off" ]; then
+        if [ "$mode" = "output" ]; then
+            run_test_with_output "$test_name" "$test_command"
+        else
+            run_test "$test_name" "$test_command"
+        fi
+        return
+    fi
+
+    ((TOTAL_TESTS++))
+
+    local key entry status
+    key=$(result_key "$test_command" "$@")
+    entry="$RESULT_CACHE_DIR/$key"
+
+    if [ "$FORCE" = false ] && [ -f "$entry.status" ] && [ -f "$entry.out" ]; then
+        status=$(cat "$entry.status")
+        CACHED_TESTS=$((CACHED_TESTS + 1))
+        if [ "$mode" = "output" ]; then
+            cat "$entry.out"
+        elif [ "$status" -ne 0 ] && [ "$VERBOSE" = true ]; then
+            sed 's/^/    /' "$entry.out"
+        fi
+        if [ "$status" -eq 0 ]; then
+            log_success "$test_name (cached)"
+            return 0
+        fi
+        log_error "$test_name (cached)"
+        return 1
+    fi
+
+    if [ "$mode" = "output" ] || [ "$VERBOSE" = true ]; then
+        log_info "Running: $test_name"
+    fi
+
+    local output
+    output=$(mktemp "${TMPDIR:-/tmp}/validate-all.XXXXXX")
+    if [ "$mode" = "output" ]; then
+        eval "$test_command" 2>&1 | tee "$output"
+        status=${PIPESTATUS[0]}
+    else
+        eval "$test_command" > "$output" 2>&1 && status=0 || status=$?
+        if [ "$status" -ne 0 ] && [ "$VERBOSE" = true ]; then
+            sed 's/^/    /' "$output"
+        fi
+    fi
+
+    # Output first, status last: an entry without a status file is never replayed
+    if mkdir -p -m 700 "$RESULT_CACHE_DIR" 2>/dev/null \
+        && cp "$output" "$entry.out.$$" && mv "$entry.out.$$" "$entry.out"; then
+        echo "$status" > "$entry.status.$$" && mv "$entry.status.$$" "$entry.status"
+    fi
+    rm -f "$output"
+
+    if [ "$status" -eq 0 ]; then
+        log_success "$test_name"
+        return 0
+    fi
+    log_error "$test_name"
+    return 1
+}
+
 # Header
 echo ""
 echo "╔════════════════════════════════════════════════════════════╗"
@@ -173,7 +302,9 @@ if [ -d "$PROJECT_ROOT/templates" ]; then
     for yaml_file in "$PROJECT_ROOT/templates"/**/*.yaml; do
         if [ -f "$yaml_file" ]; then
             filename=$(basename "$yaml_file")
-            run_test "Validate YAML: $filename" "python3 -c 'import yaml; yaml.safe_load(open(\"$yaml_file\"))'"
+            # Parsed with the same loader (and libyaml) the validators use
+            run_cached_test quiet "Validate YAML: $filename" "python3 $SCRIPT_DIR/config_loader.py \"$yaml_file\"" \
+                "$yaml_file" "$SCRIPT_DIR/config_loader.py"
         fi
     done
 else
@@ -182,7 +313,10 @@ fi
 
 # Run config validator if available
 if [ -f "$SCRIPT_DIR/validate-config.py" ] && [ -n "$CONFIG_FILE" ] && [ -f "$CONFIG_FILE" ]; then
-    run_test_with_output "Validate configuration file" "python3 $SCRIPT_DIR/validate-config.py $CONFIG_FILE"
+    # validate-config.py checks the variables the config references as os.environ/NAME
+    CONFIG_ENV_INPUTS=$(grep -o 'os\.environ/[A-Za-z_][A-Za-z0-9_]*' "$CONFIG_FILE" | sort -u | sed 's|^os\.environ/|env:|' || true)
+    run_cached_test output "Validate configuration file" "python3 $SCRIPT_DIR/validate-config.py \"$CONFIG_FILE\"" \
+        "$CONFIG_FILE" "$SCRIPT_DIR/validate-config.py" "$SCRIPT_DIR/config_loader.py" $CONFIG_ENV_INPUTS
 elif [ -f "$SCRIPT_DIR/validate-config.py" ]; then
     log_skip "No config file specified (use --config)"
 else
@@ -215,8 +349,13 @@ if [ -n "$ANTHROPIC_BASE_URL" ]; then
 fi
 
 # Run provider env vars validator
-if [ -f "$SCRIPT_DIR/validate-provider-env-vars.py" ]; then
-    run_test_with_output "Validate provider environment variables" "python3 $SCRIPT_DIR/validate-provider-env-vars.py"
+if [ -f "$SCRIPT_DIR/validate-provider-env-vars.py" ] && [ -n "$CONFIG_FILE" ] && [ -f "$CONFIG_FILE" ]; then
+    PROVIDER_ENV_INPUTS=$(printf 'env:%s ' $PROVIDER_ENV_VARS)
+    run_cached_test output "Validate provider environment variables" \
+        "python3 $SCRIPT_DIR/validate-provider-env-vars.py \"$CONFIG_FILE\"" \
+        "$CONFIG_FILE" "$SCRIPT_DIR/validate-provider-env-vars.py" "$SCRIPT_DIR/config_loader.py" $PROVIDER_ENV_INPUTS
+elif [ -f "$SCRIPT_DIR/validate-provider-env-vars.py" ]; then
+    log_skip "Provider env vars validation needs a config file (use --config)"
 else
     log_skip "Provider env vars validator not found"
 fi
@@ -345,6 +484,9 @@ echo "  Total tests:   $TOTAL_TESTS"
 echo -e "  ${GREEN}Passed:${NC}        $PASSED_TESTS"
 echo -e "  ${RED}Failed:${NC}        $FAILED_TESTS"
 echo -e "  ${YELLOW}Skipped:${NC}       $SKIPPED_TESTS"
+if [ $CACHED_TESTS -gt 0 ]; then
+    echo "  Cached:        $CACHED_TESTS (inputs unchanged; --force to rerun)"
+fi
 echo ""
 
 # Calculate pass rate
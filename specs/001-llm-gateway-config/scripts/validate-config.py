@@ -3,6 +3,7 @@
 Configuration Validation Script
 Purpose: Validate LiteLLM configuration files and environment variables
 Usage: python validate-config.py <path-to-litellm-config.yaml>
+       python validate-config.py capacity <path-to-litellm-config.yaml> --users 200 --rpm-per-user 30
 """
 
 import argparse
@@ -18,12 +19,27 @@ except ImportError:
     print("Error: PyYAML is required. Install with: pip install pyyaml", file=sys.stderr)
     sys.exit(1)
 
+from config_loader import load_config
+
+# LiteLLM router default when neither router_settings nor litellm_settings set num_retries
+DEFAULT_NUM_RETRIES = 3
+# Utilization above which a model is reported as close to saturation
+CAPACITY_WARNING_UTILIZATION = 0.8
+# Performance lint thresholds
+DEFAULT_CLIENT_TIMEOUT = 600        # Claude Code's default API timeout, seconds
+DEFAULT_ALLOWED_FAILS = 3
+MAX_AMPLIFICATION = 8               # provider calls one client request may turn into
+MIN_COOLDOWN_TIME = 10              # shorter cooldowns re-probe failing deployments too often
+MAX_COOLDOWN_TIME = 300             # longer cooldowns park healthy capacity after a blip
+USAGE_BASED_STRATEGIES = ('usage-based-routing', 'usage-based-routing-v2')
+
 
 class ConfigValidator:
     """Validates LiteLLM configuration files and environment variables."""
     
-    def __init__(self, config_path: str):
+    def __init__(self, config_path: str, client_timeout: float = DEFAULT_CLIENT_TIMEOUT):
         self.config_path = Path(config_path)
+        self.client_timeout = client_timeout
         self.config: Optional[Dict[str, Any]] = None
         self.errors: List[str] = []
         self.warnings: List[str] = []
@@ -48,8 +64,7 @@ class ConfigValidator:
             return False
             
         try:
-            with open(self.config_path, 'r') as f:
-                self.config = yaml.safe_load(f)
+            self.config = load_config(self.config_path)
         except yaml.YAMLError as e:
             self.errors.append(f"Invalid YAML syntax: {e}")
             return False
@@ -204,6 +219,7 @@ class ConfigValidator:
             return
             
         router_settings = self.config.get('router_settings', {})
+        self._lint_router_performance()
         
         if not router_settings:
             return  # Router settings are optional
@@ -232,6 +248,110 @@ class ConfigValidator:
                         f"retry_policy.{key} must be a non-negative integer, got: {value}"
                     )
     
+    def _lint_router_performance(self):
+        """Warn about router settings that cost latency or capacity, with the impact quantified."""
+        router_settings = (self.config or {}).get('router_settings') or {}
+        retry_policy = router_settings.get('retry_policy') or {}
+        if not isinstance(retry_policy, dict):
+            return
+        try:
+            num_retries = int(self._router_setting('num_retries', DEFAULT_NUM_RETRIES))
+            # Only an explicit timeout is linted; LiteLLM's default is not a config choice
+            timeout = self._router_setting('timeout', self._router_setting('request_timeout'))
+            timeout = float(timeout) if timeout is not None else None
+            cooldown_time = float(self._router_setting('cooldown_time', 0) or 0)
+            allowed_fails = int(self._router_setting('allowed_fails', DEFAULT_ALLOWED_FAILS))
+        except (TypeError, ValueError):
+            return  # Malformed values are not a performance question
+        retry_counts = [v for v in retry_policy.values() if isinstance(v, int) and v >= 0]
+        max_retries = max([num_retries] + retry_counts)
+        timeout_retries = retry_policy.get('TimeoutErrorRetries')
+        if not isinstance(timeout_retries, int) or timeout_retries < 0:
+            timeout_retries = num_retries  # Malformed values are reported by _validate_router_settings
+        fallbacks = self._fallbacks()
+        
+        # Worst-case request amplification: every group in the chain retried in full
+        chains = {name: [name] + targets for name, targets in fallbacks.items()}
+        longest = max(chains.values(), key=len) if chains else None
+        depth = len(longest) if longest else 1
+        amplification = depth * (1 + max_retries)
+        if amplification > MAX_AMPLIFICATION:
+            via = f" across {' -> '.join(longest)}" if longest else ""
+            self.warnings.append(
+                f"PERFORMANCE: One request can become {amplification} provider calls "
+                f"({1 + max_retries} attempts × {depth} model group(s){via}). During an outage or "
+                f"rate limiting this multiplies load {amplification}× on already failing providers; "
+                f"keep retries × fallback depth ≤ {MAX_AMPLIFICATION}"
+            )
+        
+        # Timeout × retries beyond the client's own timeout
+        worst_wait = timeout * (1 + timeout_retries) * depth if timeout is not None else 0
+        if worst_wait > self.client_timeout:
+            useful = max(1, int(self.client_timeout // timeout)) if timeout else 1
+            self.warnings.append(
+                f"PERFORMANCE: timeout {timeout:g}s × {1 + timeout_retries} attempts"
+                f"{f' × {depth} model groups' if depth > 1 else ''} = {worst_wait:g}s, but the client "
+                f"gives up after {self.client_timeout:g}s. Only the first {useful} attempt(s) can "
+                f"reach the client; later retries and fallbacks burn capacity for nothing. "
+                f"Lower timeout to ≤ {self.client_timeout / ((1 + timeout_retries) * depth):.0f}s "
+                f"or reduce TimeoutErrorRetries"
+            )
+        
+        # Cooldown flapping
+        deployments: Dict[str, int] = {}
+        for model in (self.config or {}).get('model_list') or []:
+            if isinstance(model, dict) and model.get('model_name'):
+                deployments[str(model['model_name'])] = deployments.get(str(model['model_name']), 0) + 1
+        balanced = [name for name, count in deployments.items() if count > 1]
+        if cooldown_time and balanced:
+            if cooldown_time < MIN_COOLDOWN_TIME:
+                probes = allowed_fails * 60 / cooldown_time
+                self.warnings.append(
+                    f"PERFORMANCE: cooldown_time {cooldown_time:g}s is short; a deployment that stays down "
+                    f"re-enters rotation every {cooldown_time:g}s and takes {allowed_fails} failed call(s) "
+                    f"to cool down again (~{probes:.0f} failed calls/min each, every one a retry or "
+                    f"fallback for a user). Use ≥ {MIN_COOLDOWN_TIME}s"
+                )
+            elif allowed_fails <= 1 and cooldown_time < 60:
+                self.warnings.append(
+                    f"PERFORMANCE: allowed_fails {allowed_fails} with cooldown_time {cooldown_time:g}s "
+                    f"will flap: a single transient error removes a deployment for {cooldown_time:g}s, "
+                    f"up to {60 / cooldown_time:.0f} times a minute. Use allowed_fails ≥ 2"
+                )
+            if cooldown_time > MAX_COOLDOWN_TIME:
+                # Largest single deployment that a cooldown can take out of rotation
+                parked = max([self._deployment_limit(m, 'rpm') or 0
+                              for m in (self.config or {}).get('model_list') or []
+                              if isinstance(m, dict) and str(m.get('model_name')) in balanced] or [0])
+                share = f" (up to {parked * cooldown_time / 60:.0f} requests of its rpm capacity)" if parked else ""
+                self.warnings.append(
+                    f"PERFORMANCE: cooldown_time {cooldown_time:g}s parks a deployment for "
+                    f"{cooldown_time / 60:.1f} min after {allowed_fails} transient failure(s){share}; "
+                    f"the remaining deployments absorb its traffic meanwhile. Use ≤ {MAX_COOLDOWN_TIME}s"
+                )
+        
+        # Usage-based routing needs usage shared across proxy replicas
+        strategy = router_settings.get('routing_strategy')
+        if strategy in USAGE_BASED_STRATEGIES and not self._has_shared_cache():
+            total_rpm = sum(self._deployment_limit(m, 'rpm') or 0
+                            for m in (self.config or {}).get('model_list') or [] if isinstance(m, dict))
+            example = f" (e.g. {total_rpm:g} rpm configured -> up to {total_rpm * 3:g} rpm sent with 3 replicas)" if total_rpm else ""
+            self.warnings.append(
+                f"PERFORMANCE: routing_strategy {strategy} without a shared cache (router_settings "
+                f"redis_host/redis_url or a redis litellm_settings.cache): each proxy replica counts "
+                f"usage on its own, so N replicas can send N× the rpm/tpm limits{example} and hit "
+                f"provider 429s. Configure Redis or run a single replica"
+            )
+    
+    def _has_shared_cache(self) -> bool:
+        """Whether router usage can be shared between proxy replicas (Redis)."""
+        router_settings = (self.config or {}).get('router_settings') or {}
+        if any(router_settings.get(key) for key in ('redis_host', 'redis_url')):
+            return True
+        litellm_settings = (self.config or {}).get('litellm_settings') or {}
+        cache_params = litellm_settings.get('cache_params') or {}
+        return bool(litellm_settings.get('cache')) and str(cache_params.get('type', '')).startswith('redis')
+    
     def _validate_security(self):
         """Check for security issues."""
         config_str = yaml.dump(self.config)
@@ -250,6 +370,144 @@ class ConfigValidator:
                     f"SECURITY: Found hardcoded {description}. Use os.environ/VARIABLE_NAME instead"
                 )
     
+    def _deployment_limit(self, model: Dict[str, Any], key: str) -> Optional[float]:
+        """rpm/tpm of a model_list entry, from litellm_params, the entry or model_info."""
+        for source in (model.get('litellm_params') or {}, model, model.get('model_info') or {}):
+            value = source.get(key)
+            if isinstance(value, (int, float)) and value > 0:
+                return float(value)
+        return None
+    
+    def _router_setting(self, key: str, default: Any = None) -> Any:
+        """A router setting, from router_settings first, then litellm_settings."""
+        for section in ('router_settings', 'litellm_settings'):
+            settings = (self.config or {}).get(section) or {}
+            if settings.get(key) is not None:
+                return settings[key]
+        return default
+    
+    def _fallbacks(self) -> Dict[str, List[str]]:
+        """Fallback chains as {model_name: [fallback, ...]}."""
+        fallbacks: Dict[str, List[str]] = {}
+        value = self._router_setting('fallbacks', [])
+        for item in value if isinstance(value, list) else [value]:
+            if isinstance(item, dict):
+                for model_name, targets in item.items():
+                    targets = targets if isinstance(targets, list) else [targets]
+                    fallbacks.setdefault(str(model_name), []).extend(str(t) for t in targets)
+        return fallbacks
+    
+    def capacity_report(self, users: float, rpm_per_user: float, tokens_per_request: float,
+                        mix: Optional[Dict[str, float]] = None, error_rate: float = 0.0) -> Dict[str, Any]:
+        """Sustainable throughput per model_name and headroom against a target workload.
+        
+        Capacity is the sum of the deployments' rpm (and tpm / tokens_per_request),
+        divided by the expected calls per request when a share error_rate of calls
+        fail and are retried. Demand beyond a model's capacity spills over to its
+        fallbacks' spare capacity, in order.
+        """
+        if self.config is None and not self._load_config():
+            raise ValueError('; '.join(self.errors))
+        
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for model in self.config.get('model_list') or []:  # type: ignore[union-attr]
+            if isinstance(model, dict) and model.get('model_name'):
+                groups.setdefault(str(model['model_name']), []).append(model)
+        if not groups:
+            raise ValueError("model_list has no deployments")
+        
+        num_retries = int(self._router_setting('num_retries', DEFAULT_NUM_RETRIES))
+        retry_policy = (self.config.get('router_settings') or {}).get('retry_policy') or {}  # type: ignore[union-attr]
+        error_retries = int(retry_policy.get('InternalServerErrorRetries', num_retries))
+        rate_limit_retries = int(retry_policy.get('RateLimitErrorRetries', num_retries))
+        # Expected calls per request: 1 + p + p^2 + ... for each allowed retry
+        amplification = sum(error_rate ** attempt for attempt in range(error_retries + 1))
+        
+        mix = mix or {name: 1.0 for name in groups}
+        unknown = sorted(set(mix) - set(groups))
+        if unknown:
+            raise ValueError(f"Workload mix names unknown models: {', '.join(unknown)}")
+        total_weight = sum(mix.values())
+        total_rpm = users * rpm_per_user
+        
+        models: Dict[str, Dict[str, Any]] = {}
+        for name, deployments in sorted(groups.items()):
+            rpm_limits = [self._deployment_limit(d, 'rpm') for d in deployments]
+            tpm_limits = [self._deployment_limit(d, 'tpm') for d in deployments]
+            rpm = sum(r for r in rpm_limits if r) if all(rpm_limits) else None
+            tpm = sum(t for t in tpm_limits if t) if all(tpm_limits) else None
+            limits = {'rpm': rpm, 'tpm': tpm / tokens_per_request if tpm and tokens_per_request else None}
+            bounded = {kind: value for kind, value in limits.items() if value is not None}
+            binding = min(bounded, key=bounded.get) if bounded else None
+            demand = total_rpm * mix.get(name, 0.0) / total_weight if total_weight else 0.0
+            models[name] = {
+                'deployments': len(deployments),
+                'rpm_limit': rpm,
+                'tpm_limit': tpm,
+                'binding_limit': binding,
+                'capacity_rpm': round(bounded[binding] / amplification, 1) if binding else None,
+                'demand_rpm': round(demand, 1),
+                'demand_tpm': round(demand * tokens_per_request),
+            }
+        
+        # Spill each model's overflow onto the spare capacity of its fallbacks, in order
+        load = {name: info['demand_rpm'] for name, info in models.items()}
+        fallbacks = self._fallbacks()
+        for name, info in models.items():
+            capacity = info['capacity_rpm']
+            overflow = max(0.0, info['demand_rpm'] - capacity) if capacity is not None else 0.0
+            spilled: Dict[str, float] = {}
+            for target in fallbacks.get(name, []):
+                if overflow <= 0 or target not in models:
+                    continue
+                target_capacity = models[target]['capacity_rpm']
+                spare = overflow if target_capacity is None else max(0.0, target_capacity - load[target])
+                moved = min(overflow, spare)
+                if moved > 0:
+                    load[target] += moved
+                    spilled[target] = round(moved, 1)
+                    overflow -= moved
+            info['fallback_rpm'] = spilled
+            info['unserved_rpm'] = round(overflow, 1)
+        
+        for name, info in models.items():
+            capacity = info['capacity_rpm']
+            info['load_rpm'] = round(load[name], 1)
+            if capacity is None:
+                info.update({'utilization': None, 'headroom_rpm': None, 'saturates_at_load': None})
+                continue
+            info['utilization'] = round(load[name] / capacity, 3) if capacity else None
+            info['headroom_rpm'] = round(capacity - load[name], 1)
+            # Multiple of the target workload at which this model runs out of capacity
+            info['saturates_at_load'] = round(capacity / load[name], 2) if load[name] else None
+        
+        ranked = sorted((name for name, info in models.items() if info['saturates_at_load'] is not None),
+                        key=lambda name: models[name]['saturates_at_load'])
+        return {
+            'config_file': str(self.config_path),
+            'workload': {
+                'users': users,
+                'rpm_per_user': rpm_per_user,
+                'tokens_per_request': tokens_per_request,
+                'total_rpm': total_rpm,
+                'total_tpm': round(total_rpm * tokens_per_request),
+                'mix': {name: round(weight / total_weight, 4) for name, weight in mix.items()},
+            },
+            'retries': {
+                'error_rate': error_rate,
+                'error_retries': error_retries,
+                'rate_limit_retries': rate_limit_retries,
+                'expected_amplification': round(amplification, 4),
+                # Every request beyond capacity is attempted 1 + RateLimitErrorRetries times
+                'overload_amplification': 1 + rate_limit_retries,
+            },
+            'models': models,
+            'saturation_order': ranked,
+            'saturated': [name for name in ranked if models[name]['utilization'] >= 1],
+            'unserved': sorted(name for name, info in models.items() if info['unserved_rpm'] > 0),
+            'unbounded': sorted(name for name, info in models.items() if info['capacity_rpm'] is None),
+        }
+    
     def print_results(self):
         """Print validation results."""
         print(f"\n{'='*60}")
@@ -274,9 +532,122 @@ class ConfigValidator:
             print("✅ Configuration is valid (with warnings)\n")
         else:
             print("❌ Configuration has errors and cannot be used\n")
+    
+    def print_capacity(self, report: Dict[str, Any]):
+        """Print a capacity report."""
+        workload = report['workload']
+        retries = report['retries']
+        print(f"\n{'='*78}")
+        print(f"Capacity Plan: {self.config_path}")
+        print(f"{'='*78}\n")
+        print(f"Workload: {workload['users']:g} users × {workload['rpm_per_user']:g} req/min "
+              f"× {workload['tokens_per_request']:g} tokens = {workload['total_rpm']:g} req/min, "
+              f"{workload['total_tpm']:,} tokens/min")
+        print(f"Retries: {retries['expected_amplification']:.3f}× calls per request at "
+              f"{retries['error_rate']:.1%} errors; {retries['overload_amplification']}× for "
+              f"requests rejected by rate limits\n")
+        
+        print(f"{'model_name':<22}{'deploy':>7}{'capacity':>10}{'limit':>7}{'demand':>9}"
+              f"{'load':>9}{'util':>8}{'headroom':>10}")
+        for name, info in report['models'].items():
+            capacity = f"{info['capacity_rpm']:g}" if info['capacity_rpm'] is not None else "∞"
+            utilization = f"{info['utilization']:.0%}" if info['utilization'] is not None else "-"
+            headroom = f"{info['headroom_rpm']:g}" if info['headroom_rpm'] is not None else "-"
+            print(f"{name:<22}{info['deployments']:>7}{capacity:>10}{info['binding_limit'] or '-':>7}"
+                  f"{info['demand_rpm']:>9g}{info['load_rpm']:>9g}{utilization:>8}{headroom:>10}")
+        print("  (requests/minute; load includes overflow received from fallbacks)\n")
+        
+        for name, info in report['models'].items():
+            for target, moved in info['fallback_rpm'].items():
+                print(f"  ↪ {name}: {moved:g} req/min overflow served by fallback {target}")
+            if info['unserved_rpm'] > 0:
+                print(f"  ❌ {name}: {info['unserved_rpm']:g} req/min cannot be served (no fallback capacity left)")
+        
+        if report['unbounded']:
+            print(f"\n⚠️  No rpm/tpm limits set, capacity unknown: {', '.join(report['unbounded'])}")
+        
+        if report['saturation_order']:
+            print("\nSaturates first:")
+            for name in report['saturation_order'][:5]:
+                info = report['models'][name]
+                if info['utilization'] >= 1:
+                    marker = "❌"
+                elif info['utilization'] >= CAPACITY_WARNING_UTILIZATION:
+                    marker = "⚠️ "
+                else:
+                    marker = "✓"
+                print(f"  {marker} {name}: at {info['saturates_at_load']:g}× the target workload "
+                      f"({info['binding_limit']} limit, {info['deployments']} deployment(s))")
+        
+        if report['unserved']:
+            print(f"\n❌ {len(report['unserved'])} model(s) cannot serve the target workload\n")
+        elif report['saturated']:
+            print(f"\n⚠️  {len(report['saturated'])} model(s) saturate; their overflow is absorbed by fallbacks\n")
+        else:
+            print("\n✅ All rate-limited models have headroom for the target workload\n")
+
+
+def capacity_main(argv: List[str]):
+    """Entry point of the capacity subcommand."""
+    parser = argparse.ArgumentParser(
+        prog='validate-config.py capacity',
+        description='Plan gateway capacity: sustainable throughput per model_name and headroom',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # 200 engineers, 30 requests/min each, 4k tokens per request, even model mix
+  python validate-config.py capacity litellm_config.yaml --users 200 --rpm-per-user 30 --tokens 4000
+
+  # Most traffic on the fast tier, 2% transient errors retried
+  python validate-config.py capacity ../templates/litellm-complete.yaml \\
+    --users 50 --rpm-per-user 2 --mix gemini-2.5-flash=70,gemini-2.5-pro=20,deepseek-r1=10 \\
+    --error-rate 0.02 --json
+        """
+    )
+    parser.add_argument('config_file', help='Path to LiteLLM configuration YAML file')
+    parser.add_argument('--users', type=float, required=True, help='Number of concurrent users')
+    parser.add_argument('--rpm-per-user', type=float, required=True, help='Requests per minute per user')
+    parser.add_argument('--tokens', type=float, default=4000,
+                        help='Average tokens per request, input + output (default: 4000)')
+    parser.add_argument('--mix', help='Share of requests per model_name as name=weight,... '
+                                      '(default: even across all model names)')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='Share of calls failing with retryable errors (default: 0)')
+    parser.add_argument('--json', action='store_true', help='Output results as JSON')
+    args = parser.parse_args(argv)
+    
+    mix = None
+    if args.mix:
+        try:
+            mix = {name.strip(): float(weight) for name, _, weight in
+                   (item.partition('=') for item in args.mix.split(','))}
+        except ValueError:
+            parser.error("--mix must look like name=weight,name=weight")
+        if not all(weight > 0 for weight in mix.values()):
+            parser.error("--mix weights must be positive")
+    
+    validator = ConfigValidator(args.config_file)
+    try:
+        report = validator.capacity_report(args.users, args.rpm_per_user, args.tokens, mix, args.error_rate)
+    except (ValueError, TypeError) as e:
+        if args.json:
+            print(json.dumps({'error': str(e), 'config_file': args.config_file}, indent=2))
+        else:
+            print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        validator.print_capacity(report)
+    
+    sys.exit(1 if report['unserved'] else 0)
 
 
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == 'capacity':
+        capacity_main(sys.argv[2:])
+    
     parser = argparse.ArgumentParser(
         description='Validate LiteLLM configuration files',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -285,6 +656,7 @@ Examples:
   python validate-config.py litellm_config.yaml
   python validate-config.py ../templates/litellm-base.yaml
   python validate-config.py --json config.yaml  # Output as JSON
+  python validate-config.py capacity config.yaml --users 200 --rpm-per-user 30  # Capacity plan
         """
     )
     parser.add_argument(
@@ -296,10 +668,16 @@ Examples:
         action='store_true',
         help='Output results as JSON'
     )
+    parser.add_argument(
+        '--client-timeout',
+        type=float,
+        default=DEFAULT_CLIENT_TIMEOUT,
+        help=f'Client request timeout in seconds, for the retry/timeout check (default: {DEFAULT_CLIENT_TIMEOUT})'
+    )
     
     args = parser.parse_args()
     
-    validator = ConfigValidator(args.config_file)
+    validator = ConfigValidator(args.config_file, args.client_timeout)
     is_valid = validator.validate()
     
     if args.json:
@@ -18,8 +18,10 @@ Requirements (per spec.md Gateway Compatibility Criteria):
 import argparse
 import json
 import sys
+import threading
 import time
-from typing import Dict, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
@@ -38,31 +40,56 @@ class Colors:
 class GatewayValidator:
     """Validates gateway compatibility with Claude Code requirements"""
     
-    def __init__(self, gateway_url: str, auth_token: str, verbose: bool = False):
+    def __init__(self, gateway_url: str, auth_token: str, verbose: bool = False,
+                 concurrency: int = 1, adaptive: bool = False):
         self.gateway_url = gateway_url.rstrip('/')
         self.auth_token = auth_token
         self.verbose = verbose
+        self.concurrency = max(1, concurrency)
         self.results = []
+        self.timing = {}
+        # Per-thread result/output buffers used while checks run concurrently
+        self._local = threading.local()
         
         # Configure session with retries
-        self.session = requests.Session()
+        if adaptive:
+            # Pace requests from the gateway's rate-limit headers and retry
+            # 429s after Retry-After instead of reporting them as failures
+            from adaptive_client import AdaptiveSession
+            self.session = AdaptiveSession(max_concurrency=self.concurrency, max_retries=2)
+        else:
+            self.session = requests.Session()
         retry_strategy = Retry(
             total=3,
             backoff_factor=1,
             status_forcelist=[502, 503, 504]
         )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
+        # One pooled connection per concurrent check, shared across checks
+        adapter = HTTPAdapter(
+            max_retries=retry_strategy,
+            pool_connections=self.concurrency,
+            pool_maxsize=self.concurrency
+        )
         self.session.mount("http://", adapter)
         self.session.mount("https://", adapter)
     
+    def emit(self, text: str):
+        """Print now, or buffer for ordered replay when checks run concurrently"""
+        output = getattr(self._local, "output", None)
+        if output is None:
+            print(text)
+        else:
+            output.append(text)
+    
     def log(self, message: str, color: str = Colors.RESET):
         """Print colored log message"""
         if self.verbose:
-            print(f"{color}{message}{Colors.RESET}")
+            self.emit(f"{color}{message}{Colors.RESET}")
     
     def add_result(self, check_name: str, passed: bool, message: str, details: str = ""):
         """Record validation result"""
-        self.results.append({
+        results = getattr(self._local, "results", None)
+        (self.results if results is None else results).append({
             "check": check_name,
             "passed": passed,
             "message": message,
@@ -70,9 +97,9 @@ class GatewayValidator:
         })
         
         status = f"{Colors.GREEN}✓ PASS{Colors.RESET}" if passed else f"{Colors.RED}✗ FAIL{Colors.RESET}"
-        print(f"{status} - {check_name}: {message}")
+        self.emit(f"{status} - {check_name}: {message}")
         if details and self.verbose:
-            print(f"       {Colors.BLUE}Details: {details}{Colors.RESET}")
+            self.emit(f"       {Colors.BLUE}Details: {details}{Colors.RESET}")
     
     def check_endpoint_support(self) -> bool:
         """Check 1: Verify /v1/messages endpoint exists"""
@@ -489,11 +516,39 @@ class GatewayValidator:
             self.check_timeout_support
         ]
         
-        for check in checks:
-            try:
-                check()
-            except Exception as e:
-                print(f"{Colors.RED}Unexpected error in {check.__name__}: {e}{Colors.RESET}")
+        start = time.perf_counter()
+        if self.concurrency > 1:
+            # The checks are independent, so run them in a thread pool and
+            # replay each one's results and output in the fixed check order.
+            with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+                outcomes = list(pool.map(self._run_buffered, checks))
+            for check, (results, output, duration) in zip(checks, outcomes):
+                self.results.extend(results)
+                for line in output:
+                    print(line)
+        else:
+            outcomes = []
+            for check in checks:
+                check_start = time.perf_counter()
+                self._run_check(check)
+                outcomes.append(([], [], time.perf_counter() - check_start))
+        wall_clock = time.perf_counter() - start
+        
+        check_durations = {
+            check.__name__: round(duration, 3)
+            for check, (_, _, duration) in zip(checks, outcomes)
+        }
+        sequential = sum(duration for _, _, duration in outcomes)
+        self.timing = {
+            "mode": "concurrent" if self.concurrency > 1 else "sequential",
+            "concurrency": self.concurrency,
+            "wall_clock_seconds": round(wall_clock, 3),
+            "sequential_seconds": round(sequential, 3),
+            "saved_seconds": round(max(0.0, sequential - wall_clock), 3),
+            "checks": check_durations
+        }
+        if hasattr(self.session, "limiter"):
+            self.timing["rate_limiter"] = self.session.limiter.snapshot()
         
         # Calculate results
         passed = sum(1 for r in self.results if r["passed"] is True)
@@ -502,6 +557,25 @@ class GatewayValidator:
         
         return passed, failed, skipped
     
+    def _run_check(self, check: Callable[[], bool]):
+        """Run a single check, reporting unexpected errors instead of raising"""
+        try:
+            check()
+        except Exception as e:
+            self.emit(f"{Colors.RED}Unexpected error in {check.__name__}: {e}{Colors.RESET}")
+    
+    def _run_buffered(self, check: Callable[[], bool]) -> Tuple[List[Dict], List[str], float]:
+        """Run a check on a worker thread, capturing its results and output"""
+        self._local.results = []
+        self._local.output = []
+        start = time.perf_counter()
+        try:
+            self._run_check(check)
+            return self._local.results, self._local.output, time.perf_counter() - start
+        finally:
+            self._local.results = None
+            self._local.output = None
+    
     def print_summary(self, passed: int, failed: int, skipped: int):
         """Print validation summary"""
         total = passed + failed + skipped
@@ -511,6 +585,10 @@ class GatewayValidator:
         print(f"{'='*60}{Colors.RESET}\n")
         
         print(f"Total Checks: {total}")
+        if self.timing.get("mode") == "concurrent":
+            print(f"Wall clock: {self.timing['wall_clock_seconds']:.2f}s "
+                  f"(sequential: {self.timing['sequential_seconds']:.2f}s, "
+                  f"saved: {self.timing['saved_seconds']:.2f}s)")
         print(f"{Colors.GREEN}Passed: {passed}{Colors.RESET}")
         print(f"{Colors.RED}Failed: {failed}{Colors.RESET}")
         print(f"{Colors.YELLOW}Skipped: {skipped}{Colors.RESET}\n")
@@ -538,6 +616,7 @@ class GatewayValidator:
             "gateway_url": self.gateway_url,
             "timestamp": time.strftime('%Y-%m-%d %H:%M:%S'),
             "results": self.results,
+            "timing": self.timing,
             "summary": {
                 "total": len(self.results),
                 "passed": sum(1 for r in self.results if r["passed"] is True),
@@ -563,6 +642,18 @@ Examples:
     --url https://gateway.example.com \\
     --token your-api-key
 
+  # Run the independent checks concurrently
+  python validate-gateway-compatibility.py \\
+    --url https://gateway.example.com \\
+    --token your-api-key \\
+    --concurrency 7
+
+  # Back off on 429s using the gateway's Retry-After / X-RateLimit-* headers
+  python validate-gateway-compatibility.py \\
+    --url https://gateway.example.com \\
+    --token your-api-key \\
+    --concurrency 7 --adaptive
+
   # Verbose output with JSON export
   python validate-gateway-compatibility.py \\
     --url https://gateway.example.com \\
@@ -605,11 +696,23 @@ Exit Codes:
         '--output',
         help='Export results to JSON file'
     )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=1,
+        help='Run up to N checks at once over a shared connection pool (default: 1, sequential)'
+    )
+    parser.add_argument(
+        '--adaptive',
+        action='store_true',
+        help='Throttle client-side from rate-limit headers and retry 429 responses'
+    )
     
     args = parser.parse_args()
     
     # Run validation
-    validator = GatewayValidator(args.url, args.token, args.verbose)
+    validator = GatewayValidator(args.url, args.token, args.verbose, args.concurrency,
+                                 args.adaptive)
     passed, failed, skipped = validator.run_validation()
     exit_code = validator.print_summary(passed, failed, skipped)
     
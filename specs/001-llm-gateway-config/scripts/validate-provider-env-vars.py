@@ -13,6 +13,8 @@ import sys
 import yaml
 from typing import Dict, List, Set, Tuple
 
+from config_loader import load_config as load_yaml_config
+
 # Provider environment variable requirements
 PROVIDER_REQUIREMENTS = {
     "anthropic": {
@@ -58,9 +60,7 @@ LITELLM_REQUIREMENTS = {
 def load_config(config_path: str) -> Dict:
     """Load and parse YAML configuration file."""
     try:
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
-        return config
+        return load_yaml_config(config_path)
     except FileNotFoundError:
         print(f"❌ ERROR: Configuration file not found: {config_path}", file=sys.stderr)
         sys.exit(2)
@@ -3,13 +3,23 @@
 End-to-End Test Script for All 8 Models
 Purpose: Test completions through LiteLLM gateway for all Vertex AI models
 Usage: python test-all-models.py [--gateway-url URL] [--auth-token TOKEN]
+       python test-all-models.py --sweep [--repeat 5] [--concurrency 8]
+
+Sweep mode probes every model concurrently, several times each, over pooled
+keep-alive connections. The first probe per model (new connection, possibly
+a cold provider path) is reported separately from the warm probes.
 """
 
 import argparse
+import http.client
 import json
+import math
 import sys
+import threading
 import time
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlsplit
 import urllib.request
 import urllib.error
 
@@ -27,6 +37,184 @@ MODELS = [
 ]
 
 
+class ConnectionPool:
+    """Keep-alive http.client connections to one gateway, shared across threads."""
+    
+    def __init__(self, gateway_url: str, timeout: float = 30):
+        parts = urlsplit(gateway_url)
+        self.connection_class = (http.client.HTTPSConnection if parts.scheme == "https"
+                                 else http.client.HTTPConnection)
+        self.host = parts.hostname
+        self.port = parts.port
+        self.base_path = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.idle: List[http.client.HTTPConnection] = []
+        self.lock = threading.Lock()
+        self.opened = 0
+    
+    def post_json(self, path: str, body: Dict[str, Any], headers: Dict[str, str]):
+        """POST a JSON body; return (status, parsed or raw body, reused_connection)."""
+        with self.lock:
+            conn = self.idle.pop() if self.idle else None
+            reused = conn is not None
+            if conn is None:
+                self.opened += 1
+        if conn is None:
+            conn = self.connection_class(self.host, self.port, timeout=self.timeout)
+        try:
+            conn.request("POST", self.base_path + path, body=json.dumps(body).encode("utf-8"),
+                         headers=headers)
+            response = conn.getresponse()
+            raw = response.read()
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            if not reused:
+                raise
+            # The server closed an idle keep-alive connection; retry on a new one
+            with self.lock:
+                self.opened += 1
+            conn = self.connection_class(self.host, self.port, timeout=self.timeout)
+            reused = False
+            conn.request("POST", self.base_path + path, body=json.dumps(body).encode("utf-8"),
+                         headers=headers)
+            response = conn.getresponse()
+            raw = response.read()
+        if response.will_close:
+            conn.close()
+        else:
+            with self.lock:
+                self.idle.append(conn)
+        return response.status, raw, reused
+    
+    def close(self):
+        with self.lock:
+            for conn in self.idle:
+                conn.close()
+            self.idle.clear()
+
+
+def test_model_pooled(pool: ConnectionPool, auth_token: str, model: Dict[str, Any]) -> Dict[str, Any]:
+    """Like test_model, but over a pooled keep-alive connection."""
+    data = {
+        "model": model["name"],
+        "messages": [
+            {"role": "user", "content": model["test_prompt"]}
+        ],
+        "max_tokens": 50
+    }
+    headers = {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {auth_token}"
+    }
+    
+    start_time = time.perf_counter()
+    try:
+        status, raw, reused = pool.post_json("/chat/completions", data, headers)
+        latency = time.perf_counter() - start_time
+        if status != 200:
+            return {
+                "model": model["name"],
+                "status": "error",
+                "error": f"HTTP {status}: {raw.decode('utf-8', 'replace')[:200]}"
+            }
+        response_data = json.loads(raw.decode('utf-8'))
+        return {
+            "model": model["name"],
+            "status": "success",
+            "latency_ms": round(latency * 1000, 2),
+            "reused_connection": reused,
+            "usage": response_data.get("usage", {})
+        }
+    except Exception as e:
+        return {
+            "model": model["name"],
+            "status": "error",
+            "error": f"{type(e).__name__}: {e}"
+        }
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(len(ordered) * pct / 100)) - 1]
+
+
+def sweep_models(gateway_url: str, auth_token: str, repeat: int, concurrency: int) -> Dict[str, Any]:
+    """Probe all models concurrently, `repeat` times each, over pooled connections.
+    
+    Every model's first probe is sent first (up to `concurrency` at a time, one
+    new connection each) and reported as cold; the remaining probes reuse
+    pooled connections.
+    """
+    pool = ConnectionPool(gateway_url)
+    probes: Dict[str, List[Dict[str, Any]]] = {model["name"]: [] for model in MODELS}
+    start = time.perf_counter()
+    
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(MODELS))) as executor:
+        for result in executor.map(lambda m: test_model_pooled(pool, auth_token, m), MODELS):
+            probes[result["model"]].append(result)
+    
+    warm_jobs = [model for _ in range(repeat - 1) for model in MODELS]
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for result in executor.map(lambda m: test_model_pooled(pool, auth_token, m), warm_jobs):
+            probes[result["model"]].append(result)
+    
+    elapsed = time.perf_counter() - start
+    pool.close()
+    
+    summary = {}
+    for name, results in probes.items():
+        cold, warm = results[0], results[1:]
+        ok = [r for r in warm if r["status"] == "success"]
+        latencies = [r["latency_ms"] for r in ok]
+        rates = [r["usage"].get("completion_tokens", 0) / (r["latency_ms"] / 1000)
+                 for r in ok if r["usage"].get("completion_tokens") and r["latency_ms"] > 0]
+        summary[name] = {
+            "probes": len(results),
+            "errors": sum(r["status"] != "success" for r in results),
+            "cold_ms": cold.get("latency_ms"),
+            "warm_ms": {
+                "p50": percentile(latencies, 50),
+                "p90": percentile(latencies, 90),
+                "p99": percentile(latencies, 99),
+                "max": max(latencies) if latencies else None
+            },
+            "tokens_per_second_p50": round(percentile(rates, 50), 1) if rates else None,
+            "first_error": next((r["error"] for r in results if r["status"] != "success"), None)
+        }
+    
+    return {
+        "repeat": repeat,
+        "concurrency": concurrency,
+        "wall_clock_seconds": round(elapsed, 2),
+        "connections_opened": pool.opened,
+        "models": summary
+    }
+
+
+def print_sweep(sweep: Dict[str, Any]):
+    """Print the per-model sweep table."""
+    def ms(value: Optional[float]) -> str:
+        return "-" if value is None else f"{value:.0f}"
+    
+    print(f"{'Model':<20} {'ok/n':>7} {'cold':>8} {'p50':>8} {'p90':>8} {'p99':>8} {'tok/s':>7}")
+    print("-" * 70)
+    for name, stats in sweep["models"].items():
+        warm = stats["warm_ms"]
+        rate = stats["tokens_per_second_p50"]
+        print(f"{name:<20} {stats['probes'] - stats['errors']:>3}/{stats['probes']:<3} "
+              f"{ms(stats['cold_ms']):>8} {ms(warm['p50']):>8} {ms(warm['p90']):>8} "
+              f"{ms(warm['p99']):>8} {'-' if rate is None else rate:>7}")
+        if stats["first_error"]:
+            print(f"  ✗ {stats['first_error'][:100]}")
+    print("-" * 70)
+    print("Latencies in ms; warm percentiles exclude each model's first (cold) probe.")
+    print(f"{sum(s['probes'] for s in sweep['models'].values())} probes in "
+          f"{sweep['wall_clock_seconds']}s over {sweep['connections_opened']} connection(s)")
+
+
 def test_model(gateway_url: str, auth_token: str, model: Dict[str, Any]) -> Dict[str, Any]:
     """Test a single model with a completion request."""
     url = f"{gateway_url}/chat/completions"
@@ -105,6 +293,23 @@ def main():
         action="store_true",
         help="Output results as JSON"
     )
+    parser.add_argument(
+        "--sweep",
+        action="store_true",
+        help="Probe all models concurrently and repeatedly over pooled connections"
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="Probes per model in sweep mode (default: 5)"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="Probes in flight in sweep mode (default: 8)"
+    )
     
     args = parser.parse_args()
     
@@ -117,6 +322,27 @@ def main():
         print("Provide --auth-token or set LITELLM_MASTER_KEY", file=sys.stderr)
         sys.exit(1)
     
+    if args.sweep:
+        if args.repeat < 1 or args.concurrency < 1:
+            print("Error: --repeat and --concurrency must be at least 1", file=sys.stderr)
+            sys.exit(1)
+        if not args.json:
+            print("=" * 70)
+            print("Model Latency Sweep")
+            print("=" * 70)
+            print()
+            print(f"Gateway URL: {args.gateway_url}")
+            print(f"Probing {len(MODELS)} models x {args.repeat} ({args.concurrency} in flight)...")
+            print()
+        sweep = sweep_models(args.gateway_url.rstrip("/"), auth_token, args.repeat, args.concurrency)
+        error_count = sum(stats["errors"] for stats in sweep["models"].values())
+        if args.json:
+            print(json.dumps({"gateway_url": args.gateway_url, "sweep": sweep}, indent=2))
+        else:
+            print_sweep(sweep)
+            print()
+        sys.exit(0 if error_count == 0 else 1)
+    
     if not args.json:
         print("=" * 70)
         print("End-to-End Model Testing")
@@ -4,23 +4,35 @@ Multi-Provider Routing Test
 
 Purpose: Verify that requests are correctly routed across multiple providers
 User Story: US3 - Multi-Provider Gateway Configuration (Priority: P3)
-Usage: python test-multi-provider-routing.py [--config <config-file>]
+Usage: python test-multi-provider-routing.py [--config <config-file>] [--concurrency 16]
 Exit Codes: 0 (pass), 1 (fail), 2 (setup error)
+
+With --concurrency, requests are sent in parallel over pooled connections and
+the deployment that served each one (LiteLLM's x-litellm-model-id response
+header) is checked against the configured routing_strategy: a chi-square
+goodness-of-fit test for simple-shuffle, and a one-sided test that the
+fastest deployment gets more than its even share for least-busy and
+latency-based-routing.
 """
 
 import os
 import sys
+import math
 import time
 import json
 import argparse
 import requests
-from typing import Dict, List, Tuple
-from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import Dict, List, Optional, Tuple
+from collections import Counter, defaultdict
 
 # Configuration
 GATEWAY_URL = os.getenv("ANTHROPIC_BASE_URL", "http://localhost:4000")
 LITELLM_KEY = os.getenv("ANTHROPIC_API_KEY", "")
 TEST_ITERATIONS = 10  # Number of requests to send for routing verification
+SIGNIFICANCE = 0.01  # Reject routing hypotheses below this p-value
+DEPLOYMENT_HEADER = "x-litellm-model-id"
 
 
 def print_header(text: str):
@@ -67,12 +79,13 @@ def get_model_info() -> List[Dict]:
         return []
 
 
-def send_test_request(model_name: str, iteration: int) -> Tuple[bool, str, float]:
-    """Send a test request to the gateway."""
+def send_test_request(model_name: str, iteration: int,
+                      session=requests) -> Tuple[bool, str, float, Optional[str]]:
+    """Send a test request; return success, content, latency and serving deployment."""
     start_time = time.time()
     
     try:
-        response = requests.post(
+        response = session.post(
             f"{GATEWAY_URL}/v1/messages",
             headers={
                 "x-api-key": LITELLM_KEY,
@@ -91,20 +104,38 @@ def send_test_request(model_name: str, iteration: int) -> Tuple[bool, str, float
         )
         
         elapsed = time.time() - start_time
+        deployment = response.headers.get(DEPLOYMENT_HEADER)
         
         if response.status_code == 200:
             data = response.json()
             content = data.get("content", [{}])[0].get("text", "")
-            return True, content, elapsed
+            return True, content, elapsed, deployment
         else:
-            return False, f"HTTP {response.status_code}: {response.text}", elapsed
+            return False, f"HTTP {response.status_code}: {response.text}", elapsed, deployment
             
     except requests.exceptions.Timeout:
         elapsed = time.time() - start_time
-        return False, "Request timeout", elapsed
+        return False, "Request timeout", elapsed, None
     except requests.exceptions.RequestException as e:
         elapsed = time.time() - start_time
-        return False, str(e), elapsed
+        return False, str(e), elapsed, None
+
+
+def new_results() -> Dict:
+    return defaultdict(lambda: {"success": 0, "fail": 0, "latencies": [],
+                                "deployments": Counter(), "deployment_latencies": defaultdict(list)})
+
+
+def record_result(results: Dict, model: str, success: bool, latency: float, deployment: Optional[str]):
+    stats = results[model]
+    if success:
+        stats["success"] += 1
+        stats["latencies"].append(latency)
+        if deployment:
+            stats["deployments"][deployment] += 1
+            stats["deployment_latencies"][deployment].append(latency)
+    else:
+        stats["fail"] += 1
 
 
 def test_routing_distribution(models: List[str]) -> Dict[str, int]:
@@ -114,18 +145,16 @@ def test_routing_distribution(models: List[str]) -> Dict[str, int]:
     print(f"Sending {TEST_ITERATIONS} requests per model...")
     print(f"Models: {', '.join(models)}\n")
     
-    results = defaultdict(lambda: {"success": 0, "fail": 0, "latencies": []})
+    results = new_results()
     
     for iteration in range(TEST_ITERATIONS):
         for model in models:
-            success, response, latency = send_test_request(model, iteration)
+            success, response, latency, deployment = send_test_request(model, iteration)
+            record_result(results, model, success, latency, deployment)
             
             if success:
-                results[model]["success"] += 1
-                results[model]["latencies"].append(latency)
                 print(f"  ✓ {model} (#{iteration+1}): {latency:.2f}s")
             else:
-                results[model]["fail"] += 1
                 print(f"  ❌ {model} (#{iteration+1}): {response}")
             
             time.sleep(0.5)  # Small delay between requests
@@ -133,6 +162,174 @@ def test_routing_distribution(models: List[str]) -> Dict[str, int]:
     return results
 
 
+def test_routing_distribution_concurrent(models: List[str], concurrency: int) -> Dict[str, int]:
+    """Send all requests in parallel over pooled keep-alive connections."""
+    print_header("Testing Routing Distribution (concurrent)")
+    
+    total = TEST_ITERATIONS * len(models)
+    print(f"Sending {TEST_ITERATIONS} requests per model ({total} total, {concurrency} in flight)...")
+    print(f"Models: {', '.join(models)}\n")
+    
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    
+    # Interleave models so each sees the same mix of gateway load
+    jobs = [(model, iteration) for iteration in range(TEST_ITERATIONS) for model in models]
+    results = new_results()
+    errors = Counter()
+    start = time.time()
+    
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = pool.map(lambda job: (job[0], send_test_request(job[0], job[1], session)), jobs)
+        for model, (success, response, latency, deployment) in outcomes:
+            record_result(results, model, success, latency, deployment)
+            if not success:
+                errors[f"{model}: {response[:120]}"] += 1
+    
+    elapsed = time.time() - start
+    print(f"  Completed {total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s)")
+    for error, count in errors.most_common(5):
+        print(f"  ❌ {count}x {error}")
+    
+    return results
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(len(ordered) * pct / 100))
+    return ordered[rank - 1]
+
+
+def chi_square_p_value(statistic: float, dof: int) -> float:
+    """Upper-tail probability of the chi-square distribution.
+    
+    Regularized upper incomplete gamma Q(dof/2, statistic/2), by series
+    expansion below the mean and continued fraction above it.
+    """
+    if statistic <= 0:
+        return 1.0
+    a, x = dof / 2.0, statistic / 2.0
+    log_prefix = a * math.log(x) - x - math.lgamma(a)
+    if x < a + 1:
+        term = total = 1.0 / a
+        n = a
+        for _ in range(500):
+            n += 1
+            term *= x / n
+            total += term
+            if abs(term) < abs(total) * 1e-12:
+                break
+        return max(0.0, 1.0 - total * math.exp(log_prefix))
+    # Lentz's continued fraction
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    for i in range(1, 500):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-12:
+            break
+    return math.exp(log_prefix) * h
+
+
+def expected_shares(model_info: List[Dict]) -> Dict[str, Dict[str, float]]:
+    """Per model_name, each deployment's expected share under simple-shuffle.
+    
+    LiteLLM's simple-shuffle picks deployments at random, weighted by
+    litellm_params.weight, else rpm, else tpm, else uniformly.
+    """
+    deployments = defaultdict(dict)
+    for entry in model_info:
+        deployment_id = (entry.get("model_info") or {}).get("id")
+        if entry.get("model_name") and deployment_id:
+            deployments[entry["model_name"]][deployment_id] = entry.get("litellm_params") or {}
+    
+    shares = {}
+    for model_name, params in deployments.items():
+        for key in ("weight", "rpm", "tpm"):
+            if all(p.get(key) for p in params.values()):
+                weights = {d: float(p[key]) for d, p in params.items()}
+                break
+        else:
+            weights = {d: 1.0 for d in params}
+        total = sum(weights.values())
+        shares[model_name] = {d: w / total for d, w in weights.items()}
+    return shares
+
+
+def verify_routing_statistics(results: Dict, model_info: List[Dict], strategy: str) -> bool:
+    """Check the observed deployment mix against the routing strategy."""
+    print_header(f"Statistical Check: {strategy}")
+    
+    shares = expected_shares(model_info)
+    all_passed = True
+    checked = 0
+    
+    for model, stats in results.items():
+        observed = stats["deployments"]
+        n = sum(observed.values())
+        expected = shares.get(model, {})
+        if len(expected) < 2:
+            continue  # Single deployment: nothing to distribute
+        if not n:
+            print(f"⚠ {model}: no {DEPLOYMENT_HEADER} response header; cannot attribute deployments")
+            continue
+        checked += 1
+        print(f"📊 {model} ({len(expected)} deployments, {n} attributed requests)")
+        
+        if strategy == "simple-shuffle":
+            statistic = sum((observed.get(d, 0) - n * share) ** 2 / (n * share)
+                            for d, share in expected.items())
+            p_value = chi_square_p_value(statistic, len(expected) - 1)
+            for deployment, share in sorted(expected.items()):
+                print(f"   {deployment}: {observed.get(deployment, 0)} observed, {n * share:.1f} expected")
+            if min(n * share for share in expected.values()) < 5:
+                print(f"   ⚠ Fewer than 5 expected per deployment; raise --iterations for a reliable test")
+            passed = p_value >= SIGNIFICANCE
+            print(f"   χ²={statistic:.2f}, dof={len(expected) - 1}, p={p_value:.4f} "
+                  f"{'✓ consistent with weighted random' if passed else '❌ distribution is skewed'}")
+        
+        elif strategy in ("least-busy", "latency-based-routing"):
+            medians = {d: percentile(l, 50) for d, l in stats["deployment_latencies"].items()}
+            for deployment in sorted(expected, key=lambda d: medians.get(d, float("inf"))):
+                median = medians.get(deployment)
+                print(f"   {deployment}: {observed.get(deployment, 0)} requests, "
+                      f"p50={'-' if median is None else f'{median:.2f}s'}")
+            fastest = min(medians, key=medians.get)
+            # One-sided binomial z-test that the fastest beats an even split
+            even = 1.0 / len(expected)
+            z = (observed[fastest] / n - even) / math.sqrt(even * (1 - even) / n)
+            p_value = 0.5 * math.erfc(z / math.sqrt(2))
+            passed = p_value < SIGNIFICANCE
+            print(f"   Fastest {fastest}: {observed[fastest] / n:.0%} of traffic vs {even:.0%} even split "
+                  f"(z={z:.2f}, p={p_value:.4f}) "
+                  f"{'✓ favored' if passed else '❌ not favored'}")
+        
+        else:
+            print(f"   No statistical model for {strategy}; distribution shown for reference")
+            for deployment, count in observed.most_common():
+                print(f"   {deployment}: {count}")
+            passed = True
+        
+        all_passed = all_passed and passed
+    
+    if not checked:
+        print("⚠ No model had multiple attributable deployments; statistical check skipped")
+    return all_passed
+
+
 def analyze_results(results: Dict) -> bool:
     """Analyze routing results and determine if test passed."""
     print_header("Routing Analysis")
@@ -162,6 +359,8 @@ def analyze_results(results: Dict) -> bool:
         
         if latencies:
             print(f"   Latency:  avg={avg_latency:.2f}s, min={min_latency:.2f}s, max={max_latency:.2f}s")
+            print(f"             p50={percentile(latencies, 50):.2f}s, p95={percentile(latencies, 95):.2f}s, "
+                  f"p99={percentile(latencies, 99):.2f}s")
         
         # Check if model passed (>80% success rate)
         if success_rate < 80:
@@ -213,6 +412,8 @@ def main():
     parser.add_argument("--config", help="Path to LiteLLM config file (optional)")
     parser.add_argument("--iterations", type=int, default=TEST_ITERATIONS, help="Number of test iterations")
     parser.add_argument("--models", nargs="+", help="Specific models to test (optional)")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="Requests in flight; above 1 enables the concurrent mode and statistical checks")
     args = parser.parse_args()
     
     TEST_ITERATIONS = args.iterations
@@ -252,18 +453,23 @@ def main():
     # Detect routing strategy (from config if provided)
     routing_strategy = "unknown"
     if args.config and os.path.exists(args.config):
-        import yaml
-        with open(args.config, 'r') as f:
-            config = yaml.safe_load(f)
-            routing_strategy = config.get("router_settings", {}).get("routing_strategy", "simple-shuffle")
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+        from config_loader import load_config
+        config = load_config(args.config)
+        routing_strategy = config.get("router_settings", {}).get("routing_strategy", "simple-shuffle")
     
     test_routing_strategy_compliance(test_models, routing_strategy)
     
     # Run routing distribution test
-    results = test_routing_distribution(test_models)
+    if args.concurrency > 1:
+        results = test_routing_distribution_concurrent(test_models, args.concurrency)
+    else:
+        results = test_routing_distribution(test_models)
     
     # Analyze results
     passed = analyze_results(results)
+    if args.concurrency > 1:
+        passed = verify_routing_statistics(results, model_info, routing_strategy) and passed
     
     # Exit with appropriate code
     if passed:
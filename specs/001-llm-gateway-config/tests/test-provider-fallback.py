@@ -5,19 +5,37 @@ Provider Fallback Verification Script
 Purpose: Verify that fallback mechanisms work when primary provider fails
 User Story: US3 - Multi-Provider Gateway Configuration (Priority: P3)
 Usage: python test-provider-fallback.py [--primary <model>] [--fallback <model>]
+       python test-provider-fallback.py --inject error --chain <primary>,<fallback>[,...]
 Exit Codes: 0 (pass), 1 (fail), 2 (setup error)
+
+Fault-injection mode (--inject) makes the primary fail for real and measures
+what failover costs. It runs a local stand-in upstream (scripts/mock-gateway.py,
+in-process) on --fault-port, which the primary deployment's api_base must point
+at. The stand-in refuses connections (dead-port), answers 5xx (error) or hangs
+past the gateway timeout (hang). The script then reports:
+  - the extra latency per fallback step, relative to each fallback model's own
+    baseline latency;
+  - the actual cooldown recovery time, found by healing the stand-in and
+    polling the primary with backoff rather than sleeping a fixed period.
 """
 
 import os
 import sys
+import json
+import math
+import socket
+import threading
 import time
 import argparse
+import importlib.util
 import requests
-from typing import Tuple, List
+from pathlib import Path
+from typing import Dict, Optional, Tuple, List
 
 # Configuration
 GATEWAY_URL = os.getenv("ANTHROPIC_BASE_URL", "http://localhost:4000")
 LITELLM_KEY = os.getenv("ANTHROPIC_API_KEY", "")
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "scripts"
 
 
 def print_header(text: str):
@@ -159,6 +177,244 @@ def test_fallback_scenario(primary: str, fallback: str) -> bool:
         return False
 
 
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(len(ordered) * pct / 100.0) - 1)]
+
+
+def send_timed_request(model_name: str, timeout: float = 30) -> Tuple[int, float, dict, dict]:
+    """Send a test request; return (status, seconds, body, headers). Status 0 means no response."""
+    start = time.perf_counter()
+    try:
+        response = requests.post(
+            f"{GATEWAY_URL}/v1/messages",
+            headers={
+                "x-api-key": LITELLM_KEY,
+                "anthropic-version": "2023-06-01",
+                "content-type": "application/json"
+            },
+            json={
+                "model": model_name,
+                "max_tokens": 10,
+                "messages": [{"role": "user", "content": "Reply with: test"}]
+            },
+            timeout=timeout
+        )
+        elapsed = time.perf_counter() - start
+        try:
+            data = response.json()
+        except ValueError:
+            data = {}
+        return response.status_code, elapsed, data, dict(response.headers)
+    except requests.exceptions.RequestException:
+        return 0, time.perf_counter() - start, {}, {}
+
+
+def serving_step(chain: List[str], data: dict, headers: dict) -> Optional[int]:
+    """Position in the fallback chain of the model that answered, if identifiable."""
+    lowered = {key.lower(): value for key, value in headers.items()}
+    group = lowered.get("x-litellm-model-group")
+    if group in chain:
+        return chain.index(group)
+    model = data.get("model", "")
+    if model in chain:
+        return chain.index(model)
+    # Providers often answer with a longer, versioned name; prefer the longest match
+    matches = [name for name in chain if name and (name in model or model.endswith(name.split("/")[-1]))]
+    if model and matches:
+        return chain.index(max(matches, key=len))
+    attempted = lowered.get("x-litellm-attempted-fallbacks")
+    if attempted is not None and attempted.isdigit():
+        return min(int(attempted), len(chain) - 1)
+    return None
+
+
+def load_mock_gateway():
+    """Import scripts/mock-gateway.py (hyphenated file name)."""
+    spec = importlib.util.spec_from_file_location("mock_gateway", SCRIPTS_DIR / "mock-gateway.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class FaultUpstream:
+    """Local stand-in for the primary deployment's upstream, broken on demand.
+
+    Modes: dead-port (nothing listens until healed), error (every request gets
+    fault_status), hang (responses take hang_seconds, past the gateway timeout).
+    heal() turns it into a fast, healthy upstream.
+    """
+
+    def __init__(self, mode: str, port: int, api_key: str = "sk-1234",
+                 fault_status: int = 503, hang_seconds: float = 30.0):
+        self.mode = mode
+        self.port = port
+        self.api_key = api_key
+        self.fault_status = fault_status
+        self.hang_seconds = hang_seconds
+        self.mock = load_mock_gateway()
+        self.server = None
+        self.healed_at: Optional[float] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def _serve(self, profile):
+        gateway = self.mock.MockGateway(profile, {}, [self.api_key])
+        self.server = self.mock.MockGatewayServer(("127.0.0.1", self.port), gateway)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def start(self):
+        if self.mode == "dead-port":
+            with socket.socket() as probe:
+                if probe.connect_ex(("127.0.0.1", self.port)) == 0:
+                    raise RuntimeError(f"port {self.port} is in use; it must be dead for this mode")
+        elif self.mode == "error":
+            self._serve(self.mock.ModelProfile(latency_ms=0, error_rate=1.0,
+                                               error_statuses=[self.fault_status]))
+        else:
+            self._serve(self.mock.ModelProfile(latency_ms=self.hang_seconds * 1000, latency_sigma=0))
+
+    def heal(self):
+        healthy = self.mock.ModelProfile(latency_ms=50, latency_sigma=0)
+        if self.server is None:
+            self._serve(healthy)
+        else:
+            self.server.gateway.default = healthy
+        self.healed_at = time.time()
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+
+def test_failover_latency(chain: List[str], baseline_requests: int = 10,
+                          fault_requests: int = 20, timeout: float = 120) -> Tuple[bool, Dict]:
+    """Measure the latency each fallback step adds while the primary is failing."""
+    print_header("Failover Latency Test")
+    print(f"Fallback chain: {' -> '.join(chain)}\n")
+
+    print("Step 1: Baseline latency of each fallback model (called directly)...")
+    baselines: Dict[str, float] = {}
+    for model in chain[1:]:
+        samples = []
+        for _ in range(baseline_requests):
+            status, elapsed, _, _ = send_timed_request(model, timeout)
+            if status == 200:
+                samples.append(elapsed)
+        if not samples:
+            print(f"  ❌ {model}: no successful responses; cannot fail over to it")
+            return False, {"chain": chain, "error": f"fallback model {model} is not responding"}
+        baselines[model] = percentile(samples, 50)
+        print(f"  ✓ {model}: p50 {baselines[model] * 1000:.0f}ms ({len(samples)}/{baseline_requests} ok)")
+
+    print(f"\nStep 2: {fault_requests} requests to {chain[0]} with its upstream failing...")
+    extra_by_step: Dict[int, List[float]] = {}
+    served_by_primary = failed = unidentified = 0
+    last_request = time.time()
+    for i in range(fault_requests):
+        status, elapsed, data, headers = send_timed_request(chain[0], timeout)
+        last_request = time.time()
+        step = serving_step(chain, data, headers) if status == 200 else None
+        if status != 200:
+            failed += 1
+            print(f"  ⚠ Request {i+1}: HTTP {status or 'error'} after {elapsed * 1000:.0f}ms (no fallback answered)")
+        elif step is None:
+            unidentified += 1
+            print(f"  ⚠ Request {i+1}: served by unknown model {data.get('model')!r}")
+        elif step == 0:
+            served_by_primary += 1
+            print(f"  ⚠ Request {i+1}: served by the primary; is its api_base the fault port?")
+        else:
+            extra = elapsed - baselines[chain[step]]
+            extra_by_step.setdefault(step, []).append(extra)
+            print(f"  ✓ Request {i+1}: {chain[step]} in {elapsed * 1000:.0f}ms ({extra * 1000:+.0f}ms)")
+
+    result = {
+        "chain": chain,
+        "baseline_p50_ms": {model: round(value * 1000, 1) for model, value in baselines.items()},
+        "requests": fault_requests,
+        "failed": failed,
+        "served_by_primary": served_by_primary,
+        "unidentified": unidentified,
+        "steps": {},
+        "last_fault_request_epoch": last_request,
+    }
+
+    print(f"\n{'step':<6}{'served by':<32}{'n':>4}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}  (extra ms)")
+    previous_p50 = 0.0
+    for step in sorted(extra_by_step):
+        extras = extra_by_step[step]
+        stats = {f"p{pct}_ms": round(percentile(extras, pct) * 1000, 1) for pct in (50, 90, 99)}
+        stats["max_ms"] = round(max(extras) * 1000, 1)
+        stats["count"] = len(extras)
+        # What this hop adds on top of the steps before it
+        stats["step_cost_p50_ms"] = round((percentile(extras, 50) - previous_p50) * 1000, 1)
+        previous_p50 = percentile(extras, 50)
+        result["steps"][chain[step]] = stats
+        print(f"{step:<6}{chain[step]:<32}{len(extras):>4}{stats['p50_ms']:>9.0f}"
+              f"{stats['p90_ms']:>9.0f}{stats['p99_ms']:>9.0f}{stats['max_ms']:>9.0f}")
+
+    print()
+    if not extra_by_step:
+        if served_by_primary == fault_requests:
+            print("❌ FAIL: The primary never failed; fault injection is not wired to the gateway")
+        else:
+            print("❌ FAIL: No request was answered by a fallback model")
+        return False, result
+    answered = sum(len(extras) for extras in extra_by_step.values())
+    print(f"✅ Failover answered {answered}/{fault_requests} requests")
+    for model, stats in result["steps"].items():
+        print(f"  Falling back to {model} adds ~{max(0.0, stats['step_cost_p50_ms']):.0f}ms (p50) "
+              f"on top of earlier steps")
+    return failed == 0, result
+
+
+def measure_cooldown_recovery(chain: List[str], upstream: FaultUpstream, last_fault: float,
+                              cooldown_time: int = 60, max_wait: float = 300,
+                              timeout: float = 30) -> Dict:
+    """Heal the primary's upstream and poll with backoff until the primary serves again."""
+    primary = chain[0]
+    print_header("Cooldown Recovery Measurement")
+    upstream.heal()
+    healed = upstream.healed_at
+    print(f"Upstream healed; polling {primary} with backoff (configured cooldown: {cooldown_time}s)\n")
+
+    delay, max_delay = 0.25, max(1.0, cooldown_time / 20)
+    previous_poll, polls = healed, 0
+    result = {"primary": primary, "configured_cooldown_seconds": cooldown_time, "recovered": False}
+    while time.time() - healed < max_wait:
+        status, _, data, headers = send_timed_request(primary, timeout)
+        polled = time.time()
+        polls += 1
+        if status == 200 and serving_step(chain, data, headers) == 0:
+            # Recovery happened between the previous poll and this one
+            result.update({
+                "recovered": True,
+                "polls": polls,
+                "seconds_after_heal": round(polled - healed, 2),
+                "seconds_after_last_failure": round(polled - last_fault, 2),
+                "resolution_seconds": round(polled - previous_poll, 2),
+            })
+            print(f"✓ Primary serving again {result['seconds_after_heal']:.1f}s after healing "
+                  f"(±{result['resolution_seconds']:.1f}s, {polls} polls)")
+            print(f"  Observed cooldown: ~{result['seconds_after_last_failure']:.1f}s after the last failure "
+                  f"(configured {cooldown_time}s)")
+            return result
+        previous_poll = polled
+        time.sleep(delay)
+        delay = min(delay * 1.5, max_delay)
+
+    result["polls"] = polls
+    print(f"❌ Primary still not serving {max_wait:.0f}s after healing")
+    return result
+
+
 def test_cooldown_recovery(model: str, cooldown_time: int = 60) -> bool:
     """Test that models recover after cooldown period."""
     print_header("Cooldown Recovery Test")
@@ -189,12 +445,80 @@ def test_cooldown_recovery(model: str, cooldown_time: int = 60) -> bool:
     return True  # Manual test - always pass
 
 
+def run_fault_injection(chain: List[str], args) -> int:
+    """Failover latency and cooldown recovery with the primary failing; returns exit code."""
+    upstream = FaultUpstream(args.inject, args.fault_port, args.upstream_key,
+                             args.fault_status, args.hang_seconds)
+    try:
+        upstream.start()
+    except (RuntimeError, OSError) as e:
+        print(f"❌ ERROR: Cannot start fault injection: {e}")
+        return 2
+    print(f"Fault injection: {args.inject} on {upstream.url} "
+          f"(the api_base of {chain[0]}'s deployments)\n")
+    
+    # Requests must outlive a hanging upstream plus the fallback behind it
+    timeout = args.hang_seconds + 60 if args.inject == "hang" else 60
+    try:
+        passed, failover = test_failover_latency(chain, args.baseline_requests,
+                                                 args.fault_requests, timeout)
+        recovery = {}
+        if failover.get("steps"):
+            recovery = measure_cooldown_recovery(chain, upstream, failover["last_fault_request_epoch"],
+                                                 args.cooldown, args.recovery_timeout)
+            passed = passed and recovery["recovered"]
+    finally:
+        upstream.stop()
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"mode": args.inject, "failover": failover, "recovery": recovery}, f, indent=2)
+        print(f"\nResults exported to: {args.output}")
+    
+    print_header("✅ Failover Measurements Complete" if passed else "❌ Failover Issues Detected")
+    return 0 if passed else 1
+
+
 def main():
     """Main test routine."""
-    parser = argparse.ArgumentParser(description="Test provider fallback mechanisms")
+    parser = argparse.ArgumentParser(
+        description="Test provider fallback mechanisms",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Fault injection (--inject): point the primary deployment at the stand-in first,
+e.g. in the LiteLLM config
+  - model_name: claude-3-5-sonnet-20241022
+    litellm_params:
+      model: anthropic/claude-3-5-sonnet-20241022
+      api_base: http://127.0.0.1:4999
+      api_key: sk-1234
+
+  python test-provider-fallback.py --inject error \\
+    --chain claude-3-5-sonnet-20241022,gemini-2.5-pro --cooldown 30
+"""
+    )
     parser.add_argument("--primary", help="Primary model name")
     parser.add_argument("--fallback", help="Fallback model name")
     parser.add_argument("--cooldown", type=int, default=60, help="Expected cooldown time (seconds)")
+    parser.add_argument("--inject", choices=["dead-port", "error", "hang"],
+                        help="Fail the primary via a local stand-in upstream and measure failover latency")
+    parser.add_argument("--chain", help="Comma-separated fallback chain, primary first "
+                                        "(default: --primary,--fallback)")
+    parser.add_argument("--fault-port", type=int, default=4999,
+                        help="Port of the stand-in upstream (default: 4999)")
+    parser.add_argument("--fault-status", type=int, default=503,
+                        help="Status returned by the stand-in in error mode (default: 503)")
+    parser.add_argument("--hang-seconds", type=float, default=30,
+                        help="Response delay in hang mode; must exceed the gateway timeout (default: 30)")
+    parser.add_argument("--upstream-key", default="sk-1234",
+                        help="API key the gateway sends to the stand-in (default: sk-1234)")
+    parser.add_argument("--baseline-requests", type=int, default=10,
+                        help="Direct requests per fallback model for its baseline (default: 10)")
+    parser.add_argument("--fault-requests", type=int, default=20,
+                        help="Requests sent while the primary is failing (default: 20)")
+    parser.add_argument("--recovery-timeout", type=float, default=300,
+                        help="Give up waiting for cooldown recovery after N seconds (default: 300)")
+    parser.add_argument("--output", help="Export fault-injection measurements to JSON file")
     args = parser.parse_args()
     
     print_header("Provider Fallback Verification Test")
@@ -219,6 +543,13 @@ def main():
     
     print(f"Available models: {', '.join(models)}\n")
     
+    if args.inject:
+        chain = args.chain.split(",") if args.chain else [m for m in (args.primary, args.fallback) if m]
+        if len(chain) < 2:
+            print("❌ ERROR: --inject needs a chain of at least two models (--chain or --primary/--fallback)")
+            sys.exit(2)
+        sys.exit(run_fault_injection(chain, args))
+    
     # Determine test models
     if args.primary and args.fallback:
         primary_model = args.primary
@@ -10,6 +10,10 @@ This script verifies:
 3. End-to-end flow (requests traverse proxy to gateway to provider)
 4. Authentication handling (proxy auth + provider auth work together)
 5. Error handling (proper error messages for proxy/gateway failures)
+6. Connection timing (optional, --timing): DNS, TCP connect, proxy CONNECT,
+   TLS handshake and time to first byte, measured separately for the direct,
+   proxied and NO_PROXY-selected paths, plus the saving from reusing a
+   connection instead of opening a new tunnel per request
 
 Usage:
     # Basic test (assumes defaults)
@@ -25,6 +29,10 @@ Usage:
     # Test specific provider
     python test-proxy-gateway.py --provider anthropic
 
+    # Break down where connection time goes (also probe an HTTPS upstream)
+    python test-proxy-gateway.py --timing --timing-runs 10 \\
+                                   --timing-url https://api.anthropic.com
+
 Exit Codes:
     0 - All tests passed
     1 - One or more tests failed
@@ -32,13 +40,19 @@ Exit Codes:
 """
 
 import argparse
+import base64
+import http.client
 import json
 import os
+import socket
+import ssl
+import statistics
 import sys
 import time
 import urllib.request
 import urllib.error
 from typing import Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlsplit
 
 # ANSI color codes
 GREEN = "\033[92m"
@@ -325,6 +339,222 @@ def test_proxy_bypass(gateway_url: str, no_proxy: str) -> Tuple[bool, str]:
         return True, "Proxy bypass not applicable"
 
 
+TIMING_PHASES = ["dns", "tcp", "proxy_connect", "tls", "ttfb", "total"]
+
+
+def open_timed_connection(
+    target_url: str,
+    proxy_url: Optional[str] = None,
+    timeout: float = 10
+) -> Tuple[http.client.HTTPConnection, Dict[str, float]]:
+    """
+    Open a connection to target_url phase by phase, timing each phase.
+    
+    HTTPS targets behind a proxy are reached through a CONNECT tunnel; plain
+    HTTP targets are sent to the proxy as absolute-URI requests.
+    
+    Args:
+        target_url: URL whose host the connection is for
+        proxy_url: Optional proxy URL (credentials in the URL are sent as Basic auth)
+        timeout: Socket timeout in seconds
+        
+    Returns:
+        Tuple of (connected HTTPConnection, phase timings in seconds)
+    """
+    target = urlsplit(target_url)
+    secure = target.scheme == "https"
+    target_port = target.port or (443 if secure else 80)
+    proxy = urlsplit(proxy_url) if proxy_url else None
+    timings = {}
+    
+    dial_host = proxy.hostname if proxy else target.hostname
+    dial_port = (proxy.port or 8080) if proxy else target_port
+    
+    start = time.perf_counter()
+    family, socktype, proto, _, address = socket.getaddrinfo(
+        dial_host, dial_port, type=socket.SOCK_STREAM)[0]
+    timings["dns"] = time.perf_counter() - start
+    
+    sock = socket.socket(family, socktype, proto)
+    sock.settimeout(timeout)
+    start = time.perf_counter()
+    try:
+        sock.connect(address)
+        timings["tcp"] = time.perf_counter() - start
+        
+        if proxy and secure:
+            request = f"CONNECT {target.hostname}:{target_port} HTTP/1.1\r\nHost: {target.hostname}:{target_port}\r\n"
+            if proxy.username:
+                credentials = f"{unquote(proxy.username)}:{unquote(proxy.password or '')}"
+                request += f"Proxy-Authorization: Basic {base64.b64encode(credentials.encode()).decode()}\r\n"
+            start = time.perf_counter()
+            sock.sendall((request + "\r\n").encode())
+            reply = b""
+            while b"\r\n\r\n" not in reply:
+                chunk = sock.recv(4096)
+                if not chunk:
+                    raise ConnectionError("Proxy closed the connection during CONNECT")
+                reply += chunk
+            timings["proxy_connect"] = time.perf_counter() - start
+            status_line = reply.split(b"\r\n", 1)[0].decode(errors="replace")
+            if status_line.split(" ")[1:2] != ["200"]:
+                raise ConnectionError(f"CONNECT refused: {status_line}")
+        
+        if secure:
+            start = time.perf_counter()
+            sock = ssl.create_default_context().wrap_socket(sock, server_hostname=target.hostname)
+            timings["tls"] = time.perf_counter() - start
+    except Exception:
+        sock.close()
+        raise
+    
+    conn = http.client.HTTPConnection(target.hostname, target_port, timeout=timeout)
+    conn.sock = sock
+    return conn, timings
+
+
+def timed_request(
+    conn: http.client.HTTPConnection,
+    target_url: str,
+    proxy_url: Optional[str] = None
+) -> Tuple[int, float, float]:
+    """
+    Send a GET on an open connection.
+    
+    Returns:
+        Tuple of (status, time to first byte, total time) in seconds
+    """
+    target = urlsplit(target_url)
+    path = target.path or "/"
+    if proxy_url and target.scheme == "http":
+        path = target_url  # Forward proxies expect the absolute URI
+    headers = {"Connection": "keep-alive"}
+    proxy = urlsplit(proxy_url) if proxy_url else None
+    if proxy and proxy.username and target.scheme == "http":
+        credentials = f"{unquote(proxy.username)}:{unquote(proxy.password or '')}"
+        headers["Proxy-Authorization"] = f"Basic {base64.b64encode(credentials.encode()).decode()}"
+    
+    start = time.perf_counter()
+    conn.request("GET", path, headers=headers)
+    response = conn.getresponse()
+    ttfb = time.perf_counter() - start
+    response.read()
+    return response.status, ttfb, time.perf_counter() - start
+
+
+def probe_connection_path(target_url: str, proxy_url: Optional[str], runs: int) -> Dict:
+    """
+    Time `runs` requests on fresh connections and `runs` on one reused connection.
+    
+    Returns:
+        Dict with per-phase medians (ms) for new connections, the reused
+        request median, and any error
+    """
+    fresh = {phase: [] for phase in TIMING_PHASES}
+    reused = []
+    status = None
+    try:
+        for _ in range(runs):
+            start = time.perf_counter()
+            conn, timings = open_timed_connection(target_url, proxy_url)
+            try:
+                status, ttfb, _ = timed_request(conn, target_url, proxy_url)
+            finally:
+                conn.close()
+            timings["ttfb"] = ttfb
+            timings["total"] = time.perf_counter() - start
+            for phase, value in timings.items():
+                fresh[phase].append(value)
+        
+        conn, _ = open_timed_connection(target_url, proxy_url)
+        try:
+            timed_request(conn, target_url, proxy_url)  # Warm the connection
+            for _ in range(runs):
+                _, _, total = timed_request(conn, target_url, proxy_url)
+                reused.append(total)
+        finally:
+            conn.close()
+    except (OSError, http.client.HTTPException) as e:
+        return {"error": f"{type(e).__name__}: {e}", "status": status}
+    
+    return {
+        "status": status,
+        "new_connection_ms": {
+            phase: round(statistics.median(values) * 1000, 2)
+            for phase, values in fresh.items() if values
+        },
+        "reused_connection_ms": round(statistics.median(reused) * 1000, 2) if reused else None
+    }
+
+
+def test_connection_timing(
+    gateway_url: str,
+    proxy_url: str,
+    no_proxy: str,
+    runs: int = 5,
+    extra_urls: Optional[List[str]] = None
+) -> Tuple[bool, str]:
+    """
+    Break connection time down by phase for direct and proxied paths.
+    
+    Args:
+        gateway_url: LiteLLM gateway base URL (its /health endpoint is probed)
+        proxy_url: Proxy URL
+        no_proxy: NO_PROXY value deciding which path the gateway actually uses
+        runs: Requests per measurement
+        extra_urls: Additional URLs to probe (e.g. an HTTPS provider endpoint)
+        
+    Returns:
+        Tuple of (success: bool, message: str)
+    """
+    print_header("Test 6: Connection Phase Timing")
+    
+    targets = [f"{gateway_url.rstrip('/')}/health"] + list(extra_urls or [])
+    failures = 0
+    summary = []
+    
+    for target_url in targets:
+        host = urlsplit(target_url).hostname
+        bypassed = bool(urllib.request.proxy_bypass_environment(host, {"no": no_proxy}))
+        print(f"Target: {target_url}")
+        print(f"  NO_PROXY selects: {'direct (bypass)' if bypassed else 'proxy'}")
+        print(f"  {'path':<10}" + "".join(f"{phase:>15}" for phase in TIMING_PHASES) + f"{'reused':>10}")
+        
+        results = {}
+        for label, proxy in (("direct", None), ("proxied", proxy_url)):
+            result = probe_connection_path(target_url, proxy, runs)
+            results[label] = result
+            if "error" in result:
+                print(f"  {label:<10}{RED}{result['error']}{RESET}")
+                continue
+            phases = result["new_connection_ms"]
+            cells = "".join(f"{phases[p]:>15.1f}" if p in phases else f"{'-':>15}" for p in TIMING_PHASES)
+            print(f"  {label:<10}{cells}{result['reused_connection_ms']:>10.1f}")
+        
+        effective = results["direct" if bypassed else "proxied"]
+        if "error" in effective:
+            failures += 1
+            print_error(f"Effective path ({'direct' if bypassed else 'proxied'}) failed")
+        else:
+            new_total = effective["new_connection_ms"]["total"]
+            saved = new_total - effective["reused_connection_ms"]
+            print(f"  Connection reuse saves {saved:.1f}ms per request "
+                  f"({saved / new_total:.0%} of {new_total:.1f}ms) on the effective path")
+            summary.append(f"{host}: {new_total:.0f}ms new / {effective['reused_connection_ms']:.0f}ms reused")
+        
+        if "error" not in results["direct"] and "error" not in results["proxied"]:
+            overhead = (results["proxied"]["new_connection_ms"]["total"]
+                        - results["direct"]["new_connection_ms"]["total"])
+            print(f"  Proxy adds {overhead:.1f}ms per new connection"
+                  + (" (avoided: NO_PROXY bypasses it)" if bypassed else ""))
+        print()
+    
+    print("Medians in ms over", runs, "runs; 'reused' is a full request on a kept-alive connection.")
+    if failures:
+        return False, f"{failures} target(s) unreachable on their effective path"
+    return True, "; ".join(summary)
+
+
 def main() -> int:
     """Main test routine."""
     parser = argparse.ArgumentParser(
@@ -353,9 +583,29 @@ def main() -> int:
         default=os.getenv("NO_PROXY", "localhost,127.0.0.1"),
         help="NO_PROXY value (default: $NO_PROXY)"
     )
+    parser.add_argument(
+        "--timing",
+        action="store_true",
+        help="Also break down connection time by phase (DNS/TCP/CONNECT/TLS/TTFB)"
+    )
+    parser.add_argument(
+        "--timing-runs",
+        type=int,
+        default=5,
+        help="Requests per timing measurement (default: 5)"
+    )
+    parser.add_argument(
+        "--timing-url",
+        action="append",
+        default=[],
+        help="Extra URL to include in the timing breakdown (repeatable)"
+    )
     
     args = parser.parse_args()
     
+    if args.timing_runs < 1:
+        parser.error("--timing-runs must be at least 1")
+    
     if not args.proxy:
         print_error("No proxy configured")
         print("Set HTTPS_PROXY environment variable or use --proxy option")
@@ -405,6 +655,12 @@ def main() -> int:
     success, msg = test_proxy_bypass(args.gateway, args.no_proxy)
     results.append(("Proxy Bypass", success, msg))
     
+    # Test 6: Connection phase timing (optional)
+    if args.timing:
+        success, msg = test_connection_timing(
+            args.gateway, args.proxy, args.no_proxy, args.timing_runs, args.timing_url)
+        results.append(("Connection Timing", success, msg))
+    
     # Summary
     print_header("Test Summary")
     
@@ -4,19 +4,29 @@ Rate Limiting Verification Script for Enterprise Gateways
 
 Purpose: Test and verify that enterprise gateways correctly enforce rate limiting
 Usage: python test-rate-limiting.py --url https://gateway.example.com --token your-api-key --rpm 60
+       python test-rate-limiting.py --url https://gateway.example.com --token your-api-key --rpm 60 --discover
 
 Validates:
 - Rate limit enforcement (429 status code)
 - Rate limit headers (X-RateLimit-* or Retry-After)
 - Rate limit behavior (requests blocked after threshold)
 - Rate limit reset functionality
+
+Discovery mode (--discover) measures the limit instead of checking an expected
+one: a concurrent burst drains the limiter, a second burst after a short
+pause measures how fast it refills, and the 429 timing plus rate limit
+headers are fitted to a token-bucket or fixed/sliding-window model.
 """
 
 import argparse
+import json
 import sys
+import threading
 import time
-from typing import Dict, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime, timedelta
 
 
@@ -40,7 +50,9 @@ class RateLimitTester:
         self.requests_made = 0
         self.requests_succeeded = 0
         self.requests_rate_limited = 0
+        self.model = "claude-3-5-sonnet-20241022"
         self.session = requests.Session()
+        self._counter_lock = threading.Lock()
     
     def log(self, message: str, color: str = Colors.RESET):
         """Print colored log message"""
@@ -61,7 +73,7 @@ class RateLimitTester:
                     "anthropic-version": "2023-06-01"
                 },
                 json={
-                    "model": "claude-3-5-sonnet-20241022",
+                    "model": self.model,
                     "max_tokens": 10,
                     "messages": [{"role": "user", "content": "test"}]
                 },
@@ -69,12 +81,13 @@ class RateLimitTester:
             )
             
             latency = time.time() - start_time
-            self.requests_made += 1
-            
-            if response.status_code in [200, 201]:
-                self.requests_succeeded += 1
-            elif response.status_code == 429:
-                self.requests_rate_limited += 1
+            with self._counter_lock:
+                self.requests_made += 1
+                
+                if response.status_code in [200, 201]:
+                    self.requests_succeeded += 1
+                elif response.status_code == 429:
+                    self.requests_rate_limited += 1
             
             return response.status_code, dict(response.headers), latency
             
@@ -266,6 +279,205 @@ class RateLimitTester:
         print(f"{Colors.YELLOW}⚠ WARNING - Could not trigger rate limit to check header{Colors.RESET}")
         return True
     
+    def fire_burst(self, size: int, concurrency: int) -> List[Dict]:
+        """Send `size` requests at once; return when each was sent, its status and rate limit headers"""
+        def send(_):
+            sent = time.monotonic()
+            status, headers, latency = self.make_request()
+            return {
+                "sent": sent,
+                "status": status,
+                "rate_limit": self.extract_rate_limit_headers(headers)
+            }
+        
+        with ThreadPoolExecutor(max_workers=min(size, concurrency)) as pool:
+            return list(pool.map(send, range(size)))
+    
+    @staticmethod
+    def _seconds(value: Optional[str]) -> Optional[float]:
+        """Parse a Retry-After/Reset header as seconds from now (accepts epoch timestamps)"""
+        try:
+            seconds = float(value)
+        except (TypeError, ValueError):
+            return None
+        return max(seconds - time.time(), 0.0) if seconds > 1e9 else seconds
+    
+    def probe_refill(self, capacity: int, refill_wait: float, concurrency: int) -> List[Dict]:
+        """Burst until the refill runs out, starting from twice the refill expected at --rpm"""
+        limit = max(capacity, 4)
+        size = min(limit, int(2 * self.rpm_limit / 60 * refill_wait) + 4)
+        records: List[Dict] = []
+        while True:
+            batch = self.fire_burst(size, concurrency)
+            records += batch
+            if any(r["status"] not in (200, 201) for r in batch) or len(records) >= limit:
+                return records
+            # All admitted: the refill was larger than expected, keep draining
+            size = min(size * 2, limit - len(records))
+    
+    def discover_rate_limit(self, burst: int, concurrency: int, refill_wait: Optional[float] = None,
+                            max_requests: int = 2000, max_wait: float = 120) -> Dict:
+        """Drain the limiter with bursts, measure its refill, and fit a limiter model"""
+        adapter = HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        started = time.monotonic()
+        
+        # Phase 1: burst (doubling) until the limiter starts returning 429
+        admitted_total = 0
+        size = burst
+        used = 0
+        hints: Dict[str, Optional[str]] = {}
+        first_sent = None
+        while True:
+            records = self.fire_burst(size, concurrency)
+            used += size
+            first_sent = first_sent or min(r["sent"] for r in records)
+            admitted = [r for r in records if r["status"] in (200, 201)]
+            limited = [r for r in records if r["status"] == 429]
+            admitted_total += len(admitted)
+            for record in admitted + limited:
+                hints.update({k: v for k, v in record["rate_limit"].items() if v is not None})
+            self.log(f"Burst of {size}: {len(admitted)} admitted, {len(limited)} rate limited")
+            if limited:
+                break
+            if not admitted:
+                statuses = sorted({r["status"] for r in records})
+                return {"error": f"No request succeeded (statuses: {statuses})", "requests_used": used}
+            if used + size * 2 > max_requests:
+                return {"limited": False, "requests_used": used, "admitted": admitted_total,
+                        "elapsed_seconds": round(time.monotonic() - started, 2)}
+            size *= 2
+        emptied = min(r["sent"] for r in limited)
+        retry_after = self._seconds(hints.get("retry_after"))
+        
+        # Phase 2: pause, then measure how many requests the refill admits
+        adaptive = refill_wait is None
+        if adaptive:
+            # Shorter than Retry-After, so a window limiter has not reset yet
+            refill_wait = min(max((retry_after or 4.0) / 2, 1.0), 30.0)
+        for attempt in range(2):
+            time.sleep(refill_wait)
+            records = self.probe_refill(admitted_total, refill_wait, concurrency)
+            used += len(records)
+            refilled = sum(r["status"] in (200, 201) for r in records)
+            refill_elapsed = min(r["sent"] for r in records) - emptied
+            self.log(f"After {refill_elapsed:.1f}s: {refilled} of {len(records)} admitted")
+            if not (adaptive and attempt == 0 and 0 < refilled < min(20, 0.9 * admitted_total)):
+                break
+            # Too few refills to fit a rate precisely. The burst drained the
+            # limiter again, so measure once more over a pause sized for ~20.
+            rejected = [r["sent"] for r in records if r["status"] not in (200, 201)]
+            emptied = min(rejected or [r["sent"] for r in records])
+            refill_wait = min(20 * refill_elapsed / refilled, 30.0)
+        
+        result = {
+            "limited": True,
+            "header_limit": hints.get("limit"),
+            "header_retry_after": hints.get("retry_after"),
+            "header_reset": hints.get("reset"),
+        }
+        if 0 < refilled < 0.9 * admitted_total:
+            # Gradual refill: token bucket. Tokens also refilled while phase 1 ran.
+            rate = refilled / refill_elapsed
+            capacity = max(1.0, admitted_total - rate * (emptied - first_sent))
+            result.update({
+                "model": "token-bucket",
+                "capacity": round(capacity, 1),
+                "refill_per_second": round(rate, 3),
+                "effective_rpm": round(rate * 60, 1)
+            })
+        elif refilled:
+            # Everything came back at once within the pause: a window that reset
+            window = emptied - first_sent + refill_elapsed
+            result.update({
+                "model": "window",
+                "capacity": admitted_total,
+                "window_seconds": [None, round(window, 1)],
+                "effective_rpm": round(admitted_total * 60 / window, 1),
+                "note": "Window reset during the pause; its length is an upper bound"
+            })
+        else:
+            # Nothing refilled: fixed or sliding window. Poll single requests until it reopens.
+            reset = self._seconds(hints.get("reset")) or retry_after
+            # Start polling just before the hinted reset (headers round it up)
+            wait = max(reset - 1.0 - (time.monotonic() - emptied), 0.5) if reset else 1.0
+            last_rejected = max(r["sent"] for r in records)
+            reopened = None
+            while time.monotonic() + wait - emptied <= max_wait:
+                time.sleep(wait)
+                status, _, _ = self.make_request()
+                used += 1
+                if status in (200, 201):
+                    reopened = time.monotonic()
+                    break
+                last_rejected = time.monotonic()
+                wait = min(wait * 2, 8.0) if not reset else 0.5
+            if reopened is None:
+                result.update({"model": "window", "capacity": admitted_total,
+                               "note": f"Limiter did not reopen within {max_wait:.0f}s"})
+            else:
+                lower, upper = last_rejected - first_sent, reopened - first_sent
+                result.update({
+                    "model": "window",
+                    "capacity": admitted_total,
+                    "window_seconds": [round(lower, 1), round(upper, 1)],
+                    "effective_rpm": round(admitted_total * 60 / ((lower + upper) / 2), 1)
+                })
+        
+        try:
+            header_limit = float(hints.get("limit"))
+        except (TypeError, ValueError):
+            header_limit = None
+        if header_limit and abs(result["capacity"] - header_limit) > 0.2 * header_limit:
+            result.setdefault("note", f"Measured capacity differs from the limit header ({hints['limit']}); "
+                                      "the limiter may not have been full when discovery started")
+        
+        result["requests_used"] = used
+        result["elapsed_seconds"] = round(time.monotonic() - started, 2)
+        return result
+    
+    def print_discovery(self, result: Dict) -> int:
+        """Print the fitted limiter model; return the exit code"""
+        print(f"\n{Colors.BOLD}{'='*60}")
+        print("Rate Limit Discovery")
+        print(f"{'='*60}{Colors.RESET}\n")
+        print(f"Gateway URL: {self.gateway_url}")
+        print(f"Requests used: {result['requests_used']} in {result.get('elapsed_seconds', 0)}s\n")
+        
+        if "error" in result:
+            print(f"{Colors.RED}✗ {result['error']}{Colors.RESET}")
+            return 1
+        if not result["limited"]:
+            print(f"{Colors.YELLOW}⚠ No 429 after {result['admitted']} admitted requests; "
+                  f"raise --max-requests or --burst{Colors.RESET}")
+            return 1
+        
+        print(f"Model:           {result['model']}")
+        print(f"Capacity:        {result['capacity']} requests")
+        if "refill_per_second" in result:
+            print(f"Refill rate:     {result['refill_per_second']} requests/second")
+        if result.get("window_seconds"):
+            lower, upper = result["window_seconds"]
+            print(f"Window:          {'≤ ' if lower is None else f'{lower}-'}{upper}s")
+        for key, label in (("header_limit", "Limit header"), ("header_retry_after", "Retry-After"),
+                           ("header_reset", "Reset header")):
+            if result.get(key):
+                print(f"{label + ':':<17}{result[key]}")
+        if result.get("note"):
+            print(f"{Colors.YELLOW}Note: {result['note']}{Colors.RESET}")
+        
+        effective = result.get("effective_rpm")
+        if effective is None:
+            return 1
+        print(f"\nEffective limit: {Colors.BOLD}{effective} requests/minute{Colors.RESET} "
+              f"(expected {self.rpm_limit})")
+        if abs(effective - self.rpm_limit) <= 0.2 * self.rpm_limit:
+            print(f"{Colors.GREEN}✓ Within 20% of the expected limit{Colors.RESET}\n")
+            return 0
+        print(f"{Colors.YELLOW}⚠ Differs from the expected limit by more than 20%{Colors.RESET}\n")
+        return 1
+    
     def run_tests(self) -> Tuple[int, int]:
         """Run all rate limiting tests"""
         print(f"\n{Colors.BOLD}{'='*60}")
@@ -344,6 +556,13 @@ Examples:
     --rpm 100 \\
     --verbose
 
+  # Measure the limit in seconds with concurrent bursts
+  python test-rate-limiting.py \\
+    --url https://gateway.example.com \\
+    --token your-api-key \\
+    --rpm 60 \\
+    --discover --concurrency 32
+
 Tests Performed:
   1. Check if rate limit headers are present (X-RateLimit-*)
   2. Verify rate limiting is enforced (429 status code)
@@ -377,11 +596,53 @@ Exit Codes:
         action='store_true',
         help='Enable verbose output'
     )
+    parser.add_argument(
+        '--discover',
+        action='store_true',
+        help='Measure the enforced limit with concurrent bursts instead of running the tests'
+    )
+    parser.add_argument(
+        '--burst',
+        type=int,
+        help='Initial burst size for --discover, doubled until rate limited (default: --rpm / 4)'
+    )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=32,
+        help='Requests in flight during --discover bursts (default: 32)'
+    )
+    parser.add_argument(
+        '--refill-wait',
+        type=float,
+        help='Pause before the refill burst in seconds (default: from Retry-After)'
+    )
+    parser.add_argument(
+        '--max-requests',
+        type=int,
+        default=2000,
+        help='Request budget for --discover (default: 2000)'
+    )
+    parser.add_argument(
+        '--output',
+        help='Export --discover results to JSON file'
+    )
     
     args = parser.parse_args()
     
-    # Run tests
     tester = RateLimitTester(args.url, args.token, args.rpm, args.verbose)
+    
+    if args.discover:
+        burst = args.burst or max(4, min(args.rpm // 4, 100))
+        result = tester.discover_rate_limit(burst, args.concurrency, args.refill_wait, args.max_requests)
+        exit_code = tester.print_discovery(result)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(result, f, indent=2)
+            print(f"Results exported to: {args.output}")
+        sys.exit(exit_code)
+    
+    # Run tests
     passed, failed = tester.run_tests()
     exit_code = tester.print_summary(passed, failed)
     
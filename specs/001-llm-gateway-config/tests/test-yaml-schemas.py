@@ -6,6 +6,7 @@ Validates all YAML configuration templates for syntax and schema correctness
 
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Tuple
 
@@ -15,6 +16,9 @@ except ImportError:
     print("Error: PyYAML is required. Install with: pip install pyyaml")
     sys.exit(1)
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+from config_loader import load_config  # noqa: E402
+
 
 class YAMLSchemaValidator:
     """Validates YAML files against expected schemas."""
@@ -32,17 +36,6 @@ class YAMLSchemaValidator:
             prefix = {"INFO": "[INFO]", "WARN": "[WARN]", "ERROR": "[ERROR]", "PASS": "[PASS]"}
             print(f"{prefix.get(level, '[INFO]')} {message}")
     
-    def validate_yaml_syntax(self, file_path: Path) -> Tuple[bool, str]:
-        """Validate YAML syntax."""
-        try:
-            with open(file_path, 'r') as f:
-                yaml.safe_load(f)
-            return True, ""
-        except yaml.YAMLError as e:
-            return False, str(e)
-        except Exception as e:
-            return False, f"Unexpected error: {e}"
-    
     def validate_litellm_config(self, config: Dict, file_path: Path) -> List[str]:
         """Validate LiteLLM configuration schema."""
         errors = []
@@ -96,34 +89,27 @@ class YAMLSchemaValidator:
         
         return errors
     
-    def validate_file(self, file_path: Path) -> bool:
-        """Validate a single YAML file."""
-        self.log(f"Validating: {file_path.name}")
+    def check_file(self, file_path: Path) -> Tuple[bool, List[str], List[str], List[Tuple[str, str]]]:
+        """Parse a YAML file once and check its schema, without touching validator state.
         
-        # Check syntax
-        valid, error = self.validate_yaml_syntax(file_path)
-        if not valid:
-            self.log(f"{file_path.name}: YAML syntax error - {error}", "ERROR")
-            self.errors.append(f"{file_path.name}: {error}")
-            self.failed += 1
-            return False
+        Returns (passed, errors, warnings, log messages as (message, level)).
+        """
+        messages = [(f"Validating: {file_path.name}", "INFO")]
         
-        # Load config
+        # Load config; a syntax error surfaces here, so the file is parsed exactly once
         try:
-            with open(file_path, 'r') as f:
-                config = yaml.safe_load(f)
+            config = load_config(file_path)
+        except yaml.YAMLError as e:
+            messages.append((f"{file_path.name}: YAML syntax error - {e}", "ERROR"))
+            return False, [f"{file_path.name}: {e}"], [], messages
         except Exception as e:
-            self.log(f"{file_path.name}: Failed to load - {e}", "ERROR")
-            self.errors.append(f"{file_path.name}: {e}")
-            self.failed += 1
-            return False
+            messages.append((f"{file_path.name}: Failed to load - {e}", "ERROR"))
+            return False, [f"{file_path.name}: {e}"], [], messages
         
         # Skip empty files
         if config is None:
-            self.log(f"{file_path.name}: Empty file", "WARN")
-            self.warnings.append(f"{file_path.name}: Empty file")
-            self.passed += 1
-            return True
+            messages.append((f"{file_path.name}: Empty file", "WARN"))
+            return True, [], [f"{file_path.name}: Empty file"], messages
         
         # Validate schema based on file location
         schema_errors = []
@@ -137,19 +123,39 @@ class YAMLSchemaValidator:
         
         # Report schema errors
         if schema_errors:
-            for error in schema_errors:
-                self.log(error, "ERROR")
-                self.errors.append(error)
-            self.failed += 1
-            return False
+            messages.extend((error, "ERROR") for error in schema_errors)
+            return False, schema_errors, [], messages
         
-        self.log(f"{file_path.name}: Valid", "PASS")
-        self.passed += 1
-        return True
+        messages.append((f"{file_path.name}: Valid", "PASS"))
+        return True, [], [], messages
     
-    def validate_directory(self, directory: Path) -> None:
-        """Validate all YAML files in directory recursively."""
-        yaml_files = list(directory.glob("**/*.yaml")) + list(directory.glob("**/*.yml"))
+    def record(self, result: Tuple[bool, List[str], List[str], List[Tuple[str, str]]]) -> bool:
+        """Log a check_file result and add it to the totals."""
+        passed, errors, warnings, messages = result
+        for message, level in messages:
+            self.log(message, level)
+        self.errors.extend(errors)
+        self.warnings.extend(warnings)
+        if passed:
+            self.passed += 1
+        else:
+            self.failed += 1
+        return passed
+    
+    def validate_file(self, file_path: Path) -> bool:
+        """Validate a single YAML file."""
+        return self.record(self.check_file(file_path))
+    
+    def validate_directory(self, directory: Path, jobs: int = 1) -> None:
+        """Validate all YAML files in directory recursively.
+        
+        With jobs > 1 files are checked in a process pool; results are still
+        reported in sorted path order, so output does not depend on timing.
+        """
+        yaml_files = sorted(
+            path for path in directory.rglob("*")
+            if path.suffix in (".yaml", ".yml") and path.is_file()
+        )
         
         if not yaml_files:
             self.log(f"No YAML files found in {directory}", "WARN")
@@ -158,8 +164,16 @@ class YAMLSchemaValidator:
         self.log(f"Found {len(yaml_files)} YAML files in {directory}")
         print()
         
-        for yaml_file in sorted(yaml_files):
-            self.validate_file(yaml_file)
+        if jobs > 1 and len(yaml_files) > 1:
+            workers = min(jobs, len(yaml_files))
+            chunksize = max(1, len(yaml_files) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                # map() yields in submission order, keeping the error order deterministic
+                for result in pool.map(_check_file, yaml_files, chunksize=chunksize):
+                    self.record(result)
+        else:
+            for yaml_file in yaml_files:
+                self.validate_file(yaml_file)
     
     def print_summary(self) -> bool:
         """Print validation summary."""
@@ -193,6 +207,11 @@ class YAMLSchemaValidator:
             return False
 
 
+def _check_file(file_path: Path) -> Tuple[bool, List[str], List[str], List[Tuple[str, str]]]:
+    """Process-pool worker: check one file with a fresh validator."""
+    return YAMLSchemaValidator().check_file(file_path)
+
+
 def main():
     import argparse
     
@@ -203,6 +222,8 @@ def main():
     
     parser.add_argument("--verbose", "-v", action="store_true", help="Verbose output")
     parser.add_argument("--directory", "-d", type=str, help="Directory to validate (default: ../templates)")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Validate files in N worker processes; 0 = one per CPU (default: 1)")
     
     args = parser.parse_args()
     
@@ -219,7 +240,8 @@ def main():
     
     # Validate
     validator = YAMLSchemaValidator(verbose=args.verbose)
-    validator.validate_directory(templates_dir)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    validator.validate_directory(templates_dir, jobs)
     
     # Print summary
     success = validator.print_summary()